@@ -1,11 +1,15 @@
 """AutoDocEval - Document evaluation and improvement in a closed-loop cycle."""
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 
-from .auto_improve import auto_improve_document
-from .compare import compare_documents
-from .evaluator import evaluate_document
-from .improver import improve_document
+if TYPE_CHECKING:
+    from .auto_improve import auto_improve_document
+    from .compare import compare_documents
+    from .evaluator import evaluate_document
+    from .improver import improve_document
 
 __all__ = [
     "auto_improve_document",
@@ -13,3 +17,18 @@ __all__ = [
     "evaluate_document",
     "improve_document",
 ]
+
+# Exports are imported on first use, so importing a light submodule (e.g. the
+# pytest plugin, loaded into every pytest session) doesn't load deepeval and openai
+_EXPORTS = {
+    "auto_improve_document": ".auto_improve",
+    "compare_documents": ".compare",
+    "evaluate_document": ".evaluator",
+    "improve_document": ".improver",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
@@ -1,14 +1,32 @@
 """Auto-improvement loop module for AutoDocEval."""
 
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Optional, Union
 
+from .budget import DEFAULT_MODEL, Budget, choose_model, estimate_tokens
+from .compact import compact_request, feedback_similarity, splice_sections
+from .deadline import Deadline, DeadlineExceededError, activate
 from .evaluator import evaluate_document
 from .file_tools import read_file, write_file
-from .improver import improve_document
+from .history import HistoryStore, recorded_grade, recorded_improve
+from .improver import create_improvement_prompt, improve_document
+from .profiling import span
+
+if TYPE_CHECKING:
+    from .object_store import ObjectStore
+    from .session import Session
 
 # Constants
 DEFAULT_MAX_ITERATIONS = 3
 DEFAULT_TARGET_SCORE = 0.7  # 70%
+JUDGE_PROMPT_OVERHEAD = 600  # GEval template and evaluation steps, in tokens
+JUDGE_COMPLETION_TOKENS = 200
+SPECULATION_SIMILARITY = 0.5  # Feedback overlap above which a speculative rewrite is kept as is
+DEFAULT_JOBS = 4
+
+_print_lock = threading.Lock()
 
 
 def generate_improved_path(doc_path: str, iteration: int) -> str:
@@ -29,89 +47,367 @@ def format_percentage(score: float) -> str:
     return f"{score * 100:.1f}%"
 
 
+def estimate_judge_tokens(doc: str) -> tuple[int, int]:
+    """Estimates (prompt, completion) tokens of grading a document."""
+    return estimate_tokens(doc) + JUDGE_PROMPT_OVERHEAD, JUDGE_COMPLETION_TOKENS
+
+
+def plan_iteration(doc: str, feedback: str, budget: Optional[Budget]) -> Optional[str]:
+    """Picks the rewrite model for the next iteration, or None if the budget can't cover it.
+
+    The estimate covers the rewrite (prompt plus a rewrite about as long as the
+    document) and grading the result, so an iteration is only started if it can
+    also be evaluated.
+    """
+    doc_tokens = estimate_tokens(doc)
+    judge_prompt, judge_completion = estimate_judge_tokens(doc)
+    prompt_tokens = estimate_tokens(create_improvement_prompt(feedback, doc)) + judge_prompt
+    return choose_model(budget, prompt_tokens, doc_tokens + judge_completion)
+
+
 def auto_improve_document(
     doc_path: str,
     max_iterations: int = DEFAULT_MAX_ITERATIONS,
     target_score: float = DEFAULT_TARGET_SCORE,
-) -> None:
+    session: Optional["Session"] = None,
+    budget: Optional[Budget] = None,
+    compact: bool = False,
+    pipelined: bool = False,
+    history: Optional[HistoryStore] = None,
+    log: Optional[Callable[[str], None]] = None,
+    store: Optional["ObjectStore"] = None,
+    deadline: Optional[Deadline] = None,
+) -> list[tuple[str, float]]:
     """Run auto-improvement loop on a document.
 
     Args:
         doc_path: Path to the document to improve
         max_iterations: Maximum number of improvement iterations
         target_score: Target clarity score to achieve (0-1)
+        session: Optional session whose warm clients and cache are reused
+        budget: Optional token/cost budget; the loop switches to a cheaper model
+            and then stops early when the next iteration would exceed it
+        compact: Send only the sections the feedback mentions, with deduplicated
+            feedback, and splice the rest back unchanged
+        pipelined: While an iteration is graded, speculatively rewrite it with
+            the previous feedback. The speculation is dropped if the target is
+            reached, kept if the new feedback is similar, and refined with the
+            new feedback otherwise
+        history: Optional store to record every grade and improve event in
+        log: Function progress messages are written with (defaults to print)
+        store: Optional object store to keep iterations in, as deltas against the
+            previous version, instead of writing ``_iterN`` files next to the document
+        deadline: Optional deadline for the whole loop; every call is cut off when
+            it passes, and the versions graded until then are kept and reported
+
+    Returns:
+        List of (path, score) for the original and every iteration; with a store,
+        the paths are where ``materialize`` writes each iteration
     """
     if not os.path.exists(doc_path):
         raise FileNotFoundError(f"File not found: {doc_path}")
 
-    print(f"🔄 Starting auto-improvement loop for {doc_path}")
-    print(f"Target score: {format_percentage(target_score)}")
-    print(f"Maximum iterations: {max_iterations}")
+    log = log or print
+    grade_fn = session.grade if session is not None else evaluate_document
+    improve_fn = session.improve if session is not None else improve_document
+    if budget is None:
+        # An unlimited budget still counts the tokens, and prompt cache hits, of the run
+        budget = Budget()
+
+    def grade(path: str, doc: str) -> tuple[float, str]:
+        with activate(deadline), span("grade", "pipeline", path=path):
+            return recorded_grade(history, "grade", path, doc, grade_fn, budget)
+
+    def improve(
+        path: str, doc: str, doc_feedback: str, model: str, call_deadline: Optional[Deadline]
+    ) -> str:
+        with activate(call_deadline), span("improve", "pipeline", path=path, model=model):
+            return recorded_improve(history, path, doc, doc_feedback, improve_fn, model, budget)
+
+    log(f"🔄 Starting auto-improvement loop for {doc_path}")
+    log(f"Target score: {format_percentage(target_score)}")
+    log(f"Maximum iterations: {max_iterations}")
 
     # Evaluate original document first
     original_doc = read_file(doc_path)
-    original_score, original_feedback = evaluate_document(original_doc)
-    print(f"Original document score: {format_percentage(original_score)}")
+    budget.check(*estimate_judge_tokens(original_doc))
+    original_score, original_feedback = grade(doc_path, original_doc)
+    log(f"Original document score: {format_percentage(original_score)}")
+
+    run = store.start_run(doc_path) if store is not None else None
+    if run is not None:
+        run.add(0, doc_path, original_doc)
+        run.set_score(0, original_score)
 
     original_path = doc_path
     current_doc = original_doc
     current_feedback = original_feedback
-    last_score = original_score
+    last_score = score = original_score
     iteration = 0
+    versions = [(original_path, original_score)]
 
     # Skip improvement if already at target
     if original_score >= target_score:
-        print(
+        log(
             f"✅ Original document already meets target score of {format_percentage(target_score)}!"
         )
-        return
+        return versions
+
+    def rewrite(
+        path: str, doc: str, doc_feedback: str, call_deadline: Optional[Deadline] = deadline
+    ) -> Optional[str]:
+        """Improves a document within the budget, or returns None if it can't be paid for."""
+        # A speculative rewrite may be cancelled before it even starts
+        if call_deadline is not None:
+            call_deadline.check()
+        # Pick a model the budget can pay for, or stop early
+        model = plan_iteration(doc, doc_feedback, budget)
+        if model is None:
+            log(f"💰 Budget exhausted ({budget.summary()}), stopping early")
+            return None
+        if model != DEFAULT_MODEL:
+            log(f"💰 Budget is running low, switching to {model}")
+
+        if not compact:
+            return improve(path, doc, doc_feedback, model, call_deadline)
+        request = compact_request(doc, doc_feedback)
+        log(request.report())
+        rewritten = improve(path, request.doc, request.feedback, model, call_deadline)
+        return splice_sections(request, rewritten)
 
-    while iteration < max_iterations:
-        iteration += 1
-        print(f"\n📝 Iteration {iteration}/{max_iterations}")
+    executor = ThreadPoolExecutor(max_workers=2) if pipelined else None
+    speculative: Optional[Future] = None
+    speculative_feedback = ""
+    # Cancelling it abandons the speculative rewrite: never used or recorded, but charged if it
+    # returns, since the provider bills it
+    speculation: Optional[Deadline] = None
+    current_path = original_path
 
-        # Improve document based on feedback
-        improved_doc = improve_document(current_doc, current_feedback)
+    timed_out = False
+    try:
+        while iteration < max_iterations:
+            if deadline is not None:
+                deadline.check()
+            iteration += 1
+            log(f"\n📝 Iteration {iteration}/{max_iterations}")
 
-        # Save improved document
-        improved_path = generate_improved_path(original_path, iteration)
-        write_file(improved_path, improved_doc)
+            # Improve document based on feedback
+            if speculative is None:
+                improved_doc = rewrite(current_path, current_doc, current_feedback)
+            else:
+                improved_doc = speculative.result()
+                similarity = feedback_similarity(speculative_feedback, current_feedback)
+                if improved_doc is not None and similarity < SPECULATION_SIMILARITY:
+                    log("🔁 Feedback changed, refining the speculative rewrite")
+                    improved_doc = rewrite(current_path, improved_doc, current_feedback)
+                elif improved_doc is not None:
+                    log("⚡ Using the speculative rewrite")
+            if improved_doc is None:
+                iteration -= 1
+                break
 
-        # Evaluate improved document
-        score, feedback = evaluate_document(improved_doc)
+            # Save improved document
+            improved_path = generate_improved_path(original_path, iteration)
+            if run is not None:
+                run.add(iteration, improved_path, improved_doc)
+            else:
+                write_file(improved_path, improved_doc)
 
-        # Print current score
-        print(f"Score after iteration {iteration}: {format_percentage(score)}")
-        improvement = score - last_score
-        print(f"Improvement: {format_percentage(improvement)} from previous version")
+            # Evaluate improved document, speculatively starting the next rewrite meanwhile
+            if executor is not None:
+                grading = executor.submit(grade, improved_path, improved_doc)
+                speculative = None
+                if iteration < max_iterations:
+                    speculation = Deadline(parent=deadline)
+                    speculative = executor.submit(
+                        rewrite, improved_path, improved_doc, current_feedback, speculation
+                    )
+                    speculative_feedback = current_feedback
+                score, feedback = grading.result()
+            else:
+                score, feedback = grade(improved_path, improved_doc)
+            versions.append((improved_path, score))
+            if run is not None:
+                run.set_score(iteration, score)
 
-        # Check if we've reached the target score
-        if score >= target_score:
-            print(f"✅ Target score of {format_percentage(target_score)} reached!")
-            break
+            # Print current score
+            log(f"Score after iteration {iteration}: {format_percentage(score)}")
+            improvement = score - last_score
+            log(f"Improvement: {format_percentage(improvement)} from previous version")
 
-        # Use the improved document for the next iteration
-        current_doc = improved_doc
-        current_feedback = feedback
-        last_score = score
+            # Check if we've reached the target score
+            if score >= target_score:
+                log(f"✅ Target score of {format_percentage(target_score)} reached!")
+                break
+
+            # Use the improved document for the next iteration
+            current_path = improved_path
+            current_doc = improved_doc
+            current_feedback = feedback
+            last_score = score
+    except DeadlineExceededError:
+        # Keep every version graded so far; an iteration cut off mid-way is dropped
+        timed_out = True
+        iteration = len(versions) - 1
+        log("⏰ Deadline reached, keeping the versions graded so far")
+    finally:
+        # Any speculation still running is unused now
+        if speculation is not None:
+            speculation.cancel()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     # Print summary of all versions
-    print("\n📊 Summary of all versions:")
-    print(f"Original ({original_path}): {format_percentage(original_score)}")
+    log("\n📊 Summary of all versions:")
+    log(f"Original ({original_path}): {format_percentage(original_score)}")
 
-    for i in range(1, iteration + 1):
-        iter_path = generate_improved_path(original_path, i)
-        if os.path.exists(iter_path):
-            iter_doc = read_file(iter_path)
-            iter_score, _ = evaluate_document(iter_doc)
-            print(f"Iteration {i} ({iter_path}): {format_percentage(iter_score)}")
+    # Scores were recorded as each iteration was graded, so nothing is re-evaluated here
+    for i, (iter_path, iter_score) in enumerate(versions[1:], start=1):
+        log(f"Iteration {i} ({iter_path}): {format_percentage(iter_score)}")
 
     # Print total improvement
-    print(f"\n📈 Total improvement: {format_percentage(score - original_score)}")
+    log(f"\n📈 Total improvement: {format_percentage(score - original_score)}")
+    log(f"💰 Usage: {budget.summary()}")
+    if run is not None and iteration:
+        log(f"🗃️ Iterations stored as run {run.id} (autodoceval materialize {run.id})")
 
-    if iteration >= max_iterations and score < target_score:
-        print(
+    if timed_out:
+        best_path, best_score = max(versions, key=lambda version: version[1])
+        log(f"🏆 Best version so far: {best_path} ({format_percentage(best_score)})")
+    elif iteration >= max_iterations and score < target_score:
+        log(
             f"⚠️ Maximum iterations ({max_iterations}) reached without achieving target score ({format_percentage(target_score)})"
         )
 
-    print("\n✅ Auto-improvement process completed!")
+    log("\n✅ Auto-improvement process completed!")
+    return versions
+
+
+def labelled_printer(label: str) -> Callable[[str], None]:
+    """Returns a thread-safe print function that prefixes every line with a label."""
+
+    def log(message: str = "") -> None:
+        lines = [f"[{label}] {line}" if line else "" for line in str(message).split("\n")]
+        with _print_lock:
+            print("\n".join(lines))
+
+    return log
+
+
+def auto_improve_documents(
+    doc_paths: list[str],
+    max_iterations: int = DEFAULT_MAX_ITERATIONS,
+    target_score: float = DEFAULT_TARGET_SCORE,
+    jobs: int = DEFAULT_JOBS,
+    session: Optional["Session"] = None,
+    job_budget: Optional[Budget] = None,
+    max_tokens: Optional[int] = None,
+    max_cost: Optional[float] = None,
+    compact: bool = False,
+    pipelined: bool = False,
+    history: Optional[HistoryStore] = None,
+    store: Optional["ObjectStore"] = None,
+    deadline: Optional[Deadline] = None,
+    document_timeout: Optional[float] = None,
+) -> dict[str, Union[list[tuple[str, float]], Exception]]:
+    """Run the auto-improvement loop on many documents concurrently.
+
+    Args:
+        doc_paths: Paths of the documents to improve
+        max_iterations: Maximum number of improvement iterations per document
+        target_score: Target clarity score to achieve (0-1)
+        jobs: Number of documents improved at once
+        session: Session shared by all documents; its concurrency cap limits
+            judge and rewriter calls across the whole run
+        job_budget: Optional budget for the whole run
+        max_tokens: Optional token budget per document
+        max_cost: Optional cost budget per document in USD
+        compact: Passed through to ``auto_improve_document``
+        pipelined: Passed through to ``auto_improve_document``
+        history: Optional store to record every grade and improve event in
+        store: Optional object store to keep iterations in instead of ``_iterN`` files
+        deadline: Optional deadline for the whole job; documents not started
+            by then fail with ``DeadlineExceededError``
+        document_timeout: Seconds each document's loop may take from its start
+
+    Returns:
+        Versions by document path, or the exception that stopped a document
+    """
+    if session is None:
+        # Import here to avoid circular imports
+        from .session import Session
+
+        session = Session(max_concurrency=jobs)
+
+    labels = {path: os.path.relpath(path) for path in doc_paths}
+
+    def run(path: str) -> list[tuple[str, float]]:
+        budget = None
+        if job_budget is not None:
+            budget = job_budget.child(max_tokens, max_cost)
+        elif max_tokens is not None or max_cost is not None:
+            budget = Budget(max_tokens, max_cost)
+        doc_deadline = deadline
+        if document_timeout is not None:
+            doc_deadline = Deadline(document_timeout, parent=deadline)
+        with span("auto_improve_document", "pipeline", path=path):
+            return auto_improve_document(
+                path,
+                max_iterations=max_iterations,
+                target_score=target_score,
+                session=session,
+                budget=budget,
+                compact=compact,
+                pipelined=pipelined,
+                history=history,
+                log=labelled_printer(labels[path]),
+                store=store,
+                deadline=doc_deadline,
+            )
+
+    results: dict[str, Union[list[tuple[str, float]], Exception]] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {path: executor.submit(run, path) for path in doc_paths}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                # One failing document must not lose the results of the others
+                labelled_printer(labels[path])(f"❌ Error: {e}")
+                results[path] = e
+    return results
+
+
+def format_results_table(results: dict[str, Union[list[tuple[str, float]], Exception]]) -> str:
+    """Formats a consolidated table of original and final scores per document."""
+    rows = [("Document", "Original", "Final", "Change", "Iterations")]
+    for path, versions in results.items():
+        if isinstance(versions, Exception):
+            status = (
+                "deadline reached"
+                if isinstance(versions, DeadlineExceededError)
+                else f"error: {type(versions).__name__}"
+            )
+            rows.append((os.path.relpath(path), "-", "-", "-", status))
+            continue
+        original, final = versions[0][1], versions[-1][1]
+        rows.append(
+            (
+                os.path.relpath(path),
+                format_percentage(original),
+                format_percentage(final),
+                format_percentage(final - original),
+                str(len(versions) - 1),
+            )
+        )
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = [
+        "  ".join(
+            cell.ljust(width) if i == 0 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths))
+        )
+        for row in rows
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
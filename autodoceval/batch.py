@@ -0,0 +1,128 @@
+"""Batch grading module for AutoDocEval."""
+
+import glob
+import os
+import re
+from typing import Optional
+
+from .deadline import Deadline, DeadlineExceededError, activate
+from .dedup import DEFAULT_MAX_DISTANCE, cluster_fingerprints, simhash_sections
+from .evaluator import evaluate_document
+from .file_tools import iter_sections, read_file
+from .history import HistoryStore, recorded_grade
+from .results import ResultTable
+
+# Constants
+DEFAULT_PATTERN = "*.md"
+VERIFY_TOLERANCE = 0.1  # Max score drift before a cluster is graded per document
+# Names this tool gives improved documents: doc_iter2.md, doc_improved.md, doc_improved_section1.md
+OUTPUT_NAME = re.compile(r"_(iter\d+|improved(_section\d+)?)$")
+
+
+def is_output_document(path: str) -> bool:
+    """Whether a file is an improved document written by an earlier run."""
+    return OUTPUT_NAME.search(os.path.splitext(os.path.basename(path))[0]) is not None
+
+
+def collect_documents(paths: list[str], pattern: str = DEFAULT_PATTERN) -> list[str]:
+    """Expands files, directories and glob patterns into a sorted list of documents.
+
+    Improved documents written by earlier runs are left out of directories and
+    glob matches, so a re-run never grades or rewrites its own outputs; files
+    named explicitly are always kept.
+    """
+    documents = set()
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(os.path.join(path, "**", pattern), recursive=True)
+        elif os.path.exists(path):
+            documents.add(path)
+            continue
+        else:
+            matches = glob.glob(path, recursive=True)
+            if not matches:
+                raise FileNotFoundError(f"File not found: {path}")
+        documents.update(match for match in matches if not is_output_document(match))
+    return sorted(documents)
+
+
+def grade_documents(
+    paths: list[str],
+    dedupe: bool = True,
+    max_distance: int = DEFAULT_MAX_DISTANCE,
+    verify: bool = False,
+    deadline: Optional[Deadline] = None,
+    history: Optional[HistoryStore] = None,
+) -> tuple[ResultTable, dict[str, list[str]]]:
+    """Grades many documents, evaluating one representative per near-duplicate cluster.
+
+    Results are appended to a ``ResultTable`` as they are graded, so a large
+    batch never holds a Python tuple per document; close the table when done.
+
+    Args:
+        paths: Document paths to grade
+        dedupe: Whether to group near-duplicates and share their results
+        max_distance: Maximum fingerprint distance for near-duplicates
+        verify: Grade one extra member per cluster and fall back to grading
+            every member if its score drifts from the representative's
+        deadline: Optional deadline; documents not graded when it passes are
+            left out of the results instead of failing the batch
+        history: Optional store to record every document actually graded in
+
+    Returns:
+        Tuple containing (table of results, clusters by representative path)
+    """
+    if dedupe:
+        # Fingerprint section by section so large documents are never fully loaded
+        fingerprints = {path: simhash_sections(iter_sections(path)) for path in paths}
+        clusters = cluster_fingerprints(fingerprints, max_distance)
+    else:
+        clusters = {path: [path] for path in paths}
+
+    def grade(path: str) -> tuple[float, str]:
+        return recorded_grade(history, "grade", path, read_file(path), evaluate_document)
+
+    table = ResultTable()
+    try:
+        with activate(deadline):
+            for representative, members in list(clusters.items()):
+                if deadline is not None:
+                    deadline.check()
+                score, reason = grade(representative)
+                table.append(representative, score, reason)
+
+                others = members[1:]
+                if verify and others:
+                    probe = others[-1]
+                    probe_score, probe_reason = grade(probe)
+                    table.append(probe, probe_score, probe_reason)
+                    if abs(probe_score - score) > VERIFY_TOLERANCE:
+                        # Not close enough to share results: grade the cluster individually
+                        for member in others[:-1]:
+                            table.append(member, *grade(member))
+                        clusters[representative] = [representative]
+                        for member in others:
+                            clusters[member] = [member]
+                        continue
+                    others = others[:-1]
+
+                for member in others:
+                    table.append(member, score, reason)
+    except DeadlineExceededError:
+        # Keep the results graded so far; the remaining documents have none
+        pass
+
+    return table, clusters
+
+
+def format_shared_report(clusters: dict[str, list[str]]) -> str:
+    """Formats a report of which documents shared grading results."""
+    shared = {rep: members for rep, members in clusters.items() if len(members) > 1}
+    if not shared:
+        return "No near-duplicate documents found."
+
+    lines = ["Documents sharing results:"]
+    for representative, members in sorted(shared.items()):
+        lines.append(f"- {representative}")
+        lines.extend(f"    {member}" for member in members[1:])
+    return "\n".join(lines)
@@ -0,0 +1,177 @@
+"""Token and cost budget module for AutoDocEval."""
+
+import threading
+from typing import Any, Optional
+
+# Constants
+DEFAULT_MODEL = "gpt-4"
+CHEAP_MODEL = "gpt-4o-mini"
+CHARS_PER_TOKEN = 4  # Rough fallback when tiktoken is not installed
+CACHED_PROMPT_DISCOUNT = 0.5  # Share of the prompt price charged for cached prompt tokens
+
+# USD per 1K (prompt, completion) tokens
+MODEL_PRICES = {
+    "gpt-4": (0.03, 0.06),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.0025, 0.01),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+
+class BudgetExceededError(Exception):
+    """Raised when a call would exceed a token or cost budget."""
+
+
+def estimate_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Estimates the number of tokens in a text, using tiktoken when installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        return len(text) // CHARS_PER_TOKEN + 1
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return len(encoding.encode(text))
+
+
+def estimate_cost(
+    prompt_tokens: int,
+    completion_tokens: int,
+    model: str = DEFAULT_MODEL,
+    cached_tokens: int = 0,
+) -> float:
+    """Estimates the USD cost of a call; unknown models are priced as gpt-4.
+
+    ``cached_tokens`` of the prompt tokens were served from the provider's
+    prompt cache and are charged at a discount.
+    """
+    prompt_price, completion_price = MODEL_PRICES.get(model, MODEL_PRICES[DEFAULT_MODEL])
+    prompt_cost = (prompt_tokens - cached_tokens * (1 - CACHED_PROMPT_DISCOUNT)) * prompt_price
+    return (prompt_cost + completion_tokens * completion_price) / 1000
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """Reads the prompt tokens served from the provider's cache off a usage object."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None)
+    return cached if isinstance(cached, int) else 0
+
+
+class Budget:
+    """Tracks token usage and cost against optional limits.
+
+    A budget may have a parent (e.g. a per-document budget inside a job-wide
+    one); usage recorded on the child also counts against the parent, and a
+    call is only affordable if every budget in the chain can pay for it.
+    """
+
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        max_cost: Optional[float] = None,
+        parent: Optional["Budget"] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.parent = parent
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @property
+    def tokens(self) -> int:
+        """Total tokens used."""
+        return self.prompt_tokens + self.completion_tokens
+
+    def child(self, max_tokens: Optional[int] = None, max_cost: Optional[float] = None) -> "Budget":
+        """Creates a nested budget whose usage also counts against this one."""
+        return Budget(max_tokens, max_cost, parent=self)
+
+    def record(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        model: str = DEFAULT_MODEL,
+        cost: Optional[float] = None,
+        cached_tokens: int = 0,
+    ) -> None:
+        """Records the usage of a completed call."""
+        if cost is None:
+            cost = estimate_cost(prompt_tokens, completion_tokens, model, cached_tokens)
+        with self._lock:
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+            self.cached_tokens += cached_tokens
+            self.cost += cost
+            self.calls += 1
+        if self.parent is not None:
+            self.parent.record(prompt_tokens, completion_tokens, model, cost, cached_tokens)
+
+    def record_response(self, response: Any, model: str = DEFAULT_MODEL) -> None:
+        """Records the usage reported on an OpenAI chat completion response."""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        self.record(
+            usage.prompt_tokens or 0,
+            usage.completion_tokens or 0,
+            model,
+            cached_tokens=cached_prompt_tokens(usage),
+        )
+
+    def can_afford(self, tokens: int, cost: float) -> bool:
+        """Whether this budget and all its parents can pay for a call."""
+        if self.max_tokens is not None and self.tokens + tokens > self.max_tokens:
+            return False
+        if self.max_cost is not None and self.cost + cost > self.max_cost:
+            return False
+        return self.parent is None or self.parent.can_afford(tokens, cost)
+
+    def check(self, prompt_tokens: int, completion_tokens: int, model: str = DEFAULT_MODEL) -> None:
+        """Raises BudgetExceededError if an estimated call would exceed the budget."""
+        cost = estimate_cost(prompt_tokens, completion_tokens, model)
+        if not self.can_afford(prompt_tokens + completion_tokens, cost):
+            raise BudgetExceededError(
+                f"Estimated {prompt_tokens + completion_tokens} tokens (${cost:.4f}) "
+                f"would exceed the budget ({self.summary()})"
+            )
+
+    def summary(self) -> str:
+        """Human readable usage against limits."""
+        tokens = f"{self.tokens} tokens"
+        if self.max_tokens is not None:
+            tokens += f" of {self.max_tokens}"
+        cost = f"${self.cost:.4f}"
+        if self.max_cost is not None:
+            cost += f" of ${self.max_cost:.2f}"
+        summary = f"{tokens}, {cost} over {self.calls} calls"
+        if self.cached_tokens:
+            share = self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+            summary += f", {self.cached_tokens} prompt tokens cached ({share:.0%})"
+        return summary
+
+
+def choose_model(
+    budget: Optional[Budget],
+    prompt_tokens: int,
+    completion_tokens: int,
+    models: tuple[str, ...] = (DEFAULT_MODEL, CHEAP_MODEL),
+) -> Optional[str]:
+    """Picks the first model whose estimated call fits the budget.
+
+    Returns:
+        The model to use, or None if no model fits
+    """
+    if budget is None:
+        return models[0]
+    for model in models:
+        cost = estimate_cost(prompt_tokens, completion_tokens, model)
+        if budget.can_afford(prompt_tokens + completion_tokens, cost):
+            return model
+    return None
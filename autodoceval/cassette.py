@@ -0,0 +1,126 @@
+"""Record/replay module for AutoDocEval's LLM calls."""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .file_tools import content_hash, read_file, write_file
+
+# Constants
+CASSETTE_VERSION = 1
+
+_active: Optional["Cassette"] = None
+
+
+class CassetteMissError(Exception):
+    """Raised when a replayed run makes a call the cassette has no recording of."""
+
+
+class Cassette:
+    """Records judge and rewrite calls to a file, or serves them back offline.
+
+    Each line of the cassette holds one call: its kind, a hash of the request,
+    the response fields the pipeline uses (including token usage) and the
+    latency of the original call. Requests are stored as hashes only, which
+    keeps cassettes small. Identical requests are replayed in recorded order,
+    and the last recording is repeated once they run out.
+
+    Args:
+        path: Cassette file to record to or replay from
+        mode: ``"record"`` or ``"replay"``
+        latency_scale: When replaying, sleep for the original latency times
+            this factor (0 replays instantly)
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency_scale: float = 0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.entries: list[dict[str, Any]] = []
+        self._recordings: dict[str, list[dict[str, Any]]] = {}
+        self._positions: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == "replay":
+            self.load()
+
+    def __enter__(self) -> "Cassette":
+        global _active
+        _active = self
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        global _active
+        if _active is self:
+            _active = None
+        if self.mode == "record":
+            self.save()
+
+    def load(self) -> None:
+        """Loads recorded calls from the cassette file."""
+        lines = read_file(self.path).splitlines()
+        header = json.loads(lines[0]) if lines else {}
+        if header.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette format: {self.path}")
+
+        self.entries = [json.loads(line) for line in lines[1:] if line.strip()]
+        self._recordings = {}
+        for entry in self.entries:
+            self._recordings.setdefault(entry["key"], []).append(entry)
+
+    def save(self) -> None:
+        """Writes the recorded calls to the cassette file."""
+        with self._lock:
+            lines = [json.dumps({"version": CASSETTE_VERSION})]
+            lines += [json.dumps(entry, separators=(",", ":")) for entry in self.entries]
+        write_file(self.path, "\n".join(lines) + "\n")
+
+    def call(self, kind: str, request: str, fn: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        """Records or replays one call.
+
+        Args:
+            kind: Kind of call, e.g. ``"judge"`` or ``"improve"``
+            request: Everything that determines the response
+            fn: Makes the real call and returns JSON-serialisable response fields
+
+        Returns:
+            The response fields
+        """
+        key = content_hash(f"{kind}\0{request}")
+        if self.mode == "replay":
+            return self._replay(kind, key)
+
+        start = time.perf_counter()
+        response = fn()
+        latency = time.perf_counter() - start
+        with self._lock:
+            self.entries.append(
+                {"kind": kind, "key": key, "latency": round(latency, 4), "response": response}
+            )
+        return response
+
+    def _replay(self, kind: str, key: str) -> dict[str, Any]:
+        with self._lock:
+            recordings = self._recordings.get(key)
+            if not recordings:
+                raise CassetteMissError(
+                    f"No recorded {kind} call for request {key[:12]} in {os.path.basename(self.path)}"
+                )
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            entry = recordings[min(position, len(recordings) - 1)]
+
+        if self.latency_scale:
+            time.sleep(entry["latency"] * self.latency_scale)
+        return entry["response"]
+
+
+def cassette_call(kind: str, request: str, fn: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+    """Routes a call through the active cassette, or just makes it when none is active."""
+    cassette = _active
+    if cassette is None:
+        return fn()
+    return cassette.call(kind, request, fn)
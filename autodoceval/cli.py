@@ -1,14 +1,67 @@
 """Command-line interface for AutoDocEval."""
 
 import argparse
+import contextlib
+import json
 import os
 import sys
+import time
 from typing import Optional
 
-from .auto_improve import auto_improve_document
-from .evaluator import evaluate_document
-from .file_tools import read_file, write_file
+from .auto_improve import (
+    auto_improve_document,
+    auto_improve_documents,
+    format_percentage,
+    format_results_table,
+)
+from .batch import collect_documents, format_shared_report, grade_documents
+from .budget import DEFAULT_MODEL, Budget, BudgetExceededError
+from .cassette import Cassette
+from .compact import compact_request, splice_sections
+from .deadline import Deadline, DeadlineExceededError, set_call_timeout
+from .evaluation_steps import StepsStore
+from .evaluator import clarity_fingerprint, evaluate_document, use_evaluation_steps
+from .file_tools import improved_output_path, read_file, write_file
+from .history import HistoryStore, default_history_path, recorded_grade, timed_call
 from .improver import improve_document
+from .object_store import ObjectStore, default_store_path
+from .profiling import Profiler
+from .results import ResultTable, format_table_summary
+from .session import Session
+from .sharding import (
+    default_shard_path,
+    format_merge_report,
+    grade_results,
+    improve_results,
+    merge_shards,
+    parse_shard,
+    select_shard,
+    update_score_cache,
+    write_grade_shard,
+    write_improve_shard,
+)
+
+# Constants
+# Options the daemon does not receive, so a delegated command would silently drop them
+LOCAL_ONLY_OPTIONS = (
+    ("--history", "history"),
+    ("--steps", "steps"),
+    ("--call-timeout", "call_timeout"),
+    ("--record", "record"),
+    ("--replay", "replay"),
+    ("--replay-latency", "replay_latency"),
+    ("--compact", "compact"),
+    ("--pipelined", "pipelined"),
+    ("--adaptive", "adaptive"),
+    ("--max-tokens", "max_tokens"),
+    ("--max-cost", "max_cost"),
+    ("--job-max-tokens", "job_max_tokens"),
+    ("--job-max-cost", "job_max_cost"),
+    ("--deadline", "deadline"),
+    ("--doc-deadline", "doc_deadline"),
+    ("--shard", "shard"),
+    ("--shard-output", "shard_output"),
+)
 
 
 def parse_args(args: Optional[list[str]] = None) -> argparse.Namespace:
@@ -17,19 +70,177 @@ def parse_args(args: Optional[list[str]] = None) -> argparse.Namespace:
         description="AutoDocEval - Evaluate and improve documentation in a closed-loop cycle"
     )
 
+    parser.add_argument(
+        "--server",
+        default=os.environ.get("AUTODOCEVAL_SERVER"),
+        help="Delegate to a running daemon (http://host:port or unix:/path/to/socket)",
+    )
+
+    parser.add_argument(
+        "--history",
+        default=os.environ.get("AUTODOCEVAL_HISTORY"),
+        help="SQLite database to record grade/improve/compare events in",
+    )
+
+    parser.add_argument(
+        "--steps",
+        default=os.environ.get("AUTODOCEVAL_STEPS"),
+        help="JSON file to reuse compiled GEval evaluation steps from (created on first grade)",
+    )
+
+    parser.add_argument(
+        "--store",
+        default=os.environ.get("AUTODOCEVAL_STORE"),
+        help="Object store directory to keep auto-improve iterations in instead of _iterN files",
+    )
+
+    parser.add_argument(
+        "--call-timeout",
+        type=float,
+        default=os.environ.get("AUTODOCEVAL_CALL_TIMEOUT"),
+        help="Seconds a single judge or rewrite call may take before it is abandoned",
+    )
+
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record", metavar="CASSETTE", help="Record every judge and rewrite call to a cassette"
+    )
+    cassette_group.add_argument(
+        "--replay", metavar="CASSETTE", help="Serve judge and rewrite calls from a cassette offline"
+    )
+    parser.add_argument(
+        "--replay-latency",
+        action="store_true",
+        help="Wait as long as the recorded calls took when replaying",
+    )
+
     # Create subparsers for different commands
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
     # Grade command
     grade_parser = subparsers.add_parser("grade", help="Evaluate documentation clarity")
-    grade_parser.add_argument("file", help="Path to the documentation file")
+    grade_parser.add_argument("file", nargs="?", help="Path to the documentation file")
     grade_parser.add_argument("--output", "-o", help="Path to save evaluation results")
+    grade_parser.add_argument(
+        "--git-diff",
+        metavar="BASE..HEAD",
+        help="Grade only documents changed in a commit range, with deltas against the base",
+    )
+    grade_parser.add_argument(
+        "--pattern", default="*.md", help="Filename pattern of documents for --git-diff"
+    )
+    grade_parser.add_argument(
+        "--cache", help="Score cache keyed by blob hash (default: inside the git directory)"
+    )
+
+    # Batch grade command
+    batch_parser = subparsers.add_parser(
+        "batch-grade", help="Evaluate many documents, grading near-duplicates once"
+    )
+    batch_parser.add_argument("paths", nargs="+", help="Files, directories or glob patterns")
+    batch_parser.add_argument(
+        "--no-dedupe", action="store_true", help="Grade every document individually"
+    )
+    batch_parser.add_argument(
+        "--max-distance",
+        type=int,
+        default=3,
+        help="Maximum SimHash distance (bits) between near-duplicates",
+    )
+    batch_parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Grade one extra member per cluster to verify shared results",
+    )
+    batch_parser.add_argument(
+        "--output", "-o", help="Path to save results as .json, .csv, .parquet or .arrow"
+    )
+    batch_parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Print score percentiles, a histogram and per-directory rollups",
+    )
+    batch_parser.add_argument(
+        "--deadline",
+        type=float,
+        help="Seconds the whole batch may take; documents not graded by then are reported",
+    )
+    add_shard_arguments(batch_parser)
+
+    # Docstring grading command
+    docstrings_parser = subparsers.add_parser(
+        "grade-docstrings", help="Grade the docstrings of Python packages, symbol by symbol"
+    )
+    docstrings_parser.add_argument(
+        "paths", nargs="+", help="Source files, package directories or glob patterns"
+    )
+    docstrings_parser.add_argument(
+        "--cache",
+        default=None,
+        help="Score cache keyed by symbol and docstring hash (default: .autodoceval/)",
+    )
+    docstrings_parser.add_argument(
+        "--no-cache", action="store_true", help="Grade every docstring, even unchanged ones"
+    )
+    docstrings_parser.add_argument(
+        "--workers", type=int, default=None, help="Parser processes (default: CPU count)"
+    )
+    docstrings_parser.add_argument(
+        "--jobs", "-j", type=int, default=4, help="Docstrings to grade concurrently"
+    )
+    docstrings_parser.add_argument("--output", "-o", help="Path to save per-symbol results (JSON)")
+
+    # Streaming corpus command
+    stream_parser = subparsers.add_parser(
+        "stream", help="Grade (and improve) a corpus as a stream with bounded memory"
+    )
+    stream_parser.add_argument("paths", nargs="+", help="Files or directories")
+    stream_parser.add_argument(
+        "--pattern", default="*.md", help="Filename pattern of documents in directories"
+    )
+    stream_parser.add_argument(
+        "--sections", action="store_true", help="Grade each markdown section on its own"
+    )
+    stream_parser.add_argument(
+        "--improve", action="store_true", help="Rewrite documents scoring below --target"
+    )
+    stream_parser.add_argument(
+        "--target", "-t", type=float, default=0.7, help="Score under which to improve"
+    )
+    stream_parser.add_argument("--read-workers", type=int, default=2, help="Threads reading files")
+    stream_parser.add_argument("--grade-workers", type=int, default=4, help="Threads grading")
+    stream_parser.add_argument(
+        "--improve-workers", type=int, default=2, help="Threads rewriting documents"
+    )
+    stream_parser.add_argument(
+        "--queue-size", type=int, default=16, help="Items buffered between two stages"
+    )
+
+    # Watch command
+    watch_parser = subparsers.add_parser(
+        "watch", help="Re-grade documents in a directory whenever they change"
+    )
+    watch_parser.add_argument("directory", help="Directory to watch")
+    watch_parser.add_argument(
+        "--pattern", default="*.md", help="Filename pattern of documents to grade"
+    )
+    watch_parser.add_argument(
+        "--debounce", type=float, default=0.5, help="Seconds to wait after the last save"
+    )
+    watch_parser.add_argument(
+        "--poll-interval", type=float, default=1.0, help="Seconds between polls without watchdog"
+    )
 
     # Improve command
     improve_parser = subparsers.add_parser("improve", help="Generate improved documentation")
     improve_parser.add_argument("file", help="Path to the documentation file")
     improve_parser.add_argument("--feedback", "-f", help="Path to feedback file from grade command")
     improve_parser.add_argument("--output", "-o", help="Path to save improved documentation")
+    improve_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Send only the sections the feedback mentions and report token savings",
+    )
 
     # Compare command
     compare_parser = subparsers.add_parser(
@@ -40,31 +251,496 @@ def parse_args(args: Optional[list[str]] = None) -> argparse.Namespace:
 
     # Auto-improve command
     auto_parser = subparsers.add_parser("auto-improve", help="Run auto-improvement loop")
-    auto_parser.add_argument("file", help="Path to the documentation file")
+    auto_parser.add_argument(
+        "files", nargs="+", help="Documentation files, directories or glob patterns"
+    )
     auto_parser.add_argument(
         "--iterations", "-i", type=int, default=3, help="Maximum number of improvement iterations"
     )
     auto_parser.add_argument(
         "--target", "-t", type=float, default=0.7, help="Target clarity score (0-1)"
     )
+    auto_parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Send only the sections the feedback mentions and report token savings",
+    )
+    auto_parser.add_argument(
+        "--pipelined",
+        action="store_true",
+        help="Speculatively start the next rewrite while the current one is graded",
+    )
+    auto_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=4,
+        help="Documents improved at once, which is also the cap on concurrent LLM calls",
+    )
+    auto_parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune concurrent LLM calls up to --jobs from latency and rate limits",
+    )
+    auto_parser.add_argument("--max-tokens", type=int, help="Token budget per document")
+    auto_parser.add_argument("--max-cost", type=float, help="Cost budget per document in USD")
+    auto_parser.add_argument("--job-max-tokens", type=int, help="Token budget for the whole run")
+    auto_parser.add_argument(
+        "--job-max-cost", type=float, help="Cost budget for the whole run in USD"
+    )
+    auto_parser.add_argument(
+        "--deadline",
+        type=float,
+        help="Seconds the whole run may take; the best versions so far are kept",
+    )
+    auto_parser.add_argument(
+        "--doc-deadline", type=float, help="Seconds each document's loop may take"
+    )
+    add_shard_arguments(auto_parser)
+
+    # Merge command
+    merge_parser = subparsers.add_parser(
+        "merge", help="Combine shard result files of a --shard run into one report"
+    )
+    merge_parser.add_argument("shards", nargs="+", help="Shard result files")
+    merge_parser.add_argument(
+        "--output", "-o", help="Path to save the merged report as .json, .csv, .parquet or .arrow"
+    )
+    merge_parser.add_argument(
+        "--cache", help="Blob score cache for grade --git-diff to add batch-grade scores to"
+    )
+
+    # Prioritize command
+    prioritize_parser = subparsers.add_parser(
+        "prioritize", help="Improve a corpus, spending calls where they gain the most"
+    )
+    prioritize_parser.add_argument(
+        "paths", nargs="+", help="Documentation files, directories or glob patterns"
+    )
+    prioritize_parser.add_argument(
+        "--traffic", help="CSV with a path column and a weight, traffic or views column"
+    )
+    prioritize_parser.add_argument(
+        "--target", "-t", type=float, default=0.7, help="Target clarity score (0-1)"
+    )
+    prioritize_parser.add_argument(
+        "--max-attempts", type=int, default=3, help="Maximum improvement steps per document"
+    )
+    prioritize_parser.add_argument(
+        "--workers", type=int, default=4, help="Improvement steps run at once"
+    )
+    prioritize_parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune concurrent LLM calls up to --workers from latency and rate limits",
+    )
+    prioritize_parser.add_argument(
+        "--deadline", type=float, help="Seconds after which no new work is started"
+    )
+    prioritize_parser.add_argument("--max-tokens", type=int, help="Token budget for the run")
+    prioritize_parser.add_argument("--max-cost", type=float, help="Cost budget for the run in USD")
+
+    # Materialize command
+    materialize_parser = subparsers.add_parser(
+        "materialize", help="Write iterations of a stored auto-improve run to files"
+    )
+    materialize_parser.add_argument(
+        "run", nargs="?", help="Run id or manifest path (lists stored runs when omitted)"
+    )
+    materialize_parser.add_argument(
+        "--iteration", type=int, help="Iteration to write (default: every iteration)"
+    )
+    materialize_parser.add_argument(
+        "--output", "-o", help="Path to write a single --iteration to instead of its _iterN path"
+    )
+
+    # Steps command
+    steps_parser = subparsers.add_parser(
+        "steps", help="Show or discard the compiled GEval evaluation steps"
+    )
+    steps_parser.add_argument(
+        "--discard", action="store_true", help="Discard the steps so the next grade recompiles them"
+    )
+
+    # History command
+    history_parser = subparsers.add_parser("history", help="Query recorded runs")
+    history_parser.add_argument("path", nargs="?", help="Show the score timeline of a document")
+    history_parser.add_argument(
+        "--top-regressed", action="store_true", help="Documents whose score dropped the most"
+    )
+    history_parser.add_argument(
+        "--slowest", action="store_true", help="Documents with the highest mean latency"
+    )
+    history_parser.add_argument("--limit", type=int, default=20, help="Maximum rows to show")
+
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        "serve", help="Run a grading daemon with warm sessions and a local API"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Host to bind")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Port to bind")
+    serve_parser.add_argument("--socket", help="Serve on a Unix socket instead of TCP")
+    serve_parser.add_argument("--workers", type=int, default=4, help="Maximum concurrent requests")
+    serve_parser.add_argument(
+        "--max-queue", type=int, default=32, help="Requests allowed to wait before rejecting"
+    )
+    serve_parser.add_argument(
+        "--rate-limit", type=float, help="Maximum LLM calls started per minute"
+    )
+    serve_parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune concurrent LLM calls up to --workers from latency and rate limits",
+    )
+
+    # Every command can be profiled
+    for subparser in subparsers.choices.values():
+        add_profile_arguments(subparser)
 
     return parser.parse_args(args)
 
 
+def add_shard_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the sharding options to a command parser."""
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Process only shard I of N, partitioned by document content hash",
+    )
+    parser.add_argument(
+        "--shard-output",
+        metavar="SHARD_JSON",
+        help="Shard result file for merge (default: autodoceval-shard-I-of-N.json)",
+    )
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the profiling options to a command parser."""
+    parser.add_argument(
+        "--profile",
+        metavar="TRACE_JSON",
+        help="Write a Chrome trace of pipeline stages here, with a text summary next to it",
+    )
+    parser.add_argument(
+        "--profile-cpu", action="store_true", help="Add cProfile hotspots to the profile summary"
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Add tracemalloc allocation sites to the profile summary",
+    )
+
+
+def run_remote(parsed_args: argparse.Namespace) -> int:
+    """Runs a command through a grading daemon instead of in-process."""
+    from .server import ServerClient
+
+    local_only = [
+        option
+        for option, dest in LOCAL_ONLY_OPTIONS
+        if getattr(parsed_args, dest, None) not in (None, False)
+    ]
+    if local_only:
+        print(f"❌ Error: {', '.join(local_only)} cannot be used with --server")
+        return 1
+
+    client = ServerClient(parsed_args.server)
+
+    if parsed_args.command == "grade":
+        if not parsed_args.file:
+            print("❌ Error: specify a file or --git-diff")
+            return 1
+        score, reason = client.grade(read_file(parsed_args.file))
+        print(f"Score: {score * 100:.1f}%")
+        print(f"Reasoning: {reason}")
+        if parsed_args.output:
+            write_file(parsed_args.output, reason)
+
+    elif parsed_args.command == "improve":
+        feedback = read_file(parsed_args.feedback) if parsed_args.feedback else None
+        improved_doc = client.improve(read_file(parsed_args.file), feedback)
+        output_path = parsed_args.output or improved_output_path(parsed_args.file)
+        write_file(output_path, improved_doc)
+        print(f"✅ Improved document saved to: {output_path}")
+
+    elif parsed_args.command == "compare":
+        result = client.compare(read_file(parsed_args.original), read_file(parsed_args.improved))
+        print(f"Original score: {result['original_score'] * 100:.1f}%")
+        print(f"Improved score: {result['improved_score'] * 100:.1f}%")
+        print(f"Difference: {result['difference'] * 100:.1f}%")
+
+    elif parsed_args.command == "auto-improve":
+        for file_path in collect_documents(parsed_args.files):
+            versions = client.auto_improve(file_path, parsed_args.iterations, parsed_args.target)
+            for path, score in versions:
+                print(f"{path}: {score * 100:.1f}%")
+
+    else:
+        print(f"❌ Error: {parsed_args.command} cannot be delegated to a server")
+        return 1
+
+    return 0
+
+
+def print_history(parsed_args: argparse.Namespace) -> int:
+    """Prints history query results."""
+    store = HistoryStore(parsed_args.history or default_history_path())
+    try:
+        if parsed_args.top_regressed:
+            for row in store.top_regressed(limit=parsed_args.limit):
+                print(
+                    f"{row['path']}: {row['previous_score'] * 100:.1f}% → "
+                    f"{row['last_score'] * 100:.1f}% (-{row['regression'] * 100:.1f}%)"
+                )
+        elif parsed_args.slowest:
+            for row in store.slowest(limit=parsed_args.limit):
+                print(f"{row['path']}: {row['mean_latency']:.2f}s mean over {row['events']} events")
+        elif parsed_args.path:
+            for row in store.timeline(parsed_args.path, limit=parsed_args.limit):
+                score = f"{row['score'] * 100:.1f}%" if row["score"] is not None else "-"
+                latency = f"{row['latency']:.2f}s" if row["latency"] is not None else "-"
+                print(
+                    f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row['created_at']))} "
+                    f"{row['kind']:<8} {score:>7} {latency:>8} {row['content_hash'][:12]}"
+                )
+        else:
+            print("Please specify a document path, --top-regressed or --slowest.")
+            return 1
+        return 0
+    finally:
+        store.close()
+
+
+def default_steps_path() -> str:
+    """Evaluation steps file used by the steps command when none is given."""
+    return os.path.join(os.path.expanduser("~"), ".autodoceval", "evaluation_steps.json")
+
+
+def print_steps(parsed_args: argparse.Namespace) -> int:
+    """Shows or discards the compiled evaluation steps of the clarity metric."""
+    path = parsed_args.steps or default_steps_path()
+    store = StepsStore(path)
+    fingerprint = clarity_fingerprint()
+
+    if parsed_args.discard:
+        if store.discard(fingerprint):
+            print(f"🗑️ Discarded compiled evaluation steps in {path}")
+        else:
+            print(f"No compiled evaluation steps in {path}")
+        return 0
+
+    entry = store.get(fingerprint)
+    if entry is None or not entry["evaluation_steps"]:
+        print(f"No compiled evaluation steps in {path}; the next grade with --steps adds them.")
+        return 0
+
+    print(f"{entry['name']} ({entry['criteria']}), revision {entry['revision']}:")
+    for number, step in enumerate(entry["evaluation_steps"], start=1):
+        print(f"{number}. {step}")
+    return 0
+
+
+def merge_command(parsed_args: argparse.Namespace) -> int:
+    """Merges shard result files into one report, and optionally a score cache."""
+    try:
+        merged = merge_shards(parsed_args.shards)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    print(format_merge_report(merged))
+    output_format = os.path.splitext(parsed_args.output or "")[1].lower()
+
+    if merged["command"] == "batch-grade":
+        table = grade_results(merged)
+        try:
+            print(format_table_summary(table))
+            if parsed_args.output:
+                write_grade_results(parsed_args.output, table, merged["clusters"])
+        finally:
+            table.close()
+        if parsed_args.cache:
+            added = update_score_cache(merged, parsed_args.cache)
+            print(f"💾 Added {added} new score(s) to {parsed_args.cache}")
+        return 0
+
+    results = improve_results(merged)
+    print(format_results_table(results))
+    for path, versions in results.items():
+        if isinstance(versions, Exception):
+            print(f"❌ {path}: {versions}")
+    if parsed_args.output:
+        if output_format not in ("", ".json"):
+            print("❌ Error: merged auto-improve results can only be saved as .json")
+            return 1
+        write_file(parsed_args.output, json.dumps(merged["results"], indent=2))
+    return 0
+
+
+def write_grade_results(file_path: str, table: ResultTable, clusters: dict[str, list[str]]) -> None:
+    """Writes batch-grade results as JSON with the clusters, or in the table's own formats."""
+    if os.path.splitext(file_path)[1].lower() not in ("", ".json"):
+        table.write(file_path)
+        return
+    report = {
+        "results": {path: {"score": score, "reason": reason} for path, score, reason in table},
+        "clusters": clusters,
+    }
+    write_file(file_path, json.dumps(report, indent=2))
+
+
+def format_concurrency_report(session: Session) -> str:
+    """Formats where adaptive concurrency settled and what moved it."""
+    metrics = session.stats()
+    return (
+        f"🎚️ Concurrency limit {metrics['concurrency_limit']} "
+        f"(max {session.adaptive.max_limit}), {metrics['rate_limited']} rate limited, "
+        f"{metrics['latency_spikes']} latency spikes, "
+        f"{len(metrics['limit_history'])} adjustments"
+    )
+
+
+def materialize_command(parsed_args: argparse.Namespace) -> int:
+    """Lists stored runs, or writes iterations of one run to files."""
+    store = ObjectStore(parsed_args.store or default_store_path())
+
+    if not parsed_args.run:
+        runs = store.runs()
+        if not runs:
+            print(f"No stored runs in {store.root}")
+        for manifest in runs:
+            scores = " → ".join(
+                format_percentage(version["score"]) if version["score"] is not None else "-"
+                for version in manifest["versions"]
+            )
+            print(f"{manifest['run']}  {os.path.relpath(manifest['source'])}  {scores}")
+        return 0
+
+    try:
+        written = store.materialize(parsed_args.run, parsed_args.iteration, parsed_args.output)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+    for path in written:
+        print(f"✅ Wrote {path}")
+    return 0
+
+
+def open_cassette(parsed_args: argparse.Namespace) -> contextlib.AbstractContextManager:
+    """Returns the cassette selected with --record or --replay, or a no-op context."""
+    if parsed_args.record:
+        return Cassette(parsed_args.record, mode="record")
+    if parsed_args.replay:
+        return Cassette(
+            parsed_args.replay,
+            mode="replay",
+            latency_scale=1.0 if parsed_args.replay_latency else 0.0,
+        )
+    return contextlib.nullcontext()
+
+
 def main(args: Optional[list[str]] = None) -> int:
     """Main entry point for the CLI."""
     parsed_args = parse_args(args)
 
+    use_evaluation_steps(parsed_args.steps)
+    set_call_timeout(parsed_args.call_timeout)
+
+    with open_cassette(parsed_args):
+        profile_path = getattr(parsed_args, "profile", None)
+        if not profile_path:
+            return run_command(parsed_args)
+
+        profiler = Profiler(cpu=parsed_args.profile_cpu, memory=parsed_args.profile_memory)
+        try:
+            with profiler, profiler.span(parsed_args.command, "cli"):
+                return run_command(parsed_args)
+        finally:
+            trace_path, summary_path = profiler.write(profile_path)
+            print(f"⏱️ Profile written to {trace_path} and {summary_path}")
+
+
+def run_command(parsed_args: argparse.Namespace) -> int:
+    """Runs the command selected on the command line."""
+    # Delegate to a running daemon, which holds the API key itself; grade --git-diff
+    # reads the local repository, so it always runs in-process
+    remote_commands = ("grade", "improve", "compare", "auto-improve")
+    if (
+        parsed_args.server
+        and parsed_args.command in remote_commands
+        and not getattr(parsed_args, "git_diff", None)
+    ):
+        return run_remote(parsed_args)
+
+    # Local queries need no API key
+    if parsed_args.command == "history":
+        return print_history(parsed_args)
+    if parsed_args.command == "steps":
+        return print_steps(parsed_args)
+    if parsed_args.command == "merge":
+        return merge_command(parsed_args)
+    if parsed_args.command == "materialize":
+        return materialize_command(parsed_args)
+
+    shard, shard_output = None, None
+    if getattr(parsed_args, "shard", None):
+        try:
+            shard = parse_shard(parsed_args.shard)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        shard_output = parsed_args.shard_output or default_shard_path(*shard)
+
+    # Replayed calls never reach OpenAI, but clients are still constructed
+    if parsed_args.replay:
+        os.environ.setdefault("OPENAI_API_KEY", "replay")
+
     # Ensure OPENAI_API_KEY is set
     if not os.environ.get("OPENAI_API_KEY"):
         print("❌ Error: OPENAI_API_KEY environment variable not set")
         return 1
 
+    history = HistoryStore(parsed_args.history) if parsed_args.history else None
+    try:
+        return run_local(parsed_args, history, shard, shard_output)
+    finally:
+        if history is not None:
+            history.close()
+
+
+def run_local(
+    parsed_args: argparse.Namespace,
+    history: Optional[HistoryStore],
+    shard: Optional[tuple[int, int]],
+    shard_output: Optional[str],
+) -> int:
+    """Runs a command that calls the LLM in-process."""
     # Process commands
-    if parsed_args.command == "grade":
+    if parsed_args.command == "grade" and parsed_args.git_diff:
+        from .git_diff import format_changed_report, grade_changed_documents
+
+        # Grade only what changed, reusing scores of content graded before
+        results = grade_changed_documents(
+            parsed_args.git_diff,
+            pattern=parsed_args.pattern,
+            cache_path=parsed_args.cache,
+            grade=evaluate_document,
+            history=history,
+        )
+        report = format_changed_report(results)
+        print(report)
+        if parsed_args.output:
+            write_file(parsed_args.output, report)
+
+    elif parsed_args.command == "grade" and not parsed_args.file:
+        print("❌ Error: specify a file or --git-diff")
+        return 1
+
+    elif parsed_args.command == "grade":
         # Evaluate document
         doc_content = read_file(parsed_args.file)
-        score, reason = evaluate_document(doc_content)
+        score, reason = recorded_grade(
+            history, "grade", parsed_args.file, doc_content, evaluate_document
+        )
 
         # Print results
         print(f"Score: {score * 100:.1f}%")
@@ -74,6 +750,111 @@ def main(args: Optional[list[str]] = None) -> int:
         if parsed_args.output:
             write_file(parsed_args.output, reason)
 
+    elif parsed_args.command == "batch-grade":
+        # Evaluate documents, sharing results between near-duplicates
+        paths = collect_documents(parsed_args.paths)
+        if shard is not None:
+            paths = select_shard(paths, *shard)
+            print(f"🧩 Shard {shard[0]}/{shard[1]}: {len(paths)} documents")
+        options = {}
+        if parsed_args.deadline is not None:
+            options["deadline"] = Deadline(parsed_args.deadline)
+        table, clusters = grade_documents(
+            paths,
+            dedupe=not parsed_args.no_dedupe,
+            max_distance=parsed_args.max_distance,
+            verify=parsed_args.verify,
+            history=history,
+            **options,
+        )
+        try:
+            scores = dict(zip(table.paths, table.scores))
+            for path in paths:
+                if path in scores:
+                    print(f"{path}: {scores[path] * 100:.1f}%")
+                else:
+                    print(f"{path}: ⏰ not graded before the deadline")
+            print(format_shared_report(clusters))
+
+            if parsed_args.summary:
+                print(format_table_summary(table))
+            if parsed_args.output:
+                write_grade_results(parsed_args.output, table, clusters)
+
+            if shard is not None:
+                write_grade_shard(shard_output, shard, table, clusters)
+                print(f"🧩 Shard results saved to: {shard_output}")
+        finally:
+            table.close()
+
+    elif parsed_args.command == "grade-docstrings":
+        from .docstrings import (
+            collect_docstrings,
+            default_cache_path,
+            docstring_report,
+            format_docstring_report,
+            grade_docstrings,
+        )
+
+        docstrings, errors = collect_docstrings(parsed_args.paths, workers=parsed_args.workers)
+        for path, error in errors.items():
+            print(f"⚠️ Skipped {path}: {error}")
+        cache_path = None if parsed_args.no_cache else parsed_args.cache or default_cache_path()
+        grades, failures = grade_docstrings(
+            docstrings, cache_path=cache_path, jobs=parsed_args.jobs
+        )
+        print(format_docstring_report(grades, failures))
+        if parsed_args.output:
+            write_file(parsed_args.output, docstring_report(grades))
+
+    elif parsed_args.command == "stream":
+        from .streaming import corpus_pipeline, format_item, format_stream_stats
+
+        pipeline = corpus_pipeline(
+            parsed_args.paths,
+            pattern=parsed_args.pattern,
+            sections=parsed_args.sections,
+            improve=parsed_args.improve,
+            target_score=parsed_args.target,
+            read_workers=parsed_args.read_workers,
+            grade_workers=parsed_args.grade_workers,
+            improve_workers=parsed_args.improve_workers,
+            queue_size=parsed_args.queue_size,
+            history=history,
+        )
+        for item in pipeline.run():
+            print(format_item(item))
+        print(format_stream_stats(pipeline.stats()))
+        for stage, item, error in pipeline.errors:
+            label = item.label if hasattr(item, "label") else item
+            print(f"❌ {stage} failed{f' for {label}' if label else ''}: {error}")
+        if pipeline.errors:
+            return 1
+
+    elif parsed_args.command == "watch":
+        # Import here so watch-only dependencies stay optional
+        from .watch import DocumentWatcher
+
+        DocumentWatcher(
+            parsed_args.directory,
+            pattern=parsed_args.pattern,
+            debounce=parsed_args.debounce,
+            poll_interval=parsed_args.poll_interval,
+        ).run()
+
+    elif parsed_args.command == "serve":
+        from .server import serve
+
+        serve(
+            host=parsed_args.host,
+            port=parsed_args.port,
+            socket_path=parsed_args.socket,
+            workers=parsed_args.workers,
+            max_queue=parsed_args.max_queue,
+            calls_per_minute=parsed_args.rate_limit,
+            adaptive=parsed_args.adaptive,
+        )
+
     elif parsed_args.command == "improve":
         # Read document
         doc_content = read_file(parsed_args.file)
@@ -82,35 +863,152 @@ def main(args: Optional[list[str]] = None) -> int:
         if parsed_args.feedback:
             feedback = read_file(parsed_args.feedback)
         else:
-            _, feedback = evaluate_document(doc_content)
+            _, feedback = recorded_grade(
+                history, "grade", parsed_args.file, doc_content, evaluate_document
+            )
 
         # Improve document
-        improved_doc = improve_document(doc_content, feedback)
+        if parsed_args.compact:
+            request = compact_request(doc_content, feedback)
+            print(request.report())
+            rewritten, latency, _ = timed_call(
+                None, improve_document, request.doc, request.feedback
+            )
+            improved_doc = splice_sections(request, rewritten)
+        else:
+            improved_doc, latency, _ = timed_call(None, improve_document, doc_content, feedback)
+        if history is not None:
+            history.record(
+                "improve", parsed_args.file, doc_content, model=DEFAULT_MODEL, latency=latency
+            )
 
         # Determine output path
-        if parsed_args.output:
-            output_path = parsed_args.output
-        else:
-            dir_name = os.path.dirname(parsed_args.file)
-            base_name = os.path.basename(parsed_args.file)
-            filename, ext = os.path.splitext(base_name)
-            output_path = os.path.join(dir_name, f"{filename}_improved{ext}")
+        output_path = parsed_args.output or improved_output_path(parsed_args.file)
 
         # Save improved document
         write_file(output_path, improved_doc)
         print(f"✅ Improved document saved to: {output_path}")
 
     elif parsed_args.command == "auto-improve":
-        # Run auto-improvement loop
-        auto_improve_document(
-            parsed_args.file, max_iterations=parsed_args.iterations, target_score=parsed_args.target
+        paths = collect_documents(parsed_args.files)
+        if shard is not None:
+            paths = select_shard(paths, *shard)
+            print(f"🧩 Shard {shard[0]}/{shard[1]}: {len(paths)} documents")
+
+        # Document budgets nest inside the job budget
+        job_budget = None
+        if any(
+            limit is not None
+            for limit in (
+                parsed_args.max_tokens,
+                parsed_args.max_cost,
+                parsed_args.job_max_tokens,
+                parsed_args.job_max_cost,
+            )
+        ):
+            job_budget = Budget(parsed_args.job_max_tokens, parsed_args.job_max_cost)
+
+        session = None
+        if parsed_args.adaptive:
+            session = Session(max_concurrency=parsed_args.jobs, adaptive_concurrency=True)
+        store = ObjectStore(parsed_args.store) if parsed_args.store else None
+        job_deadline = Deadline(parsed_args.deadline) if parsed_args.deadline is not None else None
+
+        if len(paths) == 1:
+            budget = None
+            if job_budget is not None:
+                budget = job_budget.child(parsed_args.max_tokens, parsed_args.max_cost)
+            # A single loop only needs a session of its own to tune concurrency
+            options = {"session": session} if session is not None else {}
+            if store is not None:
+                options["store"] = store
+            if job_deadline is not None or parsed_args.doc_deadline is not None:
+                options["deadline"] = Deadline(parsed_args.doc_deadline, parent=job_deadline)
+
+            # Run auto-improvement loop
+            try:
+                versions = auto_improve_document(
+                    paths[0],
+                    max_iterations=parsed_args.iterations,
+                    target_score=parsed_args.target,
+                    budget=budget,
+                    compact=parsed_args.compact,
+                    pipelined=parsed_args.pipelined,
+                    history=history,
+                    **options,
+                )
+            except DeadlineExceededError as e:
+                print(f"⏰ {e} before the original document was graded")
+                versions = e
+            except BudgetExceededError as e:
+                print(f"💰 Budget exhausted before the original document was graded: {e}")
+                versions = e
+            results = {paths[0]: versions}
+        else:
+            # Run the loops concurrently with output labelled per document
+            results = auto_improve_documents(
+                paths,
+                max_iterations=parsed_args.iterations,
+                target_score=parsed_args.target,
+                jobs=parsed_args.jobs,
+                session=session,
+                store=store,
+                job_budget=job_budget,
+                max_tokens=parsed_args.max_tokens,
+                max_cost=parsed_args.max_cost,
+                compact=parsed_args.compact,
+                pipelined=parsed_args.pipelined,
+                history=history,
+                deadline=job_deadline,
+                document_timeout=parsed_args.doc_deadline,
+            )
+            print("\n📊 Results:")
+            print(format_results_table(results))
+            if job_budget is not None:
+                print(f"💰 Job usage: {job_budget.summary()}")
+        if session is not None:
+            print(format_concurrency_report(session))
+
+        if shard is not None:
+            write_improve_shard(shard_output, shard, results)
+            print(f"🧩 Shard results saved to: {shard_output}")
+        if any(isinstance(versions, Exception) for versions in results.values()):
+            return 1
+
+    elif parsed_args.command == "prioritize":
+        from .scheduler import PriorityScheduler, format_schedule_report, load_traffic
+
+        budget = None
+        if parsed_args.max_tokens is not None or parsed_args.max_cost is not None:
+            budget = Budget(parsed_args.max_tokens, parsed_args.max_cost)
+        session = None
+        if parsed_args.adaptive:
+            session = Session(max_concurrency=parsed_args.workers, adaptive_concurrency=True)
+
+        scheduler = PriorityScheduler(
+            target_score=parsed_args.target,
+            max_attempts=parsed_args.max_attempts,
+            workers=parsed_args.workers,
+            deadline=Deadline(parsed_args.deadline) if parsed_args.deadline is not None else None,
+            budget=budget,
+            session=session,
+            history=history,
         )
+        weights = load_traffic(parsed_args.traffic) if parsed_args.traffic else None
+        states = scheduler.run(collect_documents(parsed_args.paths), weights)
+
+        print(f"\n📊 Results ({scheduler.stop_reason}):")
+        print(format_schedule_report(states, scheduler.failures))
+        if budget is not None:
+            print(f"💰 Usage: {budget.summary()}")
+        if parsed_args.adaptive:
+            print(format_concurrency_report(scheduler.session))
 
     elif parsed_args.command == "compare":
         # Import here to avoid circular imports
         from .compare import compare_documents
 
-        compare_documents(parsed_args.original, parsed_args.improved)
+        compare_documents(parsed_args.original, parsed_args.improved, history=history)
 
     else:
         print("Please specify a command. Use --help for available commands.")
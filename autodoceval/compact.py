@@ -0,0 +1,163 @@
+"""Prompt compaction module for AutoDocEval."""
+
+import re
+from typing import NamedTuple
+
+from .budget import estimate_tokens
+from .dedup import shingles
+from .file_tools import split_sections
+from .improver import create_improvement_prompt
+from .profiling import span
+
+# Constants
+DUPLICATE_SIMILARITY = 0.6  # Jaccard similarity of shingles above which points are merged
+MIN_TITLE_WORD_LENGTH = 4
+
+_SENTENCE_PATTERN = re.compile(r"(?<=[^\d\s][.!?])\s+|\n+")
+_BULLET_PATTERN = re.compile(r"^\s*(?:[-*]|\d+[.)])\s+")
+_MARKER = "<!-- section {} -->"
+_MARKER_PATTERN = re.compile(r"^<!-- section (\d+) -->[ \t]*\n?", re.MULTILINE)
+_HEADING_PATTERN = re.compile(r"^\s*#+\s*(?:\d+[.)]?\s*)?(.*?)\s*#*\s*$")
+_STOPWORDS = {"about", "with", "from", "this", "that", "your", "using", "guide", "section"}
+
+
+class CompactRequest(NamedTuple):
+    """An improvement request reduced to the parts the feedback is about."""
+
+    doc: str
+    feedback: str
+    sections: list[str]
+    selected: list[int]
+    full_tokens: int
+    compact_tokens: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.full_tokens - self.compact_tokens
+
+    def report(self) -> str:
+        """One-line summary of the token savings."""
+        saved = self.saved_tokens / self.full_tokens * 100 if self.full_tokens else 0.0
+        return (
+            f"✂️ Prompt compacted: {self.full_tokens} → {self.compact_tokens} tokens "
+            f"({saved:.1f}% saved, {len(self.selected)}/{len(self.sections)} sections sent)"
+        )
+
+
+def feedback_points(feedback: str) -> list[str]:
+    """Splits feedback into individual sentences or bullet points."""
+    points = (_BULLET_PATTERN.sub("", point).strip() for point in _SENTENCE_PATTERN.split(feedback))
+    return [point for point in points if point]
+
+
+def compact_feedback(feedback: str) -> str:
+    """Removes points that repeat an earlier point of the same feedback."""
+    kept: list[tuple[str, set[str]]] = []
+    for point in feedback_points(feedback):
+        signature = shingles(point, size=2)
+        if any(
+            signature and len(signature & seen) / len(signature | seen) >= DUPLICATE_SIMILARITY
+            for _, seen in kept
+        ):
+            continue
+        kept.append((point, signature))
+    return " ".join(point for point, _ in kept)
+
+
+def feedback_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of two feedback texts' word shingles (0-1)."""
+    first, second = shingles(a, size=2), shingles(b, size=2)
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def section_title(section: str) -> str:
+    """Returns the heading text of a section, or an empty string for the preamble."""
+    first_line = section.split("\n", 1)[0]
+    if not first_line.lstrip().startswith("#"):
+        return ""
+    return _HEADING_PATTERN.match(first_line).group(1).strip()
+
+
+def is_mentioned(title: str, feedback: str) -> bool:
+    """Whether feedback refers to a section by its title or all its significant words."""
+    if not title:
+        return False
+    feedback = feedback.lower()
+    if title.lower() in feedback:
+        return True
+    words = [
+        word
+        for word in re.findall(r"\w+", title.lower())
+        if len(word) >= MIN_TITLE_WORD_LENGTH and word not in _STOPWORDS
+    ]
+    return bool(words) and all(word in feedback for word in words)
+
+
+def compact_request(doc: str, feedback: str) -> CompactRequest:
+    """Builds the smallest improvement request that still covers the feedback.
+
+    Sections whose titles the feedback mentions are sent with numbered markers;
+    the rest are left out and spliced back unchanged by ``splice_sections``.
+    Feedback that names no section is treated as applying to the whole document.
+    """
+    with span("compact_request", "prompt"):
+        return _compact_request(doc, feedback)
+
+
+def _compact_request(doc: str, feedback: str) -> CompactRequest:
+    sections = split_sections(doc)
+    full_tokens = estimate_tokens(create_improvement_prompt(feedback, doc))
+    feedback = compact_feedback(feedback) or feedback
+    selected = [
+        i for i, section in enumerate(sections) if is_mentioned(section_title(section), feedback)
+    ]
+
+    if not selected or len(selected) == len(sections):
+        selected = list(range(len(sections)))
+        excerpt = doc
+    else:
+        excerpt = (
+            "(Excerpt: rewrite only these sections and keep every section marker line.)\n\n"
+            + "".join(f"{_MARKER.format(i)}\n{sections[i]}" for i in selected)
+        )
+
+    compact_tokens = estimate_tokens(create_improvement_prompt(feedback, excerpt))
+    if compact_tokens >= full_tokens and excerpt != doc:
+        # Markers cost more than the sections they save on small documents
+        selected = list(range(len(sections)))
+        excerpt = doc
+        compact_tokens = estimate_tokens(create_improvement_prompt(feedback, doc))
+
+    return CompactRequest(
+        doc=excerpt,
+        feedback=feedback,
+        sections=sections,
+        selected=selected,
+        full_tokens=full_tokens,
+        compact_tokens=compact_tokens,
+    )
+
+
+def splice_sections(request: CompactRequest, rewritten: str) -> str:
+    """Puts rewritten sections back into the original document.
+
+    Sections the model dropped (missing markers) keep their original text.
+    """
+    if len(request.selected) == len(request.sections):
+        return rewritten
+
+    parts = _MARKER_PATTERN.split(rewritten)
+    replacements = {int(parts[i]): parts[i + 1] for i in range(1, len(parts) - 1, 2)}
+
+    result = []
+    for i, section in enumerate(request.sections):
+        replacement = replacements.get(i) if i in request.selected else None
+        if replacement is None:
+            result.append(section)
+        else:
+            if section.endswith("\n") and not replacement.endswith("\n"):
+                replacement += "\n"
+            result.append(replacement)
+    return "".join(result)
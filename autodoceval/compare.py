@@ -1,9 +1,11 @@
 """Document comparison module for AutoDocEval."""
 
 import os
+from typing import Optional
 
 from .evaluator import evaluate_document, interpret_score
 from .file_tools import read_file
+from .history import HistoryStore, recorded_grade
 
 
 def format_percentage(score: float) -> str:
@@ -11,7 +13,9 @@ def format_percentage(score: float) -> str:
     return f"{score * 100:.1f}%"
 
 
-def compare_documents(original_path: str, improved_path: str) -> None:
+def compare_documents(
+    original_path: str, improved_path: str, history: Optional[HistoryStore] = None
+) -> None:
     """Compares original and improved documents."""
     if not os.path.exists(original_path):
         raise FileNotFoundError(f"Missing original document: {original_path}")
@@ -24,13 +28,17 @@ def compare_documents(original_path: str, improved_path: str) -> None:
     improved_doc = read_file(improved_path)
 
     # Evaluate original
-    original_score, original_reason = evaluate_document(original_doc)
+    original_score, original_reason = recorded_grade(
+        history, "compare", original_path, original_doc, evaluate_document
+    )
     print(f"Original document: {original_path}")
     print(f"Score: {format_percentage(original_score)}")
     print(f"This document has {interpret_score(original_score)}")
 
     # Evaluate improved
-    improved_score, improved_reason = evaluate_document(improved_doc)
+    improved_score, improved_reason = recorded_grade(
+        history, "compare", improved_path, improved_doc, evaluate_document
+    )
     print(f"\nImproved document: {improved_path}")
     print(f"Score: {format_percentage(improved_score)}")
     print(f"This document has {interpret_score(improved_score)}")
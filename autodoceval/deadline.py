@@ -0,0 +1,167 @@
+"""Deadline and call timeout module for AutoDocEval."""
+
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+# Constants
+POLL_INTERVAL = 0.1  # Seconds between cancellation checks while waiting on a call
+
+_call_timeout: Optional[float] = None
+_local = threading.local()
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a deadline passes, or is cancelled, before or during a call."""
+
+
+class Deadline:
+    """Point in time by which work must finish.
+
+    A deadline may have a parent (e.g. a per-document deadline inside a
+    job-wide one); it expires when it or any deadline in the chain does, or
+    when one of them is cancelled. Activating a deadline in a thread caps the
+    timeout of every LLM call made there at the time remaining.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, parent: Optional["Deadline"] = None):
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self.parent = parent
+        self._cancelled = threading.Event()
+
+    def child(self, seconds: Optional[float] = None) -> "Deadline":
+        """Creates a deadline that also respects this one."""
+        return Deadline(seconds, parent=self)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the chain, or None when nothing in it has a time limit."""
+        remaining = None
+        deadline: Optional[Deadline] = self
+        while deadline is not None:
+            if deadline._cancelled.is_set():
+                return 0.0
+            if deadline.expires_at is not None:
+                left = max(deadline.expires_at - time.monotonic(), 0.0)
+                remaining = left if remaining is None else min(remaining, left)
+            deadline = deadline.parent
+        return remaining
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cancel(self) -> None:
+        """Expires this deadline, and every child of it, now."""
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """Raises DeadlineExceededError if the deadline has passed."""
+        if self.expired:
+            raise DeadlineExceededError("Deadline reached")
+
+    @contextlib.contextmanager
+    def active(self) -> Iterator["Deadline"]:
+        """Makes this the deadline of LLM calls made by the current thread."""
+        previous = getattr(_local, "deadline", None)
+        _local.deadline = self
+        try:
+            yield self
+        finally:
+            _local.deadline = previous
+
+
+def activate(deadline: Optional[Deadline]) -> contextlib.AbstractContextManager:
+    """Activates a deadline, or does nothing when there is none."""
+    return deadline.active() if deadline is not None else contextlib.nullcontext()
+
+
+def current_deadline() -> Optional[Deadline]:
+    """The deadline active in the current thread, if any."""
+    return getattr(_local, "deadline", None)
+
+
+def set_call_timeout(seconds: Optional[float]) -> None:
+    """Sets how long any single judge or rewrite call may take, or None for no limit."""
+    global _call_timeout
+    _call_timeout = seconds
+
+
+def call_timeout() -> Optional[float]:
+    """Seconds the next LLM call may take: the call timeout capped by the active deadline.
+
+    Raises:
+        DeadlineExceededError: If the active deadline has already passed
+    """
+    deadline = current_deadline()
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceededError("Deadline reached before the call started")
+    limits = [limit for limit in (_call_timeout, remaining) if limit is not None]
+    return min(limits) if limits else None
+
+
+def call_with_timeout(
+    fn: Callable[[], Any],
+    timeout: Optional[float],
+    on_abandoned: Optional[Callable[[Any], None]] = None,
+) -> Any:
+    """Runs a blocking call, giving up on it once the timeout or active deadline passes.
+
+    Without a timeout or an active deadline the call runs directly. Otherwise it
+    runs on a daemon thread: a call that is given up on, including when its
+    deadline is cancelled, keeps running there until it returns, but its result
+    is discarded and the caller moves on immediately. The provider still bills
+    such a call, so when it does return its result is passed to ``on_abandoned``
+    (on the daemon thread), e.g. to record its token usage on a budget.
+    """
+    deadline = current_deadline()
+    if timeout is None and deadline is None:
+        return fn()
+
+    future: Future = Future()
+    lock = threading.Lock()
+    abandoned = False
+
+    def run() -> None:
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            return
+        with lock:
+            late = abandoned
+            future.set_result(result)
+        if late and on_abandoned is not None:
+            on_abandoned(result)
+
+    def give_up(message: str) -> DeadlineExceededError:
+        nonlocal abandoned
+        with lock:
+            abandoned = True
+            finished = future.done() and future.exception() is None
+        # A result that arrived before the call was given up on is handed over here instead
+        if finished and on_abandoned is not None:
+            on_abandoned(future.result())
+        return DeadlineExceededError(message)
+
+    threading.Thread(target=run, daemon=True).start()
+    give_up_at = time.monotonic() + timeout if timeout is not None else None
+    while True:
+        left = give_up_at - time.monotonic() if give_up_at is not None else POLL_INTERVAL
+        if left <= 0:
+            raise give_up(f"Call did not finish within {timeout:.1f}s")
+        if deadline is not None and deadline.expired:
+            raise give_up("Deadline reached during the call")
+        try:
+            result = future.result(timeout=min(left, POLL_INTERVAL))
+        except FutureTimeoutError:
+            continue
+        # A result arriving after the deadline was cancelled or passed is discarded too
+        if deadline is not None and deadline.expired:
+            raise give_up("Deadline reached during the call")
+        return result
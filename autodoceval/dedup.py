@@ -0,0 +1,133 @@
+"""Near-duplicate detection module for AutoDocEval."""
+
+import hashlib
+import re
+from collections.abc import Iterable
+from typing import Optional
+
+# Constants
+DEFAULT_SHINGLE_SIZE = 5
+DEFAULT_MAX_DISTANCE = 3  # Hamming distance between 64-bit fingerprints
+FINGERPRINT_BITS = 64
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> set[str]:
+    """Returns the set of word shingles (n-grams) of a document."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i : i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _hash64(value: str) -> int:
+    """Stable 64-bit hash of a string."""
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> int:
+    """Computes a 64-bit SimHash fingerprint over the document's shingles."""
+    return simhash_sections([text], size)
+
+
+def simhash_sections(sections: Iterable[str], size: int = DEFAULT_SHINGLE_SIZE) -> int:
+    """Computes a SimHash fingerprint from a stream of document sections.
+
+    Shingles do not span section boundaries, so a document never has to be held
+    in memory as a whole.
+    """
+    weights = [0] * FINGERPRINT_BITS
+    for section in sections:
+        for shingle in shingles(section, size):
+            value = _hash64(shingle)
+            for bit in range(FINGERPRINT_BITS):
+                weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return bin(a ^ b).count("1")
+
+
+class SimHashIndex:
+    """Index of SimHash fingerprints supporting near-duplicate lookups.
+
+    Fingerprints are split into ``max_distance + 1`` bands. By the pigeonhole
+    principle two fingerprints within ``max_distance`` bits of each other share
+    at least one identical band, so only documents sharing a band are compared.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.num_bands = max_distance + 1
+        self.band_bits = -(-FINGERPRINT_BITS // self.num_bands)
+        self.fingerprints: dict[str, int] = {}
+        self._buckets: dict[tuple[int, int], list[str]] = {}
+
+    def _bands(self, fingerprint: int) -> list[tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [
+            (band, fingerprint >> (band * self.band_bits) & mask) for band in range(self.num_bands)
+        ]
+
+    def add(self, key: str, fingerprint: int) -> None:
+        """Adds a fingerprint to the index under the given key."""
+        self.fingerprints[key] = fingerprint
+        for band in self._bands(fingerprint):
+            self._buckets.setdefault(band, []).append(key)
+
+    def query(self, fingerprint: int) -> list[str]:
+        """Returns keys within ``max_distance`` bits of the fingerprint, closest first."""
+        candidates = {
+            key for band in self._bands(fingerprint) for key in self._buckets.get(band, [])
+        }
+        matches = [
+            (hamming_distance(fingerprint, self.fingerprints[key]), key)
+            for key in candidates
+            if hamming_distance(fingerprint, self.fingerprints[key]) <= self.max_distance
+        ]
+        return [key for _, key in sorted(matches)]
+
+
+def cluster_documents(
+    docs: dict[str, str], max_distance: int = DEFAULT_MAX_DISTANCE
+) -> dict[str, list[str]]:
+    """Groups near-duplicate documents into clusters.
+
+    Args:
+        docs: Mapping of document path to content
+        max_distance: Maximum Hamming distance between fingerprints of near-duplicates
+
+    Returns:
+        Mapping of representative path to the paths it represents (itself first)
+    """
+    return cluster_fingerprints(
+        {path: simhash(content) for path, content in docs.items()}, max_distance
+    )
+
+
+def cluster_fingerprints(
+    fingerprints: dict[str, int], max_distance: int = DEFAULT_MAX_DISTANCE
+) -> dict[str, list[str]]:
+    """Groups precomputed fingerprints into near-duplicate clusters."""
+    index = SimHashIndex(max_distance)
+    clusters: dict[str, list[str]] = {}
+
+    for path, fingerprint in fingerprints.items():
+        matches = index.query(fingerprint)
+        representative: Optional[str] = matches[0] if matches else None
+
+        if representative is None:
+            index.add(path, fingerprint)
+            clusters[path] = [path]
+        else:
+            clusters[representative].append(path)
+
+    return clusters
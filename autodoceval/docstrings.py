@@ -0,0 +1,258 @@
+"""Python docstring grading module for AutoDocEval."""
+
+import ast
+import glob
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, NamedTuple, Optional, Union
+
+from .file_tools import content_hash, read_file
+from .git_diff import BlobScoreCache
+
+if TYPE_CHECKING:
+    from .session import Session
+
+# Constants
+SOURCE_PATTERN = "*.py"
+DEFAULT_JOBS = 4
+PARALLEL_MIN_FILES = 16  # Fewer files are parsed in-process; a pool costs more to start
+PARSE_CHUNK_SIZE = 8
+HASH_LENGTH = 16
+
+
+class Docstring(NamedTuple):
+    """Docstring of a module, class or function."""
+
+    qualname: str
+    kind: str  # "module", "class" or "function"
+    path: str
+    line: int
+    text: str
+
+    @property
+    def id(self) -> str:
+        """Qualified name plus content hash; changes whenever the docstring does."""
+        return f"{self.qualname}@{content_hash(self.text)[:HASH_LENGTH]}"
+
+    def document(self) -> str:
+        """Text sent to the judge: the docstring under a heading naming its symbol."""
+        return f"# `{self.qualname}` ({self.kind})\n\n{self.text}\n"
+
+
+class DocstringGrade(NamedTuple):
+    """Grade of one docstring."""
+
+    docstring: Docstring
+    score: float
+    reason: str
+    cached: bool
+
+
+def module_name(path: str) -> str:
+    """Dotted module name of a source file, from the packages (``__init__.py``) above it.
+
+    The name depends only on where the file sits, not on the path or glob it
+    was found through.
+    """
+    directory, file_name = os.path.split(os.path.abspath(path))
+    parts = [os.path.splitext(file_name)[0]]
+    if parts[0] == "__init__":
+        parts = []
+    while os.path.exists(os.path.join(directory, "__init__.py")):
+        directory, package = os.path.split(directory)
+        parts.insert(0, package)
+    return ".".join(parts)
+
+
+def source_files(paths: list[str]) -> list[str]:
+    """Expands files, directories and glob patterns into a sorted list of source files."""
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            files.update(glob.glob(os.path.join(path, "**", SOURCE_PATTERN), recursive=True))
+        elif os.path.exists(path):
+            files.add(path)
+        else:
+            matches = glob.glob(path, recursive=True)
+            if not matches:
+                raise FileNotFoundError(f"File not found: {path}")
+            files.update(matches)
+    return sorted(files)
+
+
+def extract_docstrings(path: str, module: str) -> list[Docstring]:
+    """Parses a source file and returns its module, class and function docstrings.
+
+    Nested definitions are named by the path of definitions enclosing them,
+    e.g. ``package.module.Class.method``.
+    """
+    tree = ast.parse(read_file(path), filename=path)
+    docstrings = []
+    text = ast.get_docstring(tree)
+    if text:
+        docstrings.append(Docstring(module, "module", path, 1, text))
+
+    def visit(body: list[ast.stmt], prefix: str) -> None:
+        for node in body:
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = f"{prefix}.{node.name}"
+                text = ast.get_docstring(node)
+                if text:
+                    kind = "class" if isinstance(node, ast.ClassDef) else "function"
+                    docstrings.append(Docstring(qualname, kind, path, node.lineno, text))
+                visit(node.body, qualname)
+
+    visit(tree.body, module)
+    return docstrings
+
+
+def _extract(source: tuple[str, str]) -> Union[list[Docstring], str]:
+    """Pool worker: docstrings of one file, or the error that stopped parsing it."""
+    path, module = source
+    try:
+        return extract_docstrings(path, module)
+    except (SyntaxError, ValueError, UnicodeDecodeError) as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def collect_docstrings(
+    paths: list[str], workers: Optional[int] = None
+) -> tuple[list[Docstring], dict[str, str]]:
+    """Walks source trees and extracts their docstrings, parsing files in a process pool.
+
+    Args:
+        paths: Source files, package directories or glob patterns
+        workers: Parser processes (defaults to the CPU count)
+
+    Returns:
+        Tuple containing (docstrings in file and source order, parse errors by path)
+    """
+    sources = [(path, module_name(path)) for path in source_files(paths)]
+
+    if len(sources) < PARALLEL_MIN_FILES or workers == 1:
+        extracted = [_extract(source) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            extracted = list(executor.map(_extract, sources, chunksize=PARSE_CHUNK_SIZE))
+
+    docstrings: list[Docstring] = []
+    errors: dict[str, str] = {}
+    for (path, _), result in zip(sources, extracted):
+        if isinstance(result, str):
+            errors[path] = result
+        else:
+            docstrings.extend(result)
+    return docstrings, errors
+
+
+def default_cache_path() -> str:
+    """Docstring score cache used when none is given."""
+    return os.path.join(".autodoceval", "docstring-scores.json")
+
+
+def grade_docstrings(
+    docstrings: list[Docstring],
+    cache_path: Optional[str] = None,
+    jobs: int = DEFAULT_JOBS,
+    session: Optional["Session"] = None,
+) -> tuple[list[DocstringGrade], dict[str, Exception]]:
+    """Grades docstrings, skipping those whose id is already in the score cache.
+
+    A docstring whose grading fails is left out of the grades and kept with
+    its error; the others are still graded, and cached as they finish.
+
+    Args:
+        docstrings: Docstrings to grade
+        cache_path: Score cache keyed by docstring id; nothing is cached when omitted
+        jobs: Docstrings graded concurrently
+        session: Optional session whose warm clients and cache are reused
+
+    Returns:
+        Tuple containing (one grade per graded docstring in the order given,
+        errors by docstring id)
+    """
+    if session is None:
+        # Import here to avoid circular imports
+        from .session import Session
+
+        session = Session(max_concurrency=jobs)
+    cache = BlobScoreCache(cache_path) if cache_path else None
+
+    grades: dict[str, tuple[float, str]] = {}
+    failures: dict[str, Exception] = {}
+    cached = set()
+    pending: dict[str, Docstring] = {}
+    for docstring in docstrings:
+        hit = cache.get(docstring.id) if cache is not None else None
+        if hit is not None:
+            grades[docstring.id] = hit
+            cached.add(docstring.id)
+        else:
+            pending.setdefault(docstring.id, docstring)
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                docstring_id: executor.submit(session.grade, docstring.document())
+                for docstring_id, docstring in pending.items()
+            }
+            for docstring_id, future in futures.items():
+                try:
+                    grades[docstring_id] = future.result()
+                except Exception as e:
+                    failures[docstring_id] = e
+                    print(f"❌ {pending[docstring_id].qualname}: {e}")
+                    continue
+                if cache is not None:
+                    cache.put(docstring_id, *grades[docstring_id])
+    finally:
+        # Keep what was graded even when the run is interrupted
+        if cache is not None and pending:
+            cache.save()
+
+    results = [
+        DocstringGrade(docstring, *grades[docstring.id], docstring.id in cached)
+        for docstring in docstrings
+        if docstring.id in grades
+    ]
+    return results, failures
+
+
+def format_docstring_report(
+    grades: list[DocstringGrade], failures: Optional[dict[str, Exception]] = None
+) -> str:
+    """Formats per-symbol scores, lowest first, a summary line and failed symbols."""
+    failed = [f"❌ Failed: {symbol}: {error}" for symbol, error in sorted((failures or {}).items())]
+    if not grades:
+        return "\n".join(["No docstrings graded.", *failed]) if failed else "No docstrings found."
+
+    lines = []
+    for grade in sorted(grades, key=lambda grade: grade.score):
+        docstring = grade.docstring
+        lines.append(
+            f"{docstring.path}:{docstring.line} {docstring.qualname}: {grade.score * 100:.1f}%"
+        )
+    mean = sum(grade.score for grade in grades) / len(grades)
+    reused = sum(grade.cached for grade in grades)
+    lines.append(
+        f"\n📚 {len(grades)} docstrings, mean {mean * 100:.1f}%, "
+        f"{len(grades) - reused} graded, {reused} unchanged since the last run"
+    )
+    return "\n".join(lines + failed)
+
+
+def docstring_report(grades: list[DocstringGrade]) -> str:
+    """Returns per-symbol results as JSON, keyed by docstring id."""
+    report = {
+        grade.docstring.id: {
+            "symbol": grade.docstring.qualname,
+            "kind": grade.docstring.kind,
+            "path": grade.docstring.path,
+            "line": grade.docstring.line,
+            "score": grade.score,
+            "reason": grade.reason,
+        }
+        for grade in grades
+    }
+    return json.dumps(report, indent=2)
@@ -0,0 +1,90 @@
+"""Persisted GEval evaluation steps module for AutoDocEval."""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from .file_tools import content_hash, read_file, write_file
+
+# Constants
+STEPS_FORMAT_VERSION = 1
+
+
+def metric_fingerprint(name: str, criteria: str, evaluation_params: list[str]) -> str:
+    """Identifies a metric configuration; steps are only reused for the same one."""
+    return content_hash(json.dumps([name, criteria, sorted(evaluation_params)]))[:16]
+
+
+class StepsStore:
+    """JSON file of compiled GEval evaluation steps, one entry per metric configuration.
+
+    GEval asks the judge model to turn ``criteria`` into evaluation steps
+    whenever it is built without them. Storing the steps of the first run and
+    passing them to later evaluators skips that call and keeps grading
+    consistent between runs. Each entry records the metric configuration it
+    was compiled for and a revision that increases when steps are replaced.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._metrics: dict[str, dict[str, Any]] = {}
+        if os.path.exists(path):
+            data = json.loads(read_file(path))
+            if data.get("format") != STEPS_FORMAT_VERSION:
+                raise ValueError(f"Unsupported evaluation steps format: {path}")
+            self._metrics = data.get("metrics", {})
+
+    def get(self, fingerprint: str) -> Optional[dict[str, Any]]:
+        """Returns the stored entry of a metric configuration, or None."""
+        with self._lock:
+            return self._metrics.get(fingerprint)
+
+    def load(self, fingerprint: str) -> Optional[list[str]]:
+        """Returns the stored steps of a metric configuration, or None."""
+        entry = self.get(fingerprint)
+        if entry is None or not entry["evaluation_steps"]:
+            return None
+        return list(entry["evaluation_steps"])
+
+    def save(
+        self,
+        fingerprint: str,
+        steps: list[str],
+        name: str,
+        criteria: str,
+        evaluation_params: list[str],
+    ) -> int:
+        """Stores steps for a metric configuration and returns their revision."""
+        with self._lock:
+            previous = self._metrics.get(fingerprint)
+            if previous is not None and previous["evaluation_steps"] == steps:
+                return previous["revision"]
+            revision = previous["revision"] + 1 if previous else 1
+            self._metrics[fingerprint] = {
+                "name": name,
+                "criteria": criteria,
+                "evaluation_params": evaluation_params,
+                "revision": revision,
+                "evaluation_steps": list(steps),
+                "compiled_at": time.time(),
+            }
+            data = {"format": STEPS_FORMAT_VERSION, "metrics": self._metrics}
+            write_file(self.path, json.dumps(data, indent=2))
+            return revision
+
+    def discard(self, fingerprint: str) -> bool:
+        """Forgets the steps of a metric configuration so the next run compiles new ones.
+
+        The entry and its revision are kept, so recompiled steps get the next revision.
+        """
+        with self._lock:
+            entry = self._metrics.get(fingerprint)
+            if entry is None or not entry["evaluation_steps"]:
+                return False
+            entry["evaluation_steps"] = None
+            data = {"format": STEPS_FORMAT_VERSION, "metrics": self._metrics}
+            write_file(self.path, json.dumps(data, indent=2))
+            return True
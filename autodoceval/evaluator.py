@@ -1,35 +1,122 @@
 """Document evaluation module for AutoDocEval."""
 
 import os
+from typing import TYPE_CHECKING, Any, Optional
 
 from deepeval.metrics import GEval
 from deepeval.test_case import LLMTestCase, LLMTestCaseParams
 
+from .cassette import cassette_call
+from .deadline import call_timeout, call_with_timeout
+from .evaluation_steps import StepsStore, metric_fingerprint
+from .profiling import span
+
+if TYPE_CHECKING:
+    from .budget import Budget
+
+# Constants
+METRIC_NAME = "Clarity"
+METRIC_CRITERIA = "clarity"
+EVALUATION_PARAMS = [LLMTestCaseParams.INPUT, LLMTestCaseParams.ACTUAL_OUTPUT]
+
+_steps_store: Optional[StepsStore] = None
+_judge_model: Optional[str] = None
+
+
+def use_evaluation_steps(path: Optional[str]) -> Optional[StepsStore]:
+    """Loads compiled evaluation steps from a file and saves newly compiled ones to it.
+
+    Passing None stops reusing steps.
+    """
+    global _steps_store
+    _steps_store = StepsStore(path) if path else None
+    return _steps_store
+
+
+def clarity_fingerprint() -> str:
+    """Fingerprint of the clarity metric configuration."""
+    return metric_fingerprint(
+        METRIC_NAME, METRIC_CRITERIA, [param.value for param in EVALUATION_PARAMS]
+    )
+
 
 def setup_evaluator() -> GEval:
-    """Creates and configures the GEval evaluator."""
+    """Creates and configures the GEval evaluator, reusing compiled steps when available."""
     os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
-    return GEval(
-        name="Clarity",
-        criteria="clarity",
-        evaluation_params=[LLMTestCaseParams.INPUT, LLMTestCaseParams.ACTUAL_OUTPUT],
+    global _judge_model
+    steps = _steps_store.load(clarity_fingerprint()) if _steps_store is not None else None
+    evaluator = GEval(
+        name=METRIC_NAME,
+        criteria=METRIC_CRITERIA,
+        evaluation_params=EVALUATION_PARAMS,
+        evaluation_steps=steps,
     )
+    _judge_model = getattr(evaluator, "evaluation_model", None)
+    return evaluator
+
+
+def judge_model() -> Optional[str]:
+    """Model GEval grades with, known once an evaluator has been set up."""
+    return _judge_model
 
 
-def evaluate_document(doc_content: str) -> tuple[float, str]:
+def remember_evaluation_steps(evaluator: GEval) -> None:
+    """Saves the steps GEval compiled during a measurement, if steps are being reused."""
+    steps = getattr(evaluator, "evaluation_steps", None)
+    if _steps_store is None or not isinstance(steps, list) or not steps:
+        return
+    _steps_store.save(
+        clarity_fingerprint(),
+        steps,
+        METRIC_NAME,
+        METRIC_CRITERIA,
+        [param.value for param in EVALUATION_PARAMS],
+    )
+
+
+def evaluate_document(
+    doc_content: str, evaluator: Optional[GEval] = None, budget: Optional["Budget"] = None
+) -> tuple[float, str]:
     """Evaluates a document for clarity and returns score and reasoning.
 
     Args:
         doc_content: The document content to evaluate
+        evaluator: Optional pre-configured evaluator to reuse
+        budget: Optional budget to record the judge's token usage on
 
     Returns:
         Tuple containing (score, reasoning)
     """
-    evaluator = setup_evaluator()
-    test_case = LLMTestCase(input="Evaluate for clarity", actual_output=doc_content)
-    evaluator.measure(test_case)
 
-    return evaluator.score, evaluator.reason
+    def judge() -> dict[str, Any]:
+        nonlocal evaluator
+        if evaluator is None:
+            with span("setup_evaluator", "deepeval"):
+                evaluator = setup_evaluator()
+        with span("build_test_case", "deepeval"):
+            test_case = LLMTestCase(input="Evaluate for clarity", actual_output=doc_content)
+        with span("judge", "llm"):
+            evaluator.measure(test_case)
+        remember_evaluation_steps(evaluator)
+        return {
+            "score": evaluator.score,
+            "reason": evaluator.reason,
+            "input_tokens": getattr(evaluator, "input_tokens", None) or 0,
+            "output_tokens": getattr(evaluator, "output_tokens", None) or 0,
+            "cost": getattr(evaluator, "evaluation_cost", None),
+        }
+
+    def charge(result: dict[str, Any]) -> None:
+        if budget is not None:
+            budget.record(result["input_tokens"], result["output_tokens"], cost=result["cost"])
+
+    # GEval takes no timeout, so the judge is abandoned once the call timeout or deadline
+    # passes; an abandoned judge is still charged to the budget when it finishes
+    timeout = call_timeout()
+    result = cassette_call("judge", doc_content, lambda: call_with_timeout(judge, timeout, charge))
+    charge(result)
+
+    return result["score"], result["reason"]
 
 
 def interpret_score(score: float) -> str:
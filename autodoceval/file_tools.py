@@ -1,8 +1,18 @@
 """File handling utilities for AutoDocEval."""
 
+import hashlib
+import io
+import mmap
 import os
 import sys
-from typing import Optional
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import Optional, Union
+
+from .profiling import span
+
+DEFAULT_ENCODING = "utf-8"
+SECTION_MARKERS = "#`~\n"  # Bytes iter_sections looks for in the raw file
 
 
 def resolve_path(path: Optional[str], default_path: Optional[str] = None) -> str:
@@ -15,6 +25,14 @@ def resolve_path(path: Optional[str], default_path: Optional[str] = None) -> str
     return os.path.abspath(file_path) if not os.path.isabs(file_path) else file_path
 
 
+def improved_output_path(file_path: str) -> str:
+    """Default output path of an improved document, next to the original."""
+    dir_name = os.path.dirname(file_path)
+    base_name = os.path.basename(file_path)
+    filename, ext = os.path.splitext(base_name)
+    return os.path.join(dir_name, f"{filename}_improved{ext}")
+
+
 def get_input_path(
     args: Optional[list[str]] = None,
     default_dir: Optional[str] = None,
@@ -44,16 +62,114 @@ def get_derived_paths(
     return {"results_path": results_path, "improved_path": improved_path, "filename": filename}
 
 
-def read_file(file_path: str) -> str:
+def content_hash(content: str) -> str:
+    """Returns a stable SHA-256 hex digest of document content."""
+    return hashlib.sha256(content.encode(DEFAULT_ENCODING)).hexdigest()
+
+
+def read_file(file_path: str, encoding: str = DEFAULT_ENCODING) -> str:
     """Reads a file and returns its contents."""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
-    with open(file_path) as f:
+    with span("read_file", "io", path=file_path), open(file_path, encoding=encoding) as f:
         return f.read()
 
 
-def write_file(file_path: str, content: str) -> None:
-    """Writes content to a file, creating directories if needed."""
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    with open(file_path, "w") as f:
-        f.write(content)
+def split_sections(text: str) -> list[str]:
+    """Splits markdown text before each heading outside fenced code blocks.
+
+    Concatenating the returned sections reproduces the text exactly.
+    """
+    data = text.encode(DEFAULT_ENCODING)
+    return [
+        data[start:end].decode(DEFAULT_ENCODING) for start, end in _section_bounds(io.BytesIO(data))
+    ]
+
+
+def iter_sections(file_path: str, encoding: str = DEFAULT_ENCODING) -> Iterator[str]:
+    """Yields the markdown sections of a file one at a time.
+
+    The file is memory-mapped and split like ``split_sections``, so only the
+    section being yielded is decoded into memory. Headings and fences are found
+    in the raw bytes, so the encoding must be ASCII-compatible.
+
+    Raises:
+        ValueError: If the encoding does not store ASCII characters as single bytes
+    """
+    if not SECTION_MARKERS.encode(encoding).endswith(SECTION_MARKERS.encode("ascii")):
+        raise ValueError(f"iter_sections needs an ASCII-compatible encoding, not {encoding}")
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    if os.path.getsize(file_path) == 0:
+        return
+
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start, end in _section_bounds(iter(mm.readline, b"")):
+            yield mm[start:end].decode(encoding)
+
+
+def _section_bounds(lines: Iterable[bytes]) -> Iterator[tuple[int, int]]:
+    """Yields the byte offsets of each section, splitting before headings outside fences."""
+    start = offset = 0
+    in_fence = False
+    for line in lines:
+        stripped = line.lstrip()
+        if stripped.startswith((b"```", b"~~~")):
+            in_fence = not in_fence
+        elif not in_fence and stripped.startswith(b"#") and offset > start:
+            yield start, offset
+            start = offset
+        offset += len(line)
+    if offset > start:
+        yield start, offset
+
+
+def write_file(file_path: str, content: str, encoding: str = DEFAULT_ENCODING) -> None:
+    """Writes content to a file atomically, creating directories if needed.
+
+    Content goes to a temporary file in the target directory which then replaces
+    the target, so an interrupted run never leaves a truncated file behind.
+    """
+    with span("write_file", "io", path=file_path):
+        _write_atomic(file_path, content, encoding)
+
+
+def _write_atomic(
+    file_path: str, content: Union[str, bytes], encoding: Optional[str] = None
+) -> None:
+    """Writes text, or bytes when given bytes, through a synced temporary file."""
+    dir_name = os.path.dirname(file_path) or "."
+    os.makedirs(dir_name, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(
+        dir=dir_name, prefix=".tmp-", suffix=os.path.basename(file_path)
+    )
+    try:
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(file_path):
+            os.chmod(temp_path, os.stat(file_path).st_mode & 0o777)
+        else:
+            os.chmod(temp_path, 0o666 & ~_current_umask())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _current_umask() -> int:
+    """Reads the process umask, which can only be read by setting it."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
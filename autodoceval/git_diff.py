@@ -0,0 +1,222 @@
+"""Git-aware grading module for AutoDocEval."""
+
+import fnmatch
+import hashlib
+import json
+import os
+import subprocess
+from typing import Callable, NamedTuple, Optional
+
+from .batch import DEFAULT_PATTERN
+from .evaluator import evaluate_document
+from .file_tools import write_file
+from .history import HistoryStore, recorded_grade
+
+# Constants
+CACHE_FILE = "autodoceval-blob-scores.json"
+
+
+class ChangedDocument(NamedTuple):
+    """Grade of a document changed in a commit range."""
+
+    path: str
+    status: str  # "added", "modified" or "deleted"
+    score: Optional[float]
+    reason: Optional[str]
+    base_score: Optional[float]
+
+    @property
+    def delta(self) -> Optional[float]:
+        if self.score is None or self.base_score is None:
+            return None
+        return self.score - self.base_score
+
+
+def git(*args: str, cwd: Optional[str] = None) -> str:
+    """Runs a git command and returns its output."""
+    try:
+        result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise ValueError(f"git {' '.join(args)} failed: {e.stderr.strip()}") from e
+    return result.stdout
+
+
+def parse_range(spec: str, cwd: Optional[str] = None) -> tuple[str, str]:
+    """Splits ``base..head`` into its revisions; a missing head means HEAD.
+
+    ``base...head`` compares the head with its merge base with ``base``, as
+    ``git diff`` does, so only what the head's branch changed is included.
+    """
+    symmetric = "..." in spec
+    base, _, head = spec.partition("..." if symmetric else "..")
+    if not base:
+        raise ValueError(f"Invalid commit range: {spec}")
+    head = head or "HEAD"
+    if symmetric:
+        base = git("merge-base", base, head, cwd=cwd).strip()
+    return base, head
+
+
+def changed_documents(
+    base: str, head: str, pattern: str = DEFAULT_PATTERN, cwd: Optional[str] = None
+) -> list[tuple[str, str]]:
+    """Lists (status, path) of documents matching a pattern that differ between two revisions.
+
+    Renames are reported as a deletion plus an addition.
+    """
+    output = git("diff", "--name-status", "--no-renames", "-z", base, head, cwd=cwd)
+    fields = output.split("\0")
+    statuses = {"A": "added", "M": "modified", "D": "deleted", "T": "modified"}
+    changed = []
+    for status, path in zip(fields[::2], fields[1::2]):
+        if status[:1] in statuses and fnmatch.fnmatch(os.path.basename(path), pattern):
+            changed.append((statuses[status[:1]], path))
+    return changed
+
+
+def blob_hashes(rev: str, paths: list[str], cwd: Optional[str] = None) -> dict[str, str]:
+    """Returns the blob hash of each path that exists at a revision."""
+    if not paths:
+        return {}
+    output = git("ls-tree", "--full-tree", "-r", "-z", rev, "--", *paths, cwd=cwd)
+    hashes = {}
+    for entry in output.split("\0"):
+        if entry:
+            meta, path = entry.split("\t", 1)
+            hashes[path] = meta.split()[2]
+    return hashes
+
+
+def blob_hash(data: bytes) -> str:
+    """Returns the hash git gives a blob of these bytes, without running git.
+
+    Hash a file's raw bytes: text read with newline translation (e.g. CRLF
+    files) no longer matches the blob git stores.
+    """
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class BlobScoreCache:
+    """Scores keyed by git blob hash, persisted as JSON.
+
+    A blob hash identifies file content exactly, so a score stays valid for
+    every commit and path the same content appears at.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.scores: dict[str, list] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.scores = json.load(f)
+
+    def get(self, blob: str) -> Optional[tuple[float, str]]:
+        """Returns the cached (score, reason) of a blob, or None."""
+        cached = self.scores.get(blob)
+        return (cached[0], cached[1]) if cached is not None else None
+
+    def put(self, blob: str, score: float, reason: str) -> None:
+        """Caches the grade of a blob."""
+        self.scores[blob] = [score, reason]
+
+    def save(self) -> None:
+        """Writes the cache to disk."""
+        write_file(self.path, json.dumps(self.scores))
+
+
+def default_cache_path(cwd: Optional[str] = None) -> str:
+    """Cache location inside the repository's git directory."""
+    git_dir = git("rev-parse", "--absolute-git-dir", cwd=cwd).strip()
+    return os.path.join(git_dir, CACHE_FILE)
+
+
+def grade_changed_documents(
+    commit_range: str,
+    pattern: str = DEFAULT_PATTERN,
+    cache_path: Optional[str] = None,
+    cwd: Optional[str] = None,
+    grade: Callable[..., tuple[float, str]] = evaluate_document,
+    history: Optional[HistoryStore] = None,
+) -> list[ChangedDocument]:
+    """Grades the documents changed in a commit range and compares them with the base.
+
+    Content is read from git objects, so neither revision needs to be checked
+    out. Blobs already in the cache are never graded again, and deleted
+    documents are not graded at all; their base score is reported only when
+    it is already cached.
+
+    Args:
+        commit_range: ``base..head`` or ``base...head`` (head defaults to HEAD)
+        pattern: Filename pattern of documents to grade
+        cache_path: Score cache file, defaulting to one in the git directory
+        cwd: Directory inside the repository
+        grade: Function grading document content
+        history: Optional store to record every grade that is not cached in
+
+    Returns:
+        One result per changed document, in path order
+    """
+    base, head = parse_range(commit_range, cwd)
+    changed = changed_documents(base, head, pattern, cwd)
+    paths = [path for _, path in changed]
+    head_blobs = blob_hashes(head, paths, cwd)
+    base_blobs = blob_hashes(base, paths, cwd)
+    cache = BlobScoreCache(cache_path or default_cache_path(cwd))
+    # Git reports paths relative to the top of the work tree, not to ``cwd``
+    top = git("rev-parse", "--show-toplevel", cwd=cwd).strip() if history is not None else ""
+
+    def grade_blob(path: str, blob: Optional[str]) -> Optional[tuple[float, str]]:
+        if blob is None:
+            return None
+        cached = cache.get(blob)
+        if cached is None:
+            doc = git("cat-file", "blob", blob, cwd=cwd)
+            cached = recorded_grade(history, "grade", os.path.join(top, path), doc, grade)
+            cache.put(blob, *cached)
+        return cached
+
+    results = []
+    try:
+        for status, path in sorted(changed, key=lambda change: change[1]):
+            if status == "deleted":
+                # Nothing left to grade; the old score is shown only if it is already known
+                cached = cache.get(base_blobs[path]) if path in base_blobs else None
+                results.append(
+                    ChangedDocument(path, status, None, None, cached[0] if cached else None)
+                )
+                continue
+            # Base first, so the head is the latest grade of the path in the history
+            base_grade = grade_blob(path, base_blobs.get(path))
+            head_grade = grade_blob(path, head_blobs.get(path))
+            results.append(
+                ChangedDocument(
+                    path,
+                    status,
+                    head_grade[0] if head_grade else None,
+                    head_grade[1] if head_grade else None,
+                    base_grade[0] if base_grade else None,
+                )
+            )
+    finally:
+        cache.save()
+    return results
+
+
+def format_changed_report(results: list[ChangedDocument]) -> str:
+    """Formats changed documents with their score deltas against the base revision."""
+    if not results:
+        return "No changed documents."
+
+    lines = []
+    for result in results:
+        if result.status == "deleted" and result.base_score is None:
+            lines.append(f"{result.path}: deleted")
+        elif result.status == "deleted":
+            lines.append(f"{result.path}: deleted (was {result.base_score * 100:.1f}%)")
+        elif result.delta is None:
+            lines.append(f"{result.path}: {result.score * 100:.1f}% (new)")
+        else:
+            lines.append(
+                f"{result.path}: {result.score * 100:.1f}% ({result.delta * 100:+.1f}% vs base)"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,267 @@
+"""Run history store module for AutoDocEval."""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from .budget import Budget
+from .file_tools import content_hash
+
+# Constants
+DEFAULT_CRITERION = "clarity"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    model TEXT,
+    latency REAL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cached_tokens INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_path ON events (path, created_at);
+CREATE INDEX IF NOT EXISTS events_hash ON events (content_hash);
+
+CREATE TABLE IF NOT EXISTS scores (
+    event_id INTEGER NOT NULL REFERENCES events (id),
+    criterion TEXT NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (event_id, criterion)
+) WITHOUT ROWID;
+
+-- One row per document and criterion, maintained on insert so rankings never scan events
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT NOT NULL,
+    criterion TEXT NOT NULL,
+    last_score REAL NOT NULL,
+    previous_score REAL,
+    regression REAL NOT NULL DEFAULT 0,
+    events INTEGER NOT NULL DEFAULT 0,
+    total_latency REAL NOT NULL DEFAULT 0,
+    mean_latency REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (path, criterion)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS documents_regression ON documents (criterion, regression);
+CREATE INDEX IF NOT EXISTS documents_latency ON documents (criterion, mean_latency);
+"""
+
+
+def default_history_path() -> str:
+    """History database used when none is given explicitly."""
+    return os.path.join(os.path.expanduser("~"), ".autodoceval", "history.db")
+
+
+class HistoryStore:
+    """Embedded SQLite store of grade, improve and compare events.
+
+    Every event keeps the document path, content hash, per-criterion scores,
+    model, latency and token usage. A per-document summary table is updated on
+    each insert so regression and latency rankings are index lookups.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_history_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+    def record(
+        self,
+        kind: str,
+        path: str,
+        content: str,
+        scores: Optional[dict[str, float]] = None,
+        model: Optional[str] = None,
+        latency: Optional[float] = None,
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None,
+        timestamp: Optional[float] = None,
+        cached_tokens: Optional[int] = None,
+    ) -> int:
+        """Records an event and returns its id."""
+        timestamp = time.time() if timestamp is None else timestamp
+        path = os.path.abspath(path)
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO events (kind, path, content_hash, model, latency, prompt_tokens,"
+                " completion_tokens, cached_tokens, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    kind,
+                    path,
+                    content_hash(content),
+                    model,
+                    latency,
+                    prompt_tokens,
+                    completion_tokens,
+                    cached_tokens,
+                    timestamp,
+                ),
+            )
+            event_id = cursor.lastrowid
+            for criterion, score in (scores or {}).items():
+                self._connection.execute(
+                    "INSERT INTO scores (event_id, criterion, score) VALUES (?, ?, ?)",
+                    (event_id, criterion, score),
+                )
+                self._connection.execute(
+                    """
+                    INSERT INTO documents (path, criterion, last_score, events, total_latency,
+                        mean_latency, updated_at)
+                    VALUES (:path, :criterion, :score, 1, :latency, :latency, :timestamp)
+                    ON CONFLICT (path, criterion) DO UPDATE SET
+                        previous_score = last_score,
+                        last_score = :score,
+                        regression = last_score - :score,
+                        events = events + 1,
+                        total_latency = total_latency + :latency,
+                        mean_latency = (total_latency + :latency) / (events + 1),
+                        updated_at = :timestamp
+                    """,
+                    {
+                        "path": path,
+                        "criterion": criterion,
+                        "score": score,
+                        "latency": latency or 0.0,
+                        "timestamp": timestamp,
+                    },
+                )
+        return event_id
+
+    def _query(self, sql: str, params: tuple = ()) -> list[dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._connection.execute(sql, params)]
+
+    def timeline(
+        self, path: str, criterion: str = DEFAULT_CRITERION, limit: int = 100
+    ) -> list[dict[str, Any]]:
+        """Returns the most recent events of a document, newest first."""
+        return self._query(
+            """
+            SELECT e.id, e.kind, e.content_hash, e.model, e.latency, e.prompt_tokens,
+                   e.completion_tokens, e.cached_tokens, e.created_at, s.score
+            FROM events e
+            LEFT JOIN scores s ON s.event_id = e.id AND s.criterion = ?
+            WHERE e.path = ?
+            ORDER BY e.created_at DESC
+            LIMIT ?
+            """,
+            (criterion, os.path.abspath(path), limit),
+        )
+
+    def top_regressed(
+        self, criterion: str = DEFAULT_CRITERION, limit: int = 10
+    ) -> list[dict[str, Any]]:
+        """Returns documents whose latest score dropped the most since the one before."""
+        return self._query(
+            """
+            SELECT path, previous_score, last_score, regression, updated_at
+            FROM documents
+            WHERE criterion = ? AND regression > 0
+            ORDER BY regression DESC
+            LIMIT ?
+            """,
+            (criterion, limit),
+        )
+
+    def slowest(self, criterion: str = DEFAULT_CRITERION, limit: int = 10) -> list[dict[str, Any]]:
+        """Returns documents with the highest mean latency per scored event."""
+        return self._query(
+            """
+            SELECT path, mean_latency, events, last_score
+            FROM documents
+            WHERE criterion = ?
+            ORDER BY mean_latency DESC
+            LIMIT ?
+            """,
+            (criterion, limit),
+        )
+
+
+def timed_call(
+    budget: Optional[Budget], fn: Callable[..., Any], /, *args: Any, **kwargs: Any
+) -> tuple[Any, float, Optional[Budget]]:
+    """Calls a function and measures its latency and, given a budget, its own usage.
+
+    The call records its usage on a fresh budget nested in ``budget``, so the
+    usage returned is the call's own even while other calls share ``budget``.
+    Without a budget the function is called as is and no usage is returned.
+
+    Returns:
+        Tuple containing (result, latency in seconds, usage recorded by the call)
+    """
+    usage = Budget(parent=budget) if budget is not None else None
+    if usage is not None:
+        kwargs["budget"] = usage
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start, usage
+
+
+def token_counts(usage: Optional[Budget]) -> dict[str, Optional[int]]:
+    """Token columns of an event, left empty when the call made no LLM request."""
+    if usage is None or not usage.calls:
+        return {"prompt_tokens": None, "completion_tokens": None, "cached_tokens": None}
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "cached_tokens": usage.cached_tokens,
+    }
+
+
+def recorded_grade(
+    history: Optional[HistoryStore],
+    kind: str,
+    path: str,
+    doc: str,
+    grade: Callable[..., tuple[float, str]],
+    budget: Optional[Budget] = None,
+) -> tuple[float, str]:
+    """Grades a document and records the event when a history store is given."""
+    result, latency, usage = timed_call(budget, grade, doc)
+    if history is not None:
+        # Import here so the store can be used without loading the judge
+        from .evaluator import judge_model
+
+        history.record(
+            kind,
+            path,
+            doc,
+            {DEFAULT_CRITERION: result[0]},
+            model=judge_model(),
+            latency=latency,
+            **token_counts(usage),
+        )
+    return result
+
+
+def recorded_improve(
+    history: Optional[HistoryStore],
+    path: str,
+    doc: str,
+    feedback: str,
+    improve: Callable[..., str],
+    model: str,
+    budget: Optional[Budget] = None,
+) -> str:
+    """Improves a document and records the event when a history store is given."""
+    result, latency, usage = timed_call(budget, improve, doc, feedback, model=model)
+    if history is not None:
+        history.record("improve", path, doc, model=model, latency=latency, **token_counts(usage))
+    return result
@@ -1,50 +1,112 @@
 """Document improvement module for AutoDocEval."""
 
 import os
+from typing import TYPE_CHECKING, Any, Optional
 
 from openai import OpenAI
 
+from .budget import DEFAULT_MODEL, cached_prompt_tokens
+from .cassette import cassette_call
+from .deadline import call_timeout, call_with_timeout
+from .profiling import counter, span
+
+if TYPE_CHECKING:
+    from .budget import Budget
+
+# Constants
+# Identical for every rewrite, so providers can serve it from their prompt cache
+IMPROVEMENT_INSTRUCTIONS = (
+    "You are a senior technical writer.\n\n"
+    "You will be given markdown documentation that was evaluated by an expert model, followed "
+    "by the feedback it received. Your task is to rewrite the documentation to improve clarity, "
+    "completeness, and coherence, addressing the feedback directly. Reply with the revised "
+    "documentation only."
+)
+
 
 def setup_client() -> OpenAI:
     """Creates and configures OpenAI client."""
     return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 
-def create_improvement_prompt(feedback: str, doc: str) -> str:
-    """Creates prompt for improving documentation based on feedback."""
-    return f"""
-    You are a senior technical writer.
-
-    The following markdown documentation was evaluated and received feedback from an expert model. 
-    Your task is to rewrite the documentation to improve clarity, completeness, and coherence, 
-    addressing the feedback directly.
+def create_improvement_messages(feedback: str, doc: str) -> list[dict[str, str]]:
+    """Creates chat messages for improving documentation based on feedback.
 
-    ### Feedback:
-    {feedback}
+    The fixed instructions form the system message and the document comes
+    before the feedback, so calls share the longest possible prompt prefix:
+    rewrites of the same document with different feedback only differ at the
+    end, where provider-side prompt caching stops matching.
+    """
+    return [
+        {"role": "system", "content": IMPROVEMENT_INSTRUCTIONS},
+        {
+            "role": "user",
+            "content": (
+                f"### Original Documentation:\n{doc}\n\n"
+                f"### Feedback:\n{feedback.strip()}\n\n"
+                "### Revised Documentation:\n(Rewrite below)\n"
+            ),
+        },
+    ]
 
-    ### Original Documentation:
-    {doc}
 
-    ### Revised Documentation:
-    (Rewrite below)
-    """
+def create_improvement_prompt(feedback: str, doc: str) -> str:
+    """Creates the full text of the improvement messages, e.g. for token estimates."""
+    return "\n\n".join(message["content"] for message in create_improvement_messages(feedback, doc))
 
 
-def improve_document(doc_content: str, feedback: str) -> str:
+def improve_document(
+    doc_content: str,
+    feedback: str,
+    client: Optional[OpenAI] = None,
+    model: str = DEFAULT_MODEL,
+    budget: Optional["Budget"] = None,
+) -> str:
     """Generates improved document based on feedback.
 
     Args:
         doc_content: The original document content
         feedback: Feedback on the document
+        client: Optional OpenAI client to reuse
+        model: Chat model used for the rewrite
+        budget: Optional budget to record the response's token usage on
 
     Returns:
         Improved document content
     """
-    client = setup_client()
-    prompt = create_improvement_prompt(feedback, doc_content)
-
-    response = client.chat.completions.create(
-        model="gpt-4", messages=[{"role": "user", "content": prompt}]
-    )
-
-    return response.choices[0].message.content
+    with span("build_prompt", "prompt"):
+        messages = create_improvement_messages(feedback, doc_content)
+
+    timeout = call_timeout()
+    options = {"timeout": timeout} if timeout is not None else {}
+
+    def complete() -> dict[str, Any]:
+        nonlocal client
+        if client is None:
+            with span("setup_client", "openai"):
+                client = setup_client()
+        with span("chat_completion", "llm", model=model):
+            response = client.chat.completions.create(model=model, messages=messages, **options)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            usage = [
+                usage.prompt_tokens or 0,
+                usage.completion_tokens or 0,
+                cached_prompt_tokens(usage),
+            ]
+        return {"content": response.choices[0].message.content, "usage": usage}
+
+    def charge(result: dict[str, Any]) -> None:
+        usage = result["usage"]
+        if budget is not None and usage is not None:
+            budget.record(usage[0], usage[1], model=model, cached_tokens=usage[2])
+
+    # A rewrite abandoned at the deadline is still charged to the budget when it finishes
+    request = "\0".join([model, *(message["content"] for message in messages)])
+    result = cassette_call("improve", request, lambda: call_with_timeout(complete, timeout, charge))
+    usage = result["usage"]
+    if usage is not None:
+        counter("prompt_cache", prompt_tokens=usage[0], cached_tokens=usage[2])
+    charge(result)
+
+    return result["content"]
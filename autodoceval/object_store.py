@@ -0,0 +1,229 @@
+"""Content-addressed iteration store module for AutoDocEval."""
+
+import difflib
+import json
+import os
+import time
+import zlib
+from typing import Any, Optional, Union
+
+from .file_tools import DEFAULT_ENCODING, _write_atomic, content_hash, read_file, write_file
+
+# Constants
+MANIFEST_FORMAT_VERSION = 1
+MAX_DELTA_CHAIN = 16  # Deltas stacked on a base before a full copy is stored again
+FULL_OBJECT = b"F"
+DELTA_OBJECT = b"D"
+
+
+def default_store_path() -> str:
+    """Object store used by the materialize command when none is given."""
+    return os.path.join(".autodoceval", "store")
+
+
+def encode_delta(base: str, content: str) -> list[Union[list[int], str]]:
+    """Encodes content as line ranges copied from a base plus inserted text."""
+    base_lines = base.splitlines(keepends=True)
+    lines = content.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, base_lines, lines, autojunk=False)
+    ops: list[Union[list[int], str]] = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(lines[j1:j2]))
+    return ops
+
+
+def apply_delta(base: str, ops: list[Union[list[int], str]]) -> str:
+    """Rebuilds content from a base and the ops of ``encode_delta``."""
+    base_lines = base.splitlines(keepends=True)
+    return "".join(op if isinstance(op, str) else "".join(base_lines[op[0] : op[1]]) for op in ops)
+
+
+class ObjectStore:
+    """Compressed, content-addressed storage of document versions.
+
+    Objects are named by the SHA-256 of their content and stored zlib
+    compressed, either in full or as a line delta against the version they
+    were rewritten from, whichever is smaller. Delta chains are capped at
+    ``MAX_DELTA_CHAIN`` so reading a version stays cheap. Each auto-improve run
+    writes a manifest listing its versions, from which any iteration can be
+    materialized as a file on demand.
+
+    Layout::
+
+        <root>/objects/ab/cdef...   compressed objects
+        <root>/runs/<run id>.json   manifests
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _object_path(self, object_id: str) -> str:
+        return os.path.join(self.root, "objects", object_id[:2], object_id[2:])
+
+    def has(self, object_id: str) -> bool:
+        """Whether an object is stored."""
+        return os.path.exists(self._object_path(object_id))
+
+    def put(self, content: str, base: Optional[str] = None) -> str:
+        """Stores content, as a delta against a stored base when that is smaller.
+
+        Returns:
+            The object id (the content hash)
+        """
+        object_id = content_hash(content)
+        if self.has(object_id):
+            return object_id
+
+        data = FULL_OBJECT + zlib.compress(content.encode(DEFAULT_ENCODING))
+        if base is not None and self.has(base):
+            base_content, depth = self._read(base)
+            if depth < MAX_DELTA_CHAIN:
+                delta = {
+                    "base": base,
+                    "depth": depth + 1,
+                    "ops": encode_delta(base_content, content),
+                }
+                encoded = json.dumps(delta, separators=(",", ":")).encode(DEFAULT_ENCODING)
+                delta_data = DELTA_OBJECT + zlib.compress(encoded)
+                if len(delta_data) < len(data):
+                    data = delta_data
+
+        # Objects are immutable, so concurrent writers of one id write the same bytes
+        _write_atomic(self._object_path(object_id), data)
+        return object_id
+
+    def get(self, object_id: str) -> str:
+        """Returns the content of an object."""
+        return self._read(object_id)[0]
+
+    def _read(self, object_id: str) -> tuple[str, int]:
+        """Returns the content of an object and the length of its delta chain."""
+        path = self._object_path(object_id)
+        if not os.path.exists(path):
+            raise KeyError(f"Object not found: {object_id}")
+        with open(path, "rb") as f:
+            data = f.read()
+
+        payload = zlib.decompress(data[1:]).decode(DEFAULT_ENCODING)
+        if data[:1] == FULL_OBJECT:
+            return payload, 0
+        delta = json.loads(payload)
+        base_content, _ = self._read(delta["base"])
+        return apply_delta(base_content, delta["ops"]), delta["depth"]
+
+    def start_run(self, source_path: str) -> "StoredRun":
+        """Starts the manifest of a new auto-improve run of a document."""
+        return StoredRun(self, source_path)
+
+    def manifest_path(self, run_id: str) -> str:
+        """Path of a run's manifest."""
+        return os.path.join(self.root, "runs", f"{run_id}.json")
+
+    def load_run(self, run: str) -> dict[str, Any]:
+        """Reads a run manifest, given its id or path."""
+        path = run if os.path.exists(run) else self.manifest_path(run)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Run not found: {run}")
+        manifest = json.loads(read_file(path))
+        if manifest.get("format") != MANIFEST_FORMAT_VERSION:
+            raise ValueError(f"Unsupported run manifest format: {path}")
+        return manifest
+
+    def runs(self) -> list[dict[str, Any]]:
+        """Returns every run manifest, oldest first."""
+        runs_dir = os.path.join(self.root, "runs")
+        if not os.path.isdir(runs_dir):
+            return []
+        manifests = [
+            self.load_run(os.path.join(runs_dir, name))
+            for name in os.listdir(runs_dir)
+            if name.endswith(".json")
+        ]
+        return sorted(manifests, key=lambda manifest: manifest["created_at"])
+
+    def materialize(
+        self, run: str, iteration: Optional[int] = None, output: Optional[str] = None
+    ) -> list[str]:
+        """Writes versions of a run to files.
+
+        Args:
+            run: Run id or manifest path
+            iteration: Iteration to write; every iteration when omitted
+            output: Path to write a single iteration to instead of its sidecar path
+
+        Returns:
+            The paths written
+        """
+        versions = self.load_run(run)["versions"]
+        if iteration is not None:
+            versions = [version for version in versions if version["iteration"] == iteration]
+            if not versions:
+                raise ValueError(f"Run {run} has no iteration {iteration}")
+        else:
+            # The original is still in the docs tree; export the iterations as sidecars
+            versions = [version for version in versions if version["iteration"] > 0]
+
+        written = []
+        for version in versions:
+            path = output if output and iteration is not None else version["path"]
+            write_file(path, self.get(version["object"]))
+            written.append(path)
+        return written
+
+
+class StoredRun:
+    """Manifest of one auto-improve run whose versions live in an object store.
+
+    Every version is stored as a delta against the one added before it, which
+    is the version it was rewritten from.
+    """
+
+    def __init__(self, store: ObjectStore, source_path: str):
+        self.store = store
+        self.source = os.path.abspath(source_path)
+        self.created_at = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.created_at))
+        self.id = f"{stamp}-{content_hash(f'{self.source}{self.created_at}')[:8]}"
+        self.versions: list[dict[str, Any]] = []
+
+    def add(self, iteration: int, path: str, content: str) -> str:
+        """Stores a version and returns its object id.
+
+        Args:
+            iteration: Iteration number (0 for the original)
+            path: Sidecar path the version materializes to
+            content: Document content
+        """
+        base = self.versions[-1]["object"] if self.versions else None
+        object_id = self.store.put(content, base)
+        self.versions.append(
+            {
+                "iteration": iteration,
+                "path": os.path.abspath(path),
+                "object": object_id,
+                "score": None,
+            }
+        )
+        self.save()
+        return object_id
+
+    def set_score(self, iteration: int, score: float) -> None:
+        """Records the score of a stored version."""
+        for version in self.versions:
+            if version["iteration"] == iteration:
+                version["score"] = score
+        self.save()
+
+    def save(self) -> None:
+        """Writes the manifest."""
+        manifest = {
+            "format": MANIFEST_FORMAT_VERSION,
+            "run": self.id,
+            "source": self.source,
+            "created_at": self.created_at,
+            "versions": self.versions,
+        }
+        write_file(self.store.manifest_path(self.id), json.dumps(manifest, indent=2))
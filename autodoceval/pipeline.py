@@ -0,0 +1,172 @@
+"""In-process pipeline module for AutoDocEval."""
+
+from typing import Any, Callable, NamedTuple, Optional
+
+from .compare import format_percentage
+from .evaluator import interpret_score
+from .file_tools import improved_output_path, read_file, write_file
+from .profiling import span
+from .session import Session
+
+
+class Stage(NamedTuple):
+    """A pipeline step and the stages whose results it takes."""
+
+    name: str
+    run: Callable[..., Any]
+    requires: tuple[str, ...]
+
+
+class Graded(NamedTuple):
+    """Content of a document with its clarity grade."""
+
+    path: str
+    content: str
+    score: Optional[float]  # None when the feedback was given instead of graded
+    reason: str
+
+
+class Improved(NamedTuple):
+    """An improved document and where it was written."""
+
+    path: str
+    content: str
+
+
+class Comparison(NamedTuple):
+    """Grades of an original document and its improved version."""
+
+    original: Graded
+    improved: Graded
+
+    @property
+    def difference(self) -> float:
+        return self.improved.score - self.original.score
+
+
+class Pipeline:
+    """Small DAG of stages that pass their results to each other in memory.
+
+    Each stage function is called with the pipeline's session followed by the
+    results of the stages it requires, in order. A stage runs at most once per
+    pipeline, so running a later stage reuses the results of earlier runs, and
+    all stages share the session's clients, cache and rate limits. Stages can
+    only require stages added before them, which rules out cycles.
+    """
+
+    def __init__(self, session: Optional[Session] = None):
+        self.session = session or Session()
+        self.stages: dict[str, Stage] = {}
+        self.results: dict[str, Any] = {}
+
+    def add(self, name: str, run: Callable[..., Any], requires: tuple[str, ...] = ()) -> None:
+        """Adds a stage after the stages it requires."""
+        if name in self.stages:
+            raise ValueError(f"Duplicate pipeline stage: {name}")
+        missing = [required for required in requires if required not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} requires unknown stage(s): {', '.join(missing)}")
+        self.stages[name] = Stage(name, run, tuple(requires))
+
+    def run(self, *targets: str) -> dict[str, Any]:
+        """Runs the target stages, and what they require, in dependency order.
+
+        Args:
+            targets: Stages to run; every stage when none are given
+
+        Returns:
+            The result of each target stage by name
+        """
+        for target in targets:
+            if target not in self.stages:
+                raise ValueError(f"Unknown pipeline stage: {target}")
+        targets = targets or tuple(self.stages)
+        return {target: self._run(target) for target in targets}
+
+    def _run(self, name: str) -> Any:
+        if name not in self.results:
+            stage = self.stages[name]
+            inputs = [self._run(required) for required in stage.requires]
+            with span(f"stage:{name}", "pipeline"):
+                self.results[name] = stage.run(self.session, *inputs)
+        return self.results[name]
+
+
+def document_pipeline(
+    path: str,
+    output: Optional[str] = None,
+    feedback: Optional[str] = None,
+    feedback_output: Optional[str] = None,
+    improved: Optional[str] = None,
+    session: Optional[Session] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> Pipeline:
+    """Builds the grade -> improve -> compare pipeline of one document.
+
+    A full run makes three LLM calls: grading the original, rewriting it with
+    that feedback, and grading the rewrite. Comparing reuses the original's
+    grade, and grades already in the session cache cost nothing.
+
+    Args:
+        path: Document to grade and improve
+        output: Where to write the improved document (defaults to ``*_improved``)
+        feedback: Feedback file to improve from instead of grading first
+        feedback_output: Where to write the grading feedback
+        improved: Existing improved document to compare instead of rewriting
+        session: Session to share with other pipelines
+        log: Function progress messages are written with (defaults to print)
+    """
+    log = log or print
+    pipeline = Pipeline(session)
+
+    def grade(session: Session) -> Graded:
+        content = read_file(path)
+        if feedback is not None:
+            return Graded(path, content, None, read_file(feedback))
+        score, reason = session.grade(content)
+        log(f"Score: {format_percentage(score)}")
+        log(f"Reasoning: {reason}")
+        if feedback_output:
+            write_file(feedback_output, reason)
+        return Graded(path, content, score, reason)
+
+    def improve(session: Session, graded: Graded) -> Improved:
+        if improved is not None:
+            return Improved(improved, read_file(improved))
+        output_path = output or improved_output_path(path)
+        content = session.improve(graded.content, graded.reason)
+        write_file(output_path, content)
+        log(f"✅ Improved document saved to: {output_path}")
+        return Improved(output_path, content)
+
+    def compare(session: Session, graded: Graded, rewrite: Improved) -> Comparison:
+        if graded.score is None:
+            graded = Graded(graded.path, graded.content, *session.grade(graded.content))
+        score, reason = session.grade(rewrite.content)
+        comparison = Comparison(graded, Graded(rewrite.path, rewrite.content, score, reason))
+        log(format_comparison(comparison))
+        return comparison
+
+    pipeline.add("grade", grade)
+    pipeline.add("improve", improve, requires=("grade",))
+    pipeline.add("compare", compare, requires=("grade", "improve"))
+    return pipeline
+
+
+def format_comparison(comparison: Comparison) -> str:
+    """Formats the scores of an original and improved document and their difference."""
+    original, improved = comparison
+    lines = [
+        f"\n📊 Comparison of {original.path} and {improved.path}:",
+        f"Original score: {format_percentage(original.score)}",
+        f"Improved score: {format_percentage(improved.score)}",
+        f"Difference: {format_percentage(comparison.difference)}",
+        f"The improved document has {interpret_score(improved.score)}",
+    ]
+    if comparison.difference > 0:
+        lines.append("✅ The document has been improved.")
+    elif comparison.difference < 0:
+        lines.append("❌ The document has gotten worse.")
+    else:
+        lines.append("⚠️ The document has not changed in clarity.")
+    return "\n".join(lines)
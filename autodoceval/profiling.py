@@ -0,0 +1,190 @@
+"""Pipeline profiling module for AutoDocEval."""
+
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any, Optional
+
+# Constants
+MEMORY_FRAMES = 10  # Stack depth tracemalloc keeps per allocation
+SUMMARY_LIMIT = 20
+
+_active: Optional["Profiler"] = None
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Profiler:
+    """Records wall-clock spans of pipeline stages, with optional CPU and allocation profiles.
+
+    Spans are recorded from every thread. cProfile only sees the thread that
+    started the profiler, so threaded runs (``--pipelined``, multi-document
+    auto-improve) show the coordinating thread's CPU time only.
+    """
+
+    def __init__(self, cpu: bool = False, memory: bool = False):
+        self.cpu = cpu
+        self.memory = memory
+        self.events: list[dict[str, Any]] = []
+        self._threads: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Makes this the active profiler and starts the optional CPU and memory profiles."""
+        global _active
+        _active = self
+        if self.memory:
+            tracemalloc.start(MEMORY_FRAMES)
+        if self.cpu:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self) -> None:
+        """Stops profiling; spans opened afterwards are no longer recorded."""
+        global _active
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.memory and tracemalloc.is_tracing():
+            self._snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        if _active is self:
+            _active = None
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = "pipeline", **args: Any) -> Iterator[None]:
+        """Records the wall-clock duration of a block as a trace event."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            thread = threading.current_thread()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self._origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": self._pid,
+                "tid": thread.ident,
+            }
+            if args:
+                event["args"] = {key: str(value) for key, value in args.items()}
+            with self._lock:
+                self._threads[thread.ident] = thread.name
+                self.events.append(event)
+                if self.memory and tracemalloc.is_tracing():
+                    self.events.append(
+                        {
+                            "name": "traced memory",
+                            "ph": "C",
+                            "ts": event["ts"] + event["dur"],
+                            "pid": self._pid,
+                            "args": {"KiB": tracemalloc.get_traced_memory()[0] / 1024},
+                        }
+                    )
+
+    def counter(self, name: str, **values: float) -> None:
+        """Records the current value of one or more counters as a trace event."""
+        with self._lock:
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "C",
+                    "ts": (time.perf_counter() - self._origin) * 1e6,
+                    "pid": self._pid,
+                    "args": values,
+                }
+            )
+
+    def trace(self) -> dict[str, Any]:
+        """Returns the recorded spans in Chrome trace-event format."""
+        with self._lock:
+            metadata = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": name},
+                }
+                for tid, name in self._threads.items()
+            ]
+            return {"traceEvents": metadata + list(self.events), "displayTimeUnit": "ms"}
+
+    def summary(self, limit: int = SUMMARY_LIMIT) -> str:
+        """Returns a text report of span totals, CPU hotspots and allocation sites."""
+        totals: dict[tuple[str, str], list[float]] = {}
+        with self._lock:
+            for event in self.events:
+                if event["ph"] == "X":
+                    totals.setdefault((event["cat"], event["name"]), []).append(event["dur"] / 1e6)
+
+        lines = [
+            "Wall-clock spans",
+            f"{'stage':<40} {'count':>6} {'total s':>9} {'mean s':>9} {'max s':>9}",
+        ]
+        for (category, name), durations in sorted(totals.items(), key=lambda item: -sum(item[1])):
+            lines.append(
+                f"{category + '/' + name:<40} {len(durations):>6} {sum(durations):>9.3f} "
+                f"{sum(durations) / len(durations):>9.3f} {max(durations):>9.3f}"
+            )
+
+        if self._cprofile is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self._cprofile, stream=stream)
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(limit)
+            lines += ["", "CPU hotspots (by own time)", stream.getvalue().strip()]
+
+        if self._snapshot is not None:
+            lines += ["", "Allocation sites (live at end of run)"]
+            for stat in self._snapshot.statistics("lineno")[:limit]:
+                lines.append(str(stat))
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, trace_path: str) -> tuple[str, str]:
+        """Writes the trace JSON and, next to it, the text summary.
+
+        Returns:
+            Tuple containing (trace path, summary path)
+        """
+        # Import here to avoid circular imports
+        from .file_tools import write_file
+
+        summary_path = os.path.splitext(trace_path)[0] + ".txt"
+        write_file(trace_path, json.dumps(self.trace()))
+        write_file(summary_path, self.summary())
+        return trace_path, summary_path
+
+
+def span(name: str, category: str = "pipeline", **args: Any) -> contextlib.AbstractContextManager:
+    """Records a span on the active profiler, or does nothing when none is active."""
+    profiler = _active
+    if profiler is None:
+        return _NULL_SPAN
+    return profiler.span(name, category, **args)
+
+
+def counter(name: str, **values: float) -> None:
+    """Records counter values on the active profiler, if any."""
+    profiler = _active
+    if profiler is not None:
+        profiler.counter(name, **values)
@@ -0,0 +1,181 @@
+"""pytest plugin module for AutoDocEval.
+
+Collects markdown files as tests that fail when a document's clarity score is
+below a threshold. The plugin is installed with the package but stays inert
+until enabled with ``--doc-quality`` or ``doc_quality = true`` in the ini file::
+
+    pytest --doc-quality --doc-threshold 0.8 docs/
+
+Scores are cached in pytest's cache directory by content hash, so unchanged
+documents are not graded again, and under pytest-xdist all workers share the
+cache and one file-based rate limiter.
+"""
+
+import fnmatch
+import re
+from typing import Any, Optional
+
+import pytest
+
+# Constants
+DEFAULT_THRESHOLD = 0.7
+DEFAULT_PATTERN = "*.md"
+CACHE_PREFIX = "autodoceval/scores"
+RATE_LIMIT_FILE = "rate-limit.json"
+
+_limiter_key = pytest.StashKey[Any]()
+_evaluator_key = pytest.StashKey[Any]()
+
+
+class DocumentQualityError(Exception):
+    """Raised when a document scores below the configured threshold."""
+
+    def __init__(self, score: float, threshold: float, reason: str):
+        super().__init__(f"clarity {score:.2f} below threshold {threshold:.2f}")
+        self.score = score
+        self.threshold = threshold
+        self.reason = reason
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("autodoceval", "documentation quality (AutoDocEval)")
+    group.addoption(
+        "--doc-quality",
+        action="store_true",
+        default=None,
+        help="Collect markdown files as documentation clarity tests",
+    )
+    group.addoption(
+        "--doc-threshold",
+        type=float,
+        default=None,
+        help=f"Minimum clarity score to pass (default: {DEFAULT_THRESHOLD})",
+    )
+    group.addoption(
+        "--doc-sections",
+        action="store_true",
+        default=None,
+        help="Make each markdown section its own test instead of each file",
+    )
+    group.addoption(
+        "--doc-rate-limit",
+        type=float,
+        default=None,
+        help="Maximum judge calls per minute, shared by all xdist workers",
+    )
+    parser.addini("doc_quality", "Enable documentation clarity tests", type="bool", default=False)
+    parser.addini(
+        "doc_quality_threshold", "Minimum clarity score to pass", default=str(DEFAULT_THRESHOLD)
+    )
+    parser.addini(
+        "doc_quality_pattern", "Filename pattern of documents to test", default=DEFAULT_PATTERN
+    )
+    parser.addini(
+        "doc_quality_sections", "Test each markdown section separately", type="bool", default=False
+    )
+    parser.addini("doc_quality_rate_limit", "Maximum judge calls per minute", default="")
+
+
+def _setting(config: pytest.Config, option: str, ini: str) -> Any:
+    """Returns a command-line option, falling back to its ini setting."""
+    value = config.getoption(option)
+    return value if value is not None else config.getini(ini)
+
+
+def pytest_collect_file(file_path, parent: pytest.Collector) -> Optional["DocumentFile"]:
+    config = parent.config
+    if not _setting(config, "doc_quality", "doc_quality"):
+        return None
+    if not fnmatch.fnmatch(file_path.name, config.getini("doc_quality_pattern")):
+        return None
+    return DocumentFile.from_parent(parent, path=file_path)
+
+
+class DocumentFile(pytest.File):
+    """A markdown file, collected as one test or one test per section."""
+
+    def collect(self):
+        # Imported here, like the judge, so loading the plugin stays cheap for every session
+        from .file_tools import read_file, split_sections
+
+        content = read_file(str(self.path))
+        if not _setting(self.config, "doc_sections", "doc_quality_sections"):
+            yield DocumentItem.from_parent(self, name=self.path.name, content=content)
+            return
+
+        names: set[str] = set()
+        for index, section in enumerate(split_sections(content), 1):
+            if not section.strip():
+                continue
+            name = _section_name(section, index, names)
+            names.add(name)
+            yield DocumentItem.from_parent(self, name=name, content=section)
+
+
+def _section_name(section: str, index: int, taken: set[str]) -> str:
+    """Names a section after its heading, adding its position when that is ambiguous."""
+    heading = section.lstrip().splitlines()[0]
+    slug = re.sub(r"[^\w]+", "-", heading.lstrip("#")).strip("-").lower()
+    name = slug or f"section-{index}"
+    return name if name not in taken else f"{name}-{index}"
+
+
+class DocumentItem(pytest.Item):
+    """Grades one document, or section, and fails below the clarity threshold."""
+
+    def __init__(self, *, content: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.content = content
+
+    def runtest(self) -> None:
+        threshold = float(_setting(self.config, "doc_threshold", "doc_quality_threshold"))
+        score, reason = self._grade()
+        self.user_properties.append(("clarity", score))
+        if score < threshold:
+            raise DocumentQualityError(score, threshold, reason)
+
+    def _grade(self) -> tuple[float, str]:
+        """Returns the cached grade of the content, grading it on a cache miss."""
+        from .evaluator import clarity_fingerprint, evaluate_document, setup_evaluator
+        from .file_tools import content_hash
+
+        cache = self.config.cache
+        key = f"{CACHE_PREFIX}/{clarity_fingerprint()}/{content_hash(self.content)}"
+        cached = cache.get(key, None) if cache is not None else None
+        if cached is not None:
+            return cached[0], cached[1]
+
+        _rate_limiter(self.config).acquire()
+        if _evaluator_key not in self.config.stash:
+            self.config.stash[_evaluator_key] = setup_evaluator()
+        score, reason = evaluate_document(self.content, self.config.stash[_evaluator_key])
+        if cache is not None:
+            cache.set(key, [score, reason])
+        return score, reason
+
+    def repr_failure(self, excinfo, style=None):
+        if isinstance(excinfo.value, DocumentQualityError):
+            error = excinfo.value
+            return (
+                f"📉 {self.nodeid}: clarity {error.score * 100:.1f}% is below "
+                f"the threshold of {error.threshold * 100:.1f}%\n{error.reason}"
+            )
+        return super().repr_failure(excinfo, style)
+
+    def reportinfo(self):
+        return self.path, None, f"clarity: {self.name}"
+
+
+def _rate_limiter(config: pytest.Config):
+    """Returns the process's judge rate limiter, shared through the cache directory."""
+    if _limiter_key not in config.stash:
+        from .session import RateLimiter, SharedRateLimiter
+
+        value = _setting(config, "doc_rate_limit", "doc_quality_rate_limit")
+        calls_per_minute = float(value) if value not in (None, "") else None
+        if config.cache is not None:
+            path = str(config.cache.mkdir("autodoceval") / RATE_LIMIT_FILE)
+            config.stash[_limiter_key] = SharedRateLimiter(path, calls_per_minute)
+        else:
+            config.stash[_limiter_key] = RateLimiter(calls_per_minute)
+    return config.stash[_limiter_key]
@@ -0,0 +1,299 @@
+"""Columnar grading results module for AutoDocEval."""
+
+import contextlib
+import csv
+import mmap
+import os
+import sys
+import tempfile
+from array import array
+from collections.abc import Iterator
+from typing import Any, Optional
+
+# Constants
+DEFAULT_PERCENTILES = (50, 90, 99)
+DEFAULT_BINS = 10
+REASON_ENCODING = "utf-8"
+
+
+def _numpy():
+    """Returns numpy when installed, otherwise None."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class StringArena:
+    """Append-only store of strings packed into one buffer with an offsets array.
+
+    Strings cost their encoded bytes plus one 8-byte offset instead of a Python
+    object each. Once the buffer would grow past ``spill_threshold`` bytes it
+    moves to an anonymous temporary file, so reasons of a very large corpus
+    don't have to fit in memory.
+    """
+
+    def __init__(self, spill_threshold: Optional[int] = None):
+        self.spill_threshold = spill_threshold
+        self.offsets = array("q", [0])
+        self._data = bytearray()
+        self._file = None
+        self._files = contextlib.ExitStack()
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the strings live in a temporary file."""
+        return self._file is not None
+
+    def append(self, text: str) -> int:
+        """Adds a string and returns its index."""
+        encoded = text.encode(REASON_ENCODING)
+        if (
+            self._file is None
+            and self.spill_threshold is not None
+            and len(self._data) + len(encoded) > self.spill_threshold
+        ):
+            self._spill()
+
+        if self._file is not None:
+            self._file.seek(0, os.SEEK_END)
+            self._file.write(encoded)
+        else:
+            self._data += encoded
+        self.offsets.append(self.offsets[-1] + len(encoded))
+        return len(self) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        if self._file is None:
+            return self._data[start:end].decode(REASON_ENCODING)
+        self._file.seek(start)
+        return self._file.read(end - start).decode(REASON_ENCODING)
+
+    def buffer(self) -> Any:
+        """Returns all string bytes as one buffer, memory-mapped when spilled."""
+        if self._file is None:
+            return memoryview(self._data)
+        self._file.flush()
+        if self.offsets[-1] == 0:
+            return memoryview(b"")
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        """Releases the spill file."""
+        self._files.close()
+        self._file = None
+
+    def _spill(self) -> None:
+        with contextlib.ExitStack() as stack:
+            spill_file = stack.enter_context(tempfile.TemporaryFile())
+            spill_file.write(self._data)
+            # Written out: keep the file open until close() instead of closing it here
+            self._files = stack.pop_all()
+        self._file = spill_file
+        self._data = bytearray()
+
+
+class ResultTable:
+    """Array-backed table of (path, score, reason) grading results.
+
+    Scores are a packed array of doubles, paths are interned strings with a
+    parallel array of directory ids for rollups, and reasons live in a
+    ``StringArena``. Aggregations use numpy when installed (zero-copy over
+    the score array) and fall back to plain Python otherwise. Arrow and
+    Parquet export (``pyarrow``) builds columns straight from the buffers.
+    """
+
+    def __init__(self, spill_threshold: Optional[int] = None):
+        self.paths: list[str] = []
+        self.scores = array("d")
+        self.reasons = StringArena(spill_threshold)
+        self.directories: list[str] = []
+        self.directory_ids = array("I")
+        self._directory_index: dict[str, int] = {}
+
+    @classmethod
+    def from_results(
+        cls, results: dict[str, tuple[float, str]], spill_threshold: Optional[int] = None
+    ) -> "ResultTable":
+        """Builds a table from a {path: (score, reason)} mapping."""
+        table = cls(spill_threshold)
+        for path, (score, reason) in results.items():
+            table.append(path, score, reason)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def append(self, path: str, score: float, reason: str) -> None:
+        """Adds one result."""
+        directory = os.path.dirname(path)
+        directory_id = self._directory_index.get(directory)
+        if directory_id is None:
+            directory_id = self._directory_index[directory] = len(self.directories)
+            self.directories.append(sys.intern(directory))
+        self.paths.append(sys.intern(path))
+        self.directory_ids.append(directory_id)
+        self.scores.append(score)
+        self.reasons.append(reason or "")
+
+    def row(self, index: int) -> tuple[str, float, str]:
+        """Returns the (path, score, reason) of one result."""
+        return self.paths[index], self.scores[index], self.reasons[index]
+
+    def __iter__(self) -> Iterator[tuple[str, float, str]]:
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def summary(self, percentiles: tuple[float, ...] = DEFAULT_PERCENTILES) -> dict[str, float]:
+        """Returns count, mean, min, max and the requested percentiles of the scores."""
+        if not len(self):
+            return {"count": 0}
+        np = _numpy()
+        if np is not None:
+            scores = np.frombuffer(self.scores, dtype=np.float64)
+            values = np.percentile(scores, percentiles)
+            stats = {"mean": scores.mean(), "min": scores.min(), "max": scores.max()}
+        else:
+            ordered = sorted(self.scores)
+            values = [_percentile(ordered, p) for p in percentiles]
+            stats = {"mean": sum(ordered) / len(ordered), "min": ordered[0], "max": ordered[-1]}
+        stats.update({f"p{p:g}": float(value) for p, value in zip(percentiles, values)})
+        return {"count": len(self), **{key: float(value) for key, value in stats.items()}}
+
+    def histogram(self, bins: int = DEFAULT_BINS) -> tuple[list[int], list[float]]:
+        """Returns (counts, bin edges) of the scores over the 0-1 range.
+
+        A score falls in bin ``int(score * bins)`` (1.0 in the last one) with or
+        without numpy; numpy's own histogram compares against rounded edges and
+        would put e.g. 0.6 of 5 bins one bin lower.
+        """
+        np = _numpy()
+        if np is not None:
+            scores = np.frombuffer(self.scores, dtype=np.float64)
+            indices = np.clip((scores * bins).astype(np.int64), 0, bins - 1)
+            counts = np.bincount(indices, minlength=bins).tolist()
+        else:
+            counts = [0] * bins
+            for score in self.scores:
+                counts[min(max(int(score * bins), 0), bins - 1)] += 1
+        return counts, [i / bins for i in range(bins + 1)]
+
+    def by_directory(self) -> dict[str, dict[str, float]]:
+        """Returns count, mean, min and max score per directory."""
+        np = _numpy()
+        if np is not None and len(self):
+            ids = np.frombuffer(self.directory_ids, dtype=np.uint32)
+            scores = np.frombuffer(self.scores, dtype=np.float64)
+            size = len(self.directories)
+            counts = np.bincount(ids, minlength=size)
+            sums = np.bincount(ids, weights=scores, minlength=size)
+            minimums = np.full(size, np.inf)
+            maximums = np.full(size, -np.inf)
+            np.minimum.at(minimums, ids, scores)
+            np.maximum.at(maximums, ids, scores)
+            rows = zip(counts.tolist(), sums.tolist(), minimums.tolist(), maximums.tolist())
+        else:
+            rows = [[0, 0.0, float("inf"), float("-inf")] for _ in self.directories]
+            for directory_id, score in zip(self.directory_ids, self.scores):
+                row = rows[directory_id]
+                row[0] += 1
+                row[1] += score
+                row[2] = min(row[2], score)
+                row[3] = max(row[3], score)
+
+        return {
+            directory: {"count": count, "mean": total / count, "min": low, "max": high}
+            for directory, (count, total, low, high) in zip(self.directories, rows)
+            if count
+        }
+
+    def to_csv(self, file_path: str) -> None:
+        """Streams the table to a CSV file."""
+        with open(file_path, "w", newline="", encoding=REASON_ENCODING) as f:
+            writer = csv.writer(f)
+            writer.writerow(("path", "score", "reason"))
+            writer.writerows(self)
+
+    def to_arrow(self):
+        """Returns the table as a ``pyarrow.Table`` built from the column buffers."""
+        import pyarrow as pa
+
+        reasons = pa.LargeStringArray.from_buffers(
+            len(self),
+            pa.py_buffer(self.reasons.offsets),
+            pa.py_buffer(self.reasons.buffer()),
+        )
+        return pa.table(
+            {
+                "path": pa.array(self.paths, type=pa.string()),
+                "directory": pa.DictionaryArray.from_arrays(
+                    pa.Array.from_buffers(
+                        pa.uint32(), len(self), [None, pa.py_buffer(self.directory_ids)]
+                    ),
+                    pa.array(self.directories, type=pa.string()),
+                ),
+                "score": pa.Array.from_buffers(
+                    pa.float64(), len(self), [None, pa.py_buffer(self.scores)]
+                ),
+                "reason": reasons,
+            }
+        )
+
+    def write(self, file_path: str) -> None:
+        """Writes the table as CSV, Parquet or Arrow IPC depending on the extension."""
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == ".csv":
+            self.to_csv(file_path)
+        elif extension == ".parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(self.to_arrow(), file_path)
+        elif extension in (".arrow", ".feather"):
+            import pyarrow.feather as feather
+
+            feather.write_feather(self.to_arrow(), file_path)
+        else:
+            raise ValueError(f"Unsupported results format: {extension or file_path}")
+
+    def close(self) -> None:
+        """Releases the reason spill file."""
+        self.reasons.close()
+
+
+def _percentile(ordered: list[float], percentile: float) -> float:
+    """Linearly interpolated percentile of sorted values, matching numpy's default."""
+    position = (len(ordered) - 1) * percentile / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def format_table_summary(table: ResultTable) -> str:
+    """Formats score statistics, a histogram and per-directory rollups of a table."""
+    stats = table.summary()
+    if not stats["count"]:
+        return "No results."
+
+    lines = [
+        f"\n📊 {stats['count']} documents: mean {stats['mean'] * 100:.1f}%, "
+        + ", ".join(f"p{p} {stats[f'p{p}'] * 100:.1f}%" for p in DEFAULT_PERCENTILES)
+    ]
+    counts, edges = table.histogram()
+    widest = max(counts) or 1
+    for count, low, high in zip(counts, edges, edges[1:]):
+        lines.append(
+            f"{low * 100:5.0f}-{high * 100:3.0f}% {'█' * round(count / widest * 40)} {count}"
+        )
+
+    lines.append("\nBy directory:")
+    for directory, row in sorted(table.by_directory().items()):
+        lines.append(
+            f"{directory or '.'}: {row['count']} documents, mean {row['mean'] * 100:.1f}%, "
+            f"min {row['min'] * 100:.1f}%"
+        )
+    return "\n".join(lines)
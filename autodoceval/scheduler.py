@@ -0,0 +1,276 @@
+"""Prioritised corpus improvement module for AutoDocEval."""
+
+import csv
+import heapq
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import NamedTuple, Optional
+
+from .auto_improve import (
+    DEFAULT_TARGET_SCORE,
+    estimate_judge_tokens,
+    format_percentage,
+    generate_improved_path,
+    plan_iteration,
+)
+from .budget import Budget, BudgetExceededError, estimate_tokens
+from .deadline import Deadline, DeadlineExceededError, activate
+from .file_tools import read_file, write_file
+from .history import HistoryStore, recorded_grade, recorded_improve
+from .session import Session
+
+# Constants
+DEFAULT_WEIGHT = 1.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_WORKERS = 4
+WEIGHT_COLUMNS = ("weight", "traffic", "views", "pageviews")
+
+
+class DocumentState(NamedTuple):
+    """Progress of one document through the scheduler."""
+
+    path: str
+    weight: float
+    original_score: float
+    score: float
+    best_path: str
+    doc: str
+    feedback: str
+    attempts: int
+
+    @property
+    def gain(self) -> float:
+        """Traffic-weighted score gained so far."""
+        return self.weight * (self.score - self.original_score)
+
+
+def load_traffic(csv_path: str) -> dict[str, float]:
+    """Reads page weights from a CSV with a ``path`` column and a weight column.
+
+    The weight column may be named weight, traffic, views or pageviews.
+
+    Returns:
+        Weights by absolute document path
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = {name.strip().lower(): name for name in reader.fieldnames or []}
+        weight_column = next((columns[name] for name in WEIGHT_COLUMNS if name in columns), None)
+        if "path" not in columns or weight_column is None:
+            raise ValueError(
+                f"{csv_path} needs a path column and one of: {', '.join(WEIGHT_COLUMNS)}"
+            )
+        return {
+            os.path.abspath(row[columns["path"]].strip()): float(row[weight_column] or 0)
+            for row in reader
+            if row[columns["path"]]
+        }
+
+
+def iteration_tokens(doc: str, feedback: str) -> int:
+    """Estimates the tokens of one rewrite plus grading the result."""
+    judge_prompt, judge_completion = estimate_judge_tokens(doc)
+    # The rewrite prompt holds the document and feedback; the completion is about as long
+    return 2 * estimate_tokens(doc) + estimate_tokens(feedback) + judge_prompt + judge_completion
+
+
+def priority(state: DocumentState, target_score: float) -> float:
+    """Expected weighted gain per token of improving a document once more.
+
+    The gain is the traffic weight times the distance to the target, damped
+    by the number of attempts already spent on the document.
+    """
+    expected_gain = state.weight * max(target_score - state.score, 0.0) / (1 + state.attempts)
+    return expected_gain / iteration_tokens(state.doc, state.feedback)
+
+
+class PriorityScheduler:
+    """Spends LLM calls on the documents where they are expected to help most.
+
+    Every document is graded first. Improvement steps (one rewrite plus its
+    grade) are then dispatched to a bounded pool in order of expected gain per
+    token, and each document is re-queued with its new score after every step,
+    until documents reach the target, run out of attempts, the budget runs out
+    or the deadline passes; steps in flight at the deadline are cut off. A
+    document whose grade or step fails is kept in ``failures`` and not
+    scheduled again; the others carry on.
+
+    Args:
+        target_score: Score at which a document is left alone (0-1)
+        max_attempts: Maximum improvement steps per document
+        workers: Number of steps run at once
+        deadline: Optional deadline after which no new work is started and
+            calls in flight are abandoned
+        budget: Optional budget for the whole run
+        session: Optional session to share clients and the result cache with
+        history: Optional store to record every grade and improve event in
+    """
+
+    def __init__(
+        self,
+        target_score: float = DEFAULT_TARGET_SCORE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        workers: int = DEFAULT_WORKERS,
+        deadline: Optional[Deadline] = None,
+        budget: Optional[Budget] = None,
+        session: Optional[Session] = None,
+        history: Optional[HistoryStore] = None,
+    ):
+        self.target_score = target_score
+        self.max_attempts = max_attempts
+        self.workers = workers
+        self.deadline = deadline
+        self.budget = budget
+        self.session = session or Session(max_concurrency=workers)
+        self.history = history
+        self.stop_reason = ""
+        self.failures: dict[str, Exception] = {}
+
+    def run(
+        self, paths: list[str], weights: Optional[dict[str, float]] = None
+    ) -> dict[str, DocumentState]:
+        """Improves a corpus and returns the final state of every graded document."""
+        weights = weights or {}
+        states: dict[str, DocumentState] = {}
+        queue: list[tuple[float, int, str]] = []
+        order = itertools.count()
+        self.stop_reason = "all documents done"
+        stopped = False
+
+        def push(state: DocumentState) -> None:
+            states[state.path] = state
+            if state.score < self.target_score and state.attempts < self.max_attempts:
+                entry = (-priority(state, self.target_score), next(order), state.path)
+                heapq.heappush(queue, entry)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Grade every document so priorities start from real scores
+            docs = {path: read_file(path) for path in paths}
+            grading = {path: executor.submit(self._grade, path, doc) for path, doc in docs.items()}
+            for path, future in grading.items():
+                try:
+                    score, feedback = future.result()
+                except BudgetExceededError:
+                    self.stop_reason = "budget exhausted"
+                    stopped = True
+                    continue
+                except DeadlineExceededError:
+                    self.stop_reason = "deadline reached"
+                    stopped = True
+                    continue
+                except Exception as e:
+                    self._fail(path, e)
+                    continue
+                weight = weights.get(os.path.abspath(path), DEFAULT_WEIGHT)
+                push(DocumentState(path, weight, score, score, path, docs[path], feedback, 0))
+
+            running: dict[Future, str] = {}
+            while queue or running:
+                while queue and not stopped and len(running) < self.workers:
+                    if self.deadline is not None and self.deadline.expired:
+                        self.stop_reason = "deadline reached"
+                        stopped = True
+                        break
+                    _, _, path = heapq.heappop(queue)
+                    running[executor.submit(self._step, states[path])] = path
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = running.pop(future)
+                    try:
+                        state = future.result()
+                    except BudgetExceededError:
+                        self.stop_reason = "budget exhausted"
+                        stopped = True
+                        continue
+                    except DeadlineExceededError:
+                        # Cut off mid-step: the document keeps its best version so far
+                        self.stop_reason = "deadline reached"
+                        stopped = True
+                        continue
+                    except Exception as e:
+                        # The document keeps its best version so far but gets no more steps
+                        self._fail(path, e)
+                        continue
+                    push(state)
+                    print(
+                        f"{path}: {format_percentage(state.score)} after {state.attempts} "
+                        f"attempt(s), {len(queue)} queued"
+                    )
+
+        return states
+
+    def _fail(self, path: str, error: Exception) -> None:
+        self.failures[path] = error
+        print(f"❌ {path}: {error}")
+
+    def _grade(self, path: str, doc: str) -> tuple[float, str]:
+        if self.budget is not None:
+            self.budget.check(*estimate_judge_tokens(doc))
+        with activate(self.deadline):
+            return recorded_grade(self.history, "grade", path, doc, self.session.grade, self.budget)
+
+    def _step(self, state: DocumentState) -> DocumentState:
+        """Rewrites a document once and grades the result, keeping the better version."""
+        # Calls in flight when the deadline passes are cut off instead of run to completion
+        with activate(self.deadline):
+            model = plan_iteration(state.doc, state.feedback, self.budget)
+            if model is None:
+                raise BudgetExceededError(f"No model fits the budget ({self.budget.summary()})")
+
+            attempt = state.attempts + 1
+            improved_doc = recorded_improve(
+                self.history,
+                state.best_path,
+                state.doc,
+                state.feedback,
+                self.session.improve,
+                model,
+                self.budget,
+            )
+            improved_path = generate_improved_path(state.path, attempt)
+            write_file(improved_path, improved_doc)
+            score, feedback = recorded_grade(
+                self.history, "grade", improved_path, improved_doc, self.session.grade, self.budget
+            )
+
+            if score <= state.score:
+                # Keep building on the best version; the attempt still counts
+                return state._replace(attempts=attempt)
+            return state._replace(
+                score=score,
+                best_path=improved_path,
+                doc=improved_doc,
+                feedback=feedback,
+                attempts=attempt,
+            )
+
+
+def format_schedule_report(
+    states: dict[str, DocumentState], failures: Optional[dict[str, Exception]] = None
+) -> str:
+    """Formats per-document results, ordered by weighted gain, with totals and failures."""
+    rows = [("Document", "Weight", "Original", "Best", "Attempts", "Best version")]
+    for state in sorted(states.values(), key=lambda state: -state.gain):
+        rows.append(
+            (
+                os.path.relpath(state.path),
+                f"{state.weight:g}",
+                format_percentage(state.original_score),
+                format_percentage(state.score),
+                str(state.attempts),
+                os.path.relpath(state.best_path),
+            )
+        )
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    total_gain = sum(state.gain for state in states.values())
+    lines.append(f"\n📈 Weighted quality gained: {total_gain:.3f}")
+    for path, error in sorted((failures or {}).items()):
+        lines.append(f"❌ Failed: {os.path.relpath(path)}: {error}")
+    return "\n".join(lines)
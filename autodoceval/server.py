@@ -0,0 +1,314 @@
+"""Grading daemon and client module for AutoDocEval."""
+
+import http.client
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from .auto_improve import auto_improve_document
+from .session import Session
+
+# Constants
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE = 32
+
+
+class ServerBusyError(Exception):
+    """Raised when the server queue is full and a request is rejected."""
+
+
+class GradingService:
+    """Dispatches API requests to a shared session with bounded queueing.
+
+    At most ``workers`` requests run at once; up to ``max_queue`` more wait
+    for a slot. Anything beyond that is rejected immediately so callers can
+    back off instead of piling onto a saturated daemon. Requests arrive on a
+    thread each, but judge calls borrow evaluators from the session's pool,
+    so warm evaluators are reused across requests instead of being built for
+    each one.
+    """
+
+    def __init__(
+        self,
+        session: Optional[Session] = None,
+        workers: int = DEFAULT_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+    ):
+        self.session = session or Session()
+        self.workers = workers
+        self.max_queue = max_queue
+        self._admitted = threading.BoundedSemaphore(workers + max_queue)
+        self._slots = threading.BoundedSemaphore(workers)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+        self.completed = 0
+
+    def supports(self, action: str) -> bool:
+        """Whether the service exposes an action."""
+        return action in ("grade", "improve", "compare", "auto-improve")
+
+    def handle(self, action: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Runs an API action, waiting for a worker slot if needed."""
+        if not self.supports(action):
+            raise ValueError(f"Unknown action: {action}")
+        handler = getattr(self, f"_{action.replace('-', '_')}")
+
+        if not self._admitted.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ServerBusyError("Server queue is full")
+        try:
+            with self._lock:
+                self.queued += 1
+            with self._slots:
+                with self._lock:
+                    self.queued -= 1
+                    self.active += 1
+                try:
+                    return handler(payload)
+                finally:
+                    with self._lock:
+                        self.active -= 1
+                        self.completed += 1
+        finally:
+            self._admitted.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Returns queue and session statistics."""
+        with self._lock:
+            queue = {
+                "active": self.active,
+                "queued": self.queued,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+            }
+        return {**queue, **self.session.stats()}
+
+    def _grade(self, payload: dict[str, Any]) -> dict[str, Any]:
+        score, reason = self.session.grade(payload["content"])
+        return {"score": score, "reason": reason}
+
+    def _improve(self, payload: dict[str, Any]) -> dict[str, Any]:
+        feedback = payload.get("feedback")
+        if feedback is None:
+            _, feedback = self.session.grade(payload["content"])
+        return {"improved": self.session.improve(payload["content"], feedback)}
+
+    def _compare(self, payload: dict[str, Any]) -> dict[str, Any]:
+        original_score, original_reason = self.session.grade(payload["original"])
+        improved_score, improved_reason = self.session.grade(payload["improved"])
+        return {
+            "original_score": original_score,
+            "original_reason": original_reason,
+            "improved_score": improved_score,
+            "improved_reason": improved_reason,
+            "difference": improved_score - original_score,
+        }
+
+    def _auto_improve(self, payload: dict[str, Any]) -> dict[str, Any]:
+        kwargs = {key: payload[key] for key in ("max_iterations", "target_score") if key in payload}
+        versions = auto_improve_document(payload["path"], session=self.session, **kwargs)
+        return {"versions": [{"path": path, "score": score} for path, score in versions]}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """JSON-over-HTTP front end for a GradingService."""
+
+    server_version = "autodoceval"
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _send(self, status: int, body: dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send(200, self.server.service.stats())
+        else:
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+
+    def do_POST(self):
+        action = self.path.strip("/")
+        try:
+            # Read the body even when rejecting, so the client is not cut off mid-send
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        if not self.server.service.supports(action):
+            self._send(404, {"error": f"Unknown endpoint: {self.path}"})
+            return
+
+        try:
+            payload = json.loads(body or b"{}")
+            result = self.server.service.handle(action, payload)
+        except KeyError as e:
+            self._send(400, {"error": f"Missing field: {e}"})
+        except ServerBusyError as e:
+            self._send(503, {"error": str(e)})
+        except (ValueError, FileNotFoundError) as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+        else:
+            self._send(200, result)
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(
+    service: GradingService,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+) -> socketserver.BaseServer:
+    """Creates an HTTP server bound to a TCP port or a Unix socket.
+
+    A stale socket left at ``socket_path`` by a previous daemon is replaced;
+    any other file there is left alone and binding fails.
+    """
+    if socket_path:
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(socket_path, RequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), RequestHandler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    socket_path: Optional[str] = None,
+    workers: int = DEFAULT_WORKERS,
+    max_queue: int = DEFAULT_MAX_QUEUE,
+    calls_per_minute: Optional[float] = None,
+    adaptive: bool = False,
+) -> None:
+    """Runs the grading daemon until interrupted.
+
+    With ``adaptive``, LLM calls in flight are tuned between 1 and ``workers``
+    from observed latency and rate limits; ``/health`` reports the limit.
+    """
+    session = Session(
+        calls_per_minute=calls_per_minute,
+        max_concurrency=workers if adaptive else None,
+        adaptive_concurrency=adaptive,
+    )
+    service = GradingService(session, workers, max_queue)
+    server = create_server(service, host, port, socket_path)
+    address = f"unix:{socket_path}" if socket_path else f"http://{host}:{port}"
+    print(f"🚀 Serving on {address} ({workers} workers, queue of {max_queue})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class ServerClient:
+    """Thin client that delegates work to a running daemon.
+
+    Args:
+        address: ``http://host:port`` or ``unix:/path/to/socket``
+        timeout: Socket timeout in seconds
+    """
+
+    def __init__(self, address: str, timeout: Optional[float] = None):
+        self.address = address
+        self.timeout = timeout
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self.address.startswith("unix:"):
+            return _UnixHTTPConnection(self.address[len("unix:") :], self.timeout)
+        host_port = self.address.split("://", 1)[-1].rstrip("/")
+        return http.client.HTTPConnection(host_port, timeout=self.timeout)
+
+    def request(self, action: str, payload: Optional[dict[str, Any]] = None) -> dict[str, Any]:
+        """Sends an API request and returns the decoded response."""
+        connection = self._connection()
+        try:
+            if payload is None:
+                connection.request("GET", f"/{action}")
+            else:
+                body = json.dumps(payload)
+                connection.request("POST", f"/{action}", body, {"Content-Type": "application/json"})
+            response = connection.getresponse()
+            result = json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+
+        if response.status == 503:
+            raise ServerBusyError(result.get("error", "Server busy"))
+        if response.status != 200:
+            raise RuntimeError(f"Server error ({response.status}): {result.get('error')}")
+        return result
+
+    def grade(self, doc_content: str) -> tuple[float, str]:
+        """Evaluates a document on the server."""
+        result = self.request("grade", {"content": doc_content})
+        return result["score"], result["reason"]
+
+    def improve(self, doc_content: str, feedback: Optional[str] = None) -> str:
+        """Improves a document on the server, grading it first if no feedback is given."""
+        return self.request("improve", {"content": doc_content, "feedback": feedback})["improved"]
+
+    def compare(self, original: str, improved: str) -> dict[str, Any]:
+        """Grades two versions of a document on the server."""
+        return self.request("compare", {"original": original, "improved": improved})
+
+    def auto_improve(
+        self, doc_path: str, max_iterations: int, target_score: float
+    ) -> list[tuple[str, float]]:
+        """Runs the auto-improvement loop on the server for a local path."""
+        result = self.request(
+            "auto-improve",
+            {
+                "path": os.path.abspath(doc_path),
+                "max_iterations": max_iterations,
+                "target_score": target_score,
+            },
+        )
+        return [(version["path"], version["score"]) for version in result["versions"]]
+
+    def health(self) -> dict[str, Any]:
+        """Returns the server's queue and cache statistics."""
+        return self.request("health")
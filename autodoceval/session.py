@@ -0,0 +1,488 @@
+"""Long-lived evaluation session module for AutoDocEval."""
+
+import contextlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from concurrent.futures import CancelledError, Future, wait
+from typing import Any, Callable, Optional
+
+from .budget import DEFAULT_MODEL, Budget
+from .deadline import POLL_INTERVAL, DeadlineExceededError, current_deadline
+from .evaluator import evaluate_document, setup_evaluator
+from .file_tools import content_hash
+from .improver import improve_document, setup_client
+from .profiling import counter, span
+
+# Constants
+DEFAULT_CACHE_SIZE = 1024
+DEFAULT_INITIAL_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 32
+BACKOFF_FACTOR = 0.5  # Multiplicative decrease on throttling or a latency spike
+LATENCY_TOLERANCE = 2.0  # Latency above this multiple of the baseline is a spike
+LATENCY_SMOOTHING = 0.1  # Weight of each new sample in the latency baseline
+LIMIT_HISTORY_SIZE = 256
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether an error, or an error it was raised from, is an HTTP 429 rate limit."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError":
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class RateLimiter:
+    """Token bucket limiting how many LLM calls start per minute."""
+
+    def __init__(self, calls_per_minute: Optional[float] = None):
+        self.calls_per_minute = calls_per_minute
+        self._tokens = calls_per_minute or 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a call may start."""
+        if not self.calls_per_minute:
+            return
+
+        rate = self.calls_per_minute / 60.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.calls_per_minute, self._tokens + (now - self._updated) * rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / rate
+            time.sleep(wait)
+
+
+class SharedRateLimiter:
+    """Token bucket kept in a file, so that separate processes share one call rate.
+
+    Every acquire reads and updates the bucket under an exclusive ``fcntl``
+    lock on the file, which lets pytest-xdist workers or parallel CI jobs on
+    one machine stay under a provider limit together. Where ``fcntl`` is not
+    available the limit applies to each process on its own.
+    """
+
+    def __init__(self, path: str, calls_per_minute: Optional[float] = None):
+        self.path = path
+        self.calls_per_minute = calls_per_minute
+        self._local = RateLimiter(calls_per_minute)
+
+    def acquire(self) -> None:
+        """Blocks until a call may start."""
+        if not self.calls_per_minute:
+            return
+        try:
+            import fcntl
+        except ImportError:
+            self._local.acquire()
+            return
+
+        rate = self.calls_per_minute / 60.0
+        while True:
+            with open(self.path, "a+", encoding="utf-8") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    f.seek(0)
+                    raw = f.read()
+                    now = time.time()
+                    state = json.loads(raw) if raw.strip() else {}
+                    tokens = state.get("tokens", self.calls_per_minute)
+                    elapsed = max(now - state.get("updated", now), 0.0)
+                    tokens = min(self.calls_per_minute, tokens + elapsed * rate)
+                    wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+                    if not wait:
+                        tokens -= 1
+                    f.seek(0)
+                    f.truncate()
+                    json.dump({"tokens": tokens, "updated": now}, f)
+                    f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class AdaptiveLimiter:
+    """AIMD limit on LLM calls in flight, tuned from observed latency and rate limits.
+
+    A call that finishes within ``tolerance`` times the smoothed latency while
+    the limit was fully used raises the limit by ``1 / limit``, which adds about
+    one slot per round of calls. A rate-limit error or a latency spike
+    multiplies the limit by ``backoff``, at most once per baseline latency so
+    that a burst of failures from one round counts as a single signal.
+
+    Args:
+        initial: Limit to start from
+        min_limit: Lowest the limit goes
+        max_limit: Highest the limit goes
+        backoff: Factor the limit is multiplied by on throttling or a spike
+        tolerance: Multiple of the baseline latency that counts as a spike
+    """
+
+    def __init__(
+        self,
+        initial: int = DEFAULT_INITIAL_CONCURRENCY,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_MAX_CONCURRENCY,
+        backoff: float = BACKOFF_FACTOR,
+        tolerance: float = LATENCY_TOLERANCE,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.baseline: Optional[float] = None
+        self.throttled = 0
+        self.spikes = 0
+        self.history: deque[dict[str, Any]] = deque(maxlen=LIMIT_HISTORY_SIZE)
+        self._last_decrease = float("-inf")
+        self._saturated = False  # Whether every slot was used since the limit last changed
+        self._condition = threading.Condition()
+
+    @property
+    def current(self) -> int:
+        """Number of calls allowed in flight right now."""
+        return max(int(self.limit), self.min_limit)
+
+    def acquire(self) -> None:
+        """Blocks until a call may start."""
+        with self._condition:
+            while self.in_flight >= self.current:
+                self._condition.wait()
+            self.in_flight += 1
+            self._saturated |= self.in_flight >= self.current
+
+    def release(self, latency: float, throttled: bool = False) -> None:
+        """Ends a call and adjusts the limit from how it went.
+
+        Args:
+            latency: Seconds the call took
+            throttled: Whether the call was rejected with a rate limit
+        """
+        with self._condition:
+            self.in_flight -= 1
+            spike = (
+                not throttled
+                and self.baseline is not None
+                and latency > self.baseline * self.tolerance
+            )
+            if not throttled:
+                # Spikes update the baseline too, so a lasting slowdown becomes the new normal
+                if self.baseline is None:
+                    self.baseline = latency
+                else:
+                    self.baseline += LATENCY_SMOOTHING * (latency - self.baseline)
+
+            if throttled or spike:
+                self.throttled += throttled
+                self.spikes += spike
+                now = time.monotonic()
+                if now - self._last_decrease >= (self.baseline or 0.0):
+                    self._last_decrease = now
+                    self._set_limit(
+                        max(self.min_limit, self.limit * self.backoff),
+                        "rate limited" if throttled else "latency spike",
+                    )
+            elif self._saturated and self.limit < self.max_limit:
+                self._set_limit(min(self.max_limit, self.limit + 1 / self.limit), "increase")
+            self._condition.notify_all()
+
+    def metrics(self) -> dict[str, Any]:
+        """Returns the current limit, latency baseline, signal counts and limit history."""
+        with self._condition:
+            return {
+                "concurrency_limit": self.current,
+                "in_flight": self.in_flight,
+                "latency_baseline": self.baseline,
+                "rate_limited": self.throttled,
+                "latency_spikes": self.spikes,
+                "limit_history": list(self.history),
+            }
+
+    def _set_limit(self, limit: float, reason: str) -> None:
+        previous = self.current
+        self.limit = limit
+        if self.current != previous:
+            self._saturated = self.in_flight >= self.current
+            self.history.append({"time": time.time(), "limit": self.current, "reason": reason})
+            counter("concurrency", limit=self.current)
+
+
+class ResultCache:
+    """Thread-safe LRU cache of LLM results keyed by content hash."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Returns the cached value for a key, or None."""
+        with self._lock:
+            if key not in self._items:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: str, value: Any) -> None:
+        """Stores a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one call.
+
+    The first caller of a key runs the call; callers arriving while it is in
+    flight wait for it and get the same result, or the same exception. A
+    waiting caller gives up when its own active deadline passes, and if the
+    call it waited on ran out of time or was cancelled, it runs the call
+    itself rather than inheriting the other caller's deadline.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Runs ``fn`` unless a call with the same key is in flight, then shares its result."""
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+
+            with span("single_flight_wait", "queue"):
+                self._wait(future)
+            try:
+                return future.result()
+            except (DeadlineExceededError, CancelledError):
+                # The leader's deadline, not ours: run the call as the new leader
+                continue
+
+        try:
+            result = fn()
+        except BaseException as e:
+            # Forget the call before waking followers, so one retrying starts a new call
+            self._forget(key)
+            future.set_exception(e)
+            raise
+        self._forget(key)
+        future.set_result(result)
+        return result
+
+    def _wait(self, future: Future) -> None:
+        """Waits for a call in flight, up to the caller's own active deadline."""
+        deadline = current_deadline()
+        if deadline is None:
+            wait([future])
+            return
+        while not future.done():
+            if deadline.expired:
+                raise DeadlineExceededError("Deadline reached while waiting for a shared call")
+            wait([future], timeout=POLL_INTERVAL)
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            del self._calls[key]
+
+
+class EvaluatorPool:
+    """GEval evaluators reused across threads, each lent to one judge call at a time.
+
+    GEval stores the score of the last measurement on the metric itself, so an
+    evaluator is checked out for the duration of a call. A new one is created
+    only when every evaluator is busy, so the pool grows to the number of judge
+    calls in flight at once rather than the number of threads ever seen.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self._idle: list[Any] = []
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def checkout(self) -> Iterator[Any]:
+        """Lends an idle evaluator, creating one if none is free."""
+        with self._lock:
+            evaluator = self._idle.pop() if self._idle else None
+        if evaluator is None:
+            evaluator = setup_evaluator()
+            with self._lock:
+                self.created += 1
+
+        abandoned = False
+        try:
+            yield evaluator
+        except DeadlineExceededError:
+            # The abandoned judge may still be measuring with this evaluator
+            abandoned = True
+            raise
+        finally:
+            if not abandoned:
+                with self._lock:
+                    self._idle.append(evaluator)
+
+
+class Session:
+    """Keeps clients, evaluators, a result cache and a rate limiter warm across calls.
+
+    One OpenAI client is shared by all threads, and GEval evaluators are kept in
+    an ``EvaluatorPool`` from which each judge call borrows one. Identical grade
+    or improve requests made at the same time share one LLM call.
+    ``max_concurrency`` caps how many judge and rewriter calls are in flight at
+    once across every thread using the session. With ``adaptive_concurrency``
+    the cap is instead tuned by an ``AdaptiveLimiter`` shared by judge and
+    rewriter calls, and ``max_concurrency`` is its ceiling.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        calls_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        adaptive_concurrency: bool = False,
+    ):
+        self.cache = ResultCache(cache_size)
+        self.flights = SingleFlight()
+        self.limiter = RateLimiter(calls_per_minute)
+        self.max_concurrency = max_concurrency
+        self.adaptive: Optional[AdaptiveLimiter] = None
+        self._slots = None
+        if adaptive_concurrency:
+            ceiling = max_concurrency or DEFAULT_MAX_CONCURRENCY
+            self.adaptive = AdaptiveLimiter(
+                initial=min(DEFAULT_INITIAL_CONCURRENCY, ceiling), max_limit=ceiling
+            )
+        elif max_concurrency:
+            self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.evaluators = EvaluatorPool()
+
+    @property
+    def client(self):
+        """Shared OpenAI client, created on first use."""
+        with self._client_lock:
+            if self._client is None:
+                self._client = setup_client()
+            return self._client
+
+    def _call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Runs an LLM call once the rate limiter and concurrency cap allow it."""
+        with span("rate_limit_wait", "queue"):
+            self.limiter.acquire()
+        if self.adaptive is not None:
+            return self._adaptive_call(fn, *args, **kwargs)
+        if self._slots is None:
+            return fn(*args, **kwargs)
+        with span("concurrency_wait", "queue"):
+            self._slots.acquire()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    def _adaptive_call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with span("concurrency_wait", "queue"):
+            self.adaptive.acquire()
+        start = time.perf_counter()
+        throttled = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            throttled = is_rate_limited(e)
+            raise
+        finally:
+            self.adaptive.release(time.perf_counter() - start, throttled)
+
+    def grade(self, doc_content: str, budget: Optional[Budget] = None) -> tuple[float, str]:
+        """Evaluates a document, reusing cached or in-flight results for identical content."""
+        key = f"grade:{content_hash(doc_content)}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        def judge() -> tuple[float, str]:
+            # Borrowed only once a call may start, so waiting calls hold no evaluator
+            with self.evaluators.checkout() as evaluator:
+                return evaluate_document(doc_content, evaluator=evaluator, budget=budget)
+
+        def grade() -> tuple[float, str]:
+            result = self._call(judge)
+            self.cache.put(key, result)
+            return result
+
+        return self.flights.do(key, grade)
+
+    def improve(
+        self,
+        doc_content: str,
+        feedback: str,
+        model: str = DEFAULT_MODEL,
+        budget: Optional[Budget] = None,
+    ) -> str:
+        """Improves a document, reusing cached or in-flight results for identical inputs."""
+        key = f"improve:{model}:{content_hash(doc_content)}:{content_hash(feedback)}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        def improve() -> str:
+            result = self._call(
+                improve_document,
+                doc_content,
+                feedback,
+                client=self.client,
+                model=model,
+                budget=budget,
+            )
+            self.cache.put(key, result)
+            return result
+
+        return self.flights.do(key, improve)
+
+    def stats(self) -> dict[str, Any]:
+        """Returns cache statistics, plus concurrency metrics when adaptive."""
+        stats = {
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "coalesced": self.flights.coalesced,
+            "evaluators": self.evaluators.created,
+        }
+        if self.adaptive is not None:
+            stats.update(self.adaptive.metrics())
+        return stats
@@ -0,0 +1,191 @@
+"""Sharded grading module for AutoDocEval."""
+
+import json
+from typing import Any, Union
+
+from .file_tools import content_hash, read_file, write_file
+from .git_diff import BlobScoreCache, blob_hash
+from .results import ResultTable
+
+# Constants
+SHARD_FORMAT_VERSION = 1
+SHARD_COMMANDS = ("batch-grade", "auto-improve")
+
+
+class ShardError(Exception):
+    """Error a document hit on another node, restored from its shard file."""
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parses ``i/N`` into a 1-based shard number and the shard count."""
+    index, _, count = spec.partition("/")
+    try:
+        shard = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard: {spec} (expected i/N, e.g. 1/4)") from None
+    if shard[1] < 1 or not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"Invalid shard: {spec} (i must be between 1 and N)")
+    return shard
+
+
+def shard_of(content: str, count: int) -> int:
+    """Returns the 1-based shard a document belongs to.
+
+    The shard depends only on the document's content, so every node computes
+    the same partition from its own checkout regardless of paths or file order,
+    and identical documents always land on the same node.
+    """
+    return int(content_hash(content)[:16], 16) % count + 1
+
+
+def select_shard(paths: list[str], index: int, count: int) -> list[str]:
+    """Returns the documents of one shard, in the order given."""
+    if count == 1:
+        return list(paths)
+    return [path for path in paths if shard_of(read_file(path), count) == index]
+
+
+def default_shard_path(index: int, count: int) -> str:
+    """Shard result file written when no path is given."""
+    return f"autodoceval-shard-{index}-of-{count}.json"
+
+
+def write_grade_shard(
+    path: str,
+    shard: tuple[int, int],
+    results: ResultTable,
+    clusters: dict[str, list[str]],
+) -> None:
+    """Writes the batch-grade results of one shard.
+
+    Results of documents that were actually graded (the cluster
+    representatives) carry the git blob hash of their content, so merged
+    results can seed the score cache of ``grade --git-diff``. Results shared
+    from a near-duplicate carry none: the cache holds exact-content scores.
+    """
+    shard_results: dict[str, dict[str, Any]] = {}
+    for doc_path, score, reason in results:
+        shard_results[doc_path] = {"score": score, "reason": reason}
+        if doc_path in clusters:
+            with open(doc_path, "rb") as f:
+                shard_results[doc_path]["blob"] = blob_hash(f.read())
+    _write_shard(path, "batch-grade", shard, {"results": shard_results, "clusters": clusters})
+
+
+def write_improve_shard(
+    path: str,
+    shard: tuple[int, int],
+    results: dict[str, Union[list[tuple[str, float]], Exception]],
+) -> None:
+    """Writes the auto-improve results of one shard."""
+    shard_results = {}
+    for doc_path, versions in results.items():
+        if isinstance(versions, Exception):
+            shard_results[doc_path] = {"error": f"{type(versions).__name__}: {versions}"}
+        else:
+            shard_results[doc_path] = {"versions": [list(version) for version in versions]}
+    _write_shard(path, "auto-improve", shard, {"results": shard_results})
+
+
+def _write_shard(path: str, command: str, shard: tuple[int, int], data: dict[str, Any]) -> None:
+    header = {"format": SHARD_FORMAT_VERSION, "command": command, "shard": list(shard)}
+    write_file(path, json.dumps({**header, **data}, indent=2))
+
+
+def load_shard(path: str) -> dict[str, Any]:
+    """Reads a shard result file."""
+    data = json.loads(read_file(path))
+    if data.get("format") != SHARD_FORMAT_VERSION or data.get("command") not in SHARD_COMMANDS:
+        raise ValueError(f"Not an AutoDocEval shard file: {path}")
+    return data
+
+
+def merge_shards(paths: list[str]) -> dict[str, Any]:
+    """Combines the shard files of one sharded run.
+
+    Every shard of the run must be present exactly once, and all shards must
+    come from the same command and shard count.
+
+    Args:
+        paths: Shard result files
+
+    Returns:
+        Dictionary with the ``command``, shard ``count``, merged ``results`` by
+        document path and, for batch-grade, merged ``clusters``
+    """
+    if not paths:
+        raise ValueError("No shard files to merge")
+
+    shards = [load_shard(path) for path in paths]
+    command, count = shards[0]["command"], shards[0]["shard"][1]
+    seen: dict[int, str] = {}
+    for path, shard in zip(paths, shards):
+        index, shard_count = shard["shard"]
+        if shard["command"] != command or shard_count != count:
+            raise ValueError(
+                f"{path} is shard {index}/{shard_count} of {shard['command']}, "
+                f"not of the same {command} run over {count} shards"
+            )
+        if index in seen:
+            raise ValueError(f"Shard {index}/{count} given twice: {seen[index]} and {path}")
+        seen[index] = path
+
+    missing = [f"{index}/{count}" for index in range(1, count + 1) if index not in seen]
+    if missing:
+        raise ValueError(f"Missing shard(s): {', '.join(missing)}")
+
+    merged: dict[str, Any] = {"command": command, "count": count, "results": {}}
+    if command == "batch-grade":
+        merged["clusters"] = {}
+    for shard in shards:
+        merged["results"].update(shard["results"])
+        if command == "batch-grade":
+            merged["clusters"].update(shard["clusters"])
+    merged["results"] = dict(sorted(merged["results"].items()))
+    return merged
+
+
+def grade_results(merged: dict[str, Any]) -> ResultTable:
+    """Returns merged batch-grade results as a table; close it when done."""
+    table = ResultTable()
+    for path, row in merged["results"].items():
+        table.append(path, row["score"], row["reason"])
+    return table
+
+
+def improve_results(
+    merged: dict[str, Any],
+) -> dict[str, Union[list[tuple[str, float]], Exception]]:
+    """Returns merged auto-improve results as versions, or the error, by path."""
+    results: dict[str, Union[list[tuple[str, float]], Exception]] = {}
+    for path, row in merged["results"].items():
+        if "error" in row:
+            results[path] = ShardError(row["error"])
+        else:
+            results[path] = [(version, score) for version, score in row["versions"]]
+    return results
+
+
+def update_score_cache(merged: dict[str, Any], cache_path: str) -> int:
+    """Adds merged batch-grade scores to a blob score cache and returns how many were new.
+
+    Only documents that were graded themselves are added; shared results have no blob.
+    """
+    cache = BlobScoreCache(cache_path)
+    added = 0
+    for row in merged["results"].values():
+        if "blob" not in row:
+            continue
+        if cache.get(row["blob"]) is None:
+            added += 1
+        cache.put(row["blob"], row["score"], row["reason"])
+    cache.save()
+    return added
+
+
+def format_merge_report(merged: dict[str, Any]) -> str:
+    """Formats a one-line summary of a merge."""
+    return (
+        f"🔗 Merged {merged['count']} {merged['command']} shard(s): "
+        f"{len(merged['results'])} documents"
+    )
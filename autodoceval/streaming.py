@@ -0,0 +1,332 @@
+"""Streaming corpus pipeline module for AutoDocEval."""
+
+import fnmatch
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
+
+from .batch import is_output_document
+from .budget import DEFAULT_MODEL
+from .file_tools import improved_output_path, read_file, split_sections, write_file
+from .history import HistoryStore, recorded_grade, recorded_improve
+from .profiling import counter, span
+
+if TYPE_CHECKING:
+    from .session import Session
+
+# Constants
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_PATTERN = "*.md"
+POLL_INTERVAL = 0.1  # Seconds between checks for a stopped pipeline while blocked
+_DONE = object()
+
+
+class StageStats:
+    """Throughput counters of one stream stage."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy = 0.0  # Seconds spent inside the stage function, summed over workers
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, produced: int, busy: float, failed: bool = False) -> None:
+        with self._lock:
+            if self.started is None:
+                self.started = time.perf_counter() - busy
+            self.items_in += 1
+            self.items_out += produced
+            self.errors += failed
+            self.busy += busy
+
+    def snapshot(self) -> dict[str, Any]:
+        """Returns the counters plus items per second and worker utilisation."""
+        with self._lock:
+            end = self.finished or time.perf_counter()
+            elapsed = end - self.started if self.started is not None else 0.0
+            return {
+                "workers": self.workers,
+                "items_in": self.items_in,
+                "items_out": self.items_out,
+                "errors": self.errors,
+                "throughput": self.items_out / elapsed if elapsed > 0 else 0.0,
+                "utilisation": self.busy / (elapsed * self.workers) if elapsed > 0 else 0.0,
+            }
+
+
+class StreamPipeline:
+    """Chain of stages connected by bounded queues, each with its own worker threads.
+
+    Items flow from a source iterable through every stage and out of ``run``
+    as soon as they are ready. A full queue blocks the stage feeding it, so a
+    slow stage throttles everything upstream of it and no more than
+    ``queue_size`` items wait between two stages, whatever the corpus size.
+    With more than one worker a stage may reorder items. An exception raised
+    for one item is counted and kept in ``errors`` and the item is dropped;
+    the rest of the stream carries on.
+
+    Args:
+        source: Iterable (typically a generator) of input items
+        queue_size: Capacity of each queue between stages
+    """
+
+    def __init__(self, source: Iterable[Any], queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.source = source
+        self.queue_size = queue_size
+        self.stages: list[tuple[str, Callable[[Any], Iterable[Any]], int]] = []
+        self.errors: list[tuple[str, Any, Exception]] = []
+        self._stats: dict[str, StageStats] = {}
+        self._stop = threading.Event()
+
+    def map(self, name: str, fn: Callable[[Any], Any], workers: int = 1) -> "StreamPipeline":
+        """Adds a stage producing one output per item; returning None drops the item."""
+
+        def one(item: Any) -> Iterable[Any]:
+            result = fn(item)
+            return () if result is None else (result,)
+
+        return self.flat_map(name, one, workers)
+
+    def flat_map(
+        self, name: str, fn: Callable[[Any], Iterable[Any]], workers: int = 1
+    ) -> "StreamPipeline":
+        """Adds a stage producing any number of outputs per item, e.g. from a generator."""
+        if name in self._stats:
+            raise ValueError(f"Duplicate stream stage: {name}")
+        self.stages.append((name, fn, workers))
+        self._stats[name] = StageStats(name, workers)
+        return self
+
+    def run(self) -> Iterator[Any]:
+        """Starts the stages and yields the outputs of the last one as they arrive."""
+        queues = [queue.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(queues[0],), daemon=True)]
+        for (name, fn, workers), inbox, outbox in zip(self.stages, queues, queues[1:]):
+            remaining = [workers]
+            lock = threading.Lock()
+            for _ in range(workers):
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(name, fn, inbox, outbox, remaining, lock),
+                        daemon=True,
+                    )
+                )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = self._get(queues[-1])
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            # A consumer that stops early releases every blocked stage
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Returns the throughput counters of every stage, in pipeline order."""
+        return {name: self._stats[name].snapshot() for name, _, _ in self.stages}
+
+    def _feed(self, outbox: queue.Queue) -> None:
+        try:
+            for item in self.source:
+                if not self._put(outbox, item):
+                    return
+        except Exception as e:
+            self.errors.append(("source", None, e))
+        self._put(outbox, _DONE)
+
+    def _work(
+        self,
+        name: str,
+        fn: Callable[[Any], Iterable[Any]],
+        inbox: queue.Queue,
+        outbox: queue.Queue,
+        remaining: list[int],
+        lock: threading.Lock,
+    ) -> None:
+        stats = self._stats[name]
+        while True:
+            item = self._get(inbox)
+            if item is _DONE:
+                break
+            counter(f"queue:{name}", depth=inbox.qsize())
+            start = time.perf_counter()
+            produced = 0
+            try:
+                with span(name, "stream"):
+                    for output in fn(item):
+                        produced += 1
+                        if not self._put(outbox, output):
+                            return
+            except Exception as e:
+                self.errors.append((name, item, e))
+                stats.record(produced, time.perf_counter() - start, failed=True)
+                continue
+            stats.record(produced, time.perf_counter() - start)
+
+        # Let sibling workers see the end too; the last one out passes it downstream
+        self._put(inbox, _DONE)
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            stats.finished = time.perf_counter()
+            self._put(outbox, _DONE)
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """Blocks until the item fits, returning False if the pipeline was stopped."""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue) -> Any:
+        """Blocks for the next item, returning the end marker if the pipeline was stopped."""
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+
+class CorpusItem(NamedTuple):
+    """A document, or one section of it, moving through a corpus stream."""
+
+    path: str
+    content: str = ""
+    section: Optional[int] = None
+    score: Optional[float] = None
+    reason: Optional[str] = None
+    improved_path: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.path if self.section is None else f"{self.path}#{self.section}"
+
+
+def discover_documents(paths: list[str], pattern: str = DEFAULT_PATTERN) -> Iterator[str]:
+    """Lazily yields documents under files and directories, walking directories in order.
+
+    Improved documents written by earlier runs are skipped in directories, as
+    in ``batch.collect_documents``; files named explicitly are always yielded.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"File not found: {path}")
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if fnmatch.fnmatch(name, pattern) and not is_output_document(name):
+                    yield os.path.join(root, name)
+
+
+def corpus_pipeline(
+    paths: list[str],
+    pattern: str = DEFAULT_PATTERN,
+    session: Optional["Session"] = None,
+    sections: bool = False,
+    improve: bool = False,
+    target_score: float = 0.7,
+    read_workers: int = 2,
+    grade_workers: int = 4,
+    improve_workers: int = 2,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    history: Optional[HistoryStore] = None,
+) -> StreamPipeline:
+    """Builds the discovery -> read -> chunk -> grade -> improve -> write stream of a corpus.
+
+    Args:
+        paths: Files and directories to stream documents from
+        pattern: Filename pattern of documents in directories
+        session: Optional session whose warm clients and cache are reused
+        sections: Grade (and improve) each markdown section on its own
+        improve: Rewrite documents scoring below ``target_score``
+        target_score: Score under which a document is improved
+        read_workers: Threads reading files
+        grade_workers: Threads grading
+        improve_workers: Threads rewriting
+        queue_size: Capacity of each queue between stages
+        history: Optional store to record every grade and improve event in,
+            under the document path or ``path#section``
+
+    Returns:
+        Pipeline yielding one graded ``CorpusItem`` per document or section
+    """
+    if session is None:
+        # Import here to avoid circular imports
+        from .session import Session
+
+        session = Session(max_concurrency=grade_workers + (improve_workers if improve else 0))
+
+    def read(path: str) -> CorpusItem:
+        return CorpusItem(path, read_file(path))
+
+    def chunk(item: CorpusItem) -> Iterator[CorpusItem]:
+        for index, section in enumerate(split_sections(item.content)):
+            if section.strip():
+                yield item._replace(content=section, section=index)
+
+    def grade(item: CorpusItem) -> CorpusItem:
+        score, reason = recorded_grade(history, "grade", item.label, item.content, session.grade)
+        return item._replace(score=score, reason=reason)
+
+    def rewrite(item: CorpusItem) -> CorpusItem:
+        if item.score >= target_score:
+            return item
+        improved = recorded_improve(
+            history, item.label, item.content, item.reason, session.improve, DEFAULT_MODEL
+        )
+        root, ext = os.path.splitext(improved_output_path(item.path))
+        suffix = "" if item.section is None else f"_section{item.section}"
+        output_path = f"{root}{suffix}{ext}"
+        write_file(output_path, improved)
+        return item._replace(improved_path=output_path)
+
+    pipeline = StreamPipeline(discover_documents(paths, pattern), queue_size)
+    pipeline.map("read", read, read_workers)
+    if sections:
+        pipeline.flat_map("chunk", chunk)
+    pipeline.map("grade", grade, grade_workers)
+    if improve:
+        pipeline.map("improve", rewrite, improve_workers)
+    return pipeline
+
+
+def format_item(item: CorpusItem) -> str:
+    """Formats one streamed result."""
+    line = f"{item.label}: {item.score * 100:.1f}%"
+    if item.improved_path:
+        line += f" → {item.improved_path}"
+    return line
+
+
+def format_stream_stats(stats: dict[str, dict[str, Any]]) -> str:
+    """Formats per-stage throughput counters."""
+    lines = ["\n🚰 Stage throughput:"]
+    for name, row in stats.items():
+        lines.append(
+            f"{name}: {row['items_in']} in, {row['items_out']} out, {row['errors']} errors, "
+            f"{row['throughput']:.1f}/s with {row['workers']} worker(s), "
+            f"{row['utilisation'] * 100:.0f}% busy"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,215 @@
+"""Watch mode module for AutoDocEval."""
+
+import fnmatch
+import glob
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .compare import format_percentage
+from .evaluator import evaluate_document
+from .file_tools import content_hash, read_file
+
+# Constants
+DEFAULT_PATTERN = "*.md"
+DEFAULT_DEBOUNCE = 0.5  # seconds of quiet before a changed file is graded
+DEFAULT_POLL_INTERVAL = 1.0  # seconds between scans when polling
+CHANGE_EVENTS = ("created", "modified", "moved")  # watchdog events that can change content
+
+
+def print_result(path: str, score: float, previous: Optional[float]) -> None:
+    """Prints a live score line for a re-graded document."""
+    line = f"{path}: {format_percentage(score)}"
+    if previous is not None:
+        line += f" ({'+' if score >= previous else ''}{format_percentage(score - previous)})"
+    print(line, flush=True)
+
+
+class DocumentWatcher:
+    """Re-grades documents in a directory whenever their content changes.
+
+    Changes are picked up through watchdog (inotify, FSEvents, ...) when it is
+    installed, or by polling modification times otherwise. Rapid saves are
+    debounced and unchanged content is skipped by hash. Once changed content is
+    submitted, an evaluation of older content that has not started yet is
+    skipped, and one already running is left to finish but not reported.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        pattern: str = DEFAULT_PATTERN,
+        debounce: float = DEFAULT_DEBOUNCE,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        on_result: Callable[[str, float, Optional[float]], None] = print_result,
+        max_workers: int = 2,
+    ):
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"Directory not found: {directory}")
+
+        self.directory = directory
+        self.pattern = pattern
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.on_result = on_result
+
+        self.hashes: dict[str, str] = {}
+        self.scores: dict[str, float] = {}
+        self._pending: dict[str, float] = {}
+        self._generations: dict[str, int] = {}
+        self._in_flight: dict[str, Future] = {}
+        self._snapshot: dict[str, tuple[int, int]] = {}
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def matches(self, path: str) -> bool:
+        """Whether a path is a document this watcher grades."""
+        return fnmatch.fnmatch(os.path.basename(path), self.pattern)
+
+    def scan(self) -> list[str]:
+        """Polls the directory and returns paths whose mtime or size changed."""
+        current = {}
+        for path in glob.glob(os.path.join(self.directory, "**", self.pattern), recursive=True):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            current[path] = (stat.st_mtime_ns, stat.st_size)
+
+        changed = [path for path, stamp in current.items() if self._snapshot.get(path) != stamp]
+        self._snapshot = current
+        return changed
+
+    def notify(self, path: str, now: Optional[float] = None) -> None:
+        """Records a possible change to a path, restarting its debounce window."""
+        if not self.matches(path):
+            return
+        with self._lock:
+            self._pending[path] = time.monotonic() if now is None else now
+
+    def handle_event(self, event_type: str, src_path: str, dest_path: str = "") -> None:
+        """Notifies a filesystem event, ignoring those that cannot change content.
+
+        Reading a file for grading fires opened and closed events of its own, so
+        reacting to those would re-grade the file forever.
+        """
+        if event_type in CHANGE_EVENTS:
+            self.notify(dest_path or src_path)
+
+    def flush(self, now: Optional[float] = None) -> list[str]:
+        """Submits evaluations for debounced paths whose content hash changed.
+
+        Returns:
+            Paths submitted for grading
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            ready = [path for path, seen in self._pending.items() if now - seen >= self.debounce]
+            for path in ready:
+                del self._pending[path]
+
+        submitted = []
+        for path in ready:
+            try:
+                content = read_file(path)
+            except FileNotFoundError:
+                continue
+
+            digest = content_hash(content)
+            with self._lock:
+                if self.hashes.get(path) == digest:
+                    continue
+                self.hashes[path] = digest
+                # New content makes any evaluation of older content stale
+                generation = self._generations.get(path, 0) + 1
+                self._generations[path] = generation
+                future = self._executor.submit(self._grade, path, generation, content)
+                self._in_flight[path] = future
+            future.add_done_callback(
+                lambda f, path=path, generation=generation: self._finish(path, generation, f)
+            )
+            submitted.append(path)
+        return submitted
+
+    def _grade(self, path: str, generation: int, content: str) -> Optional[tuple[float, str]]:
+        """Grades content unless newer content was submitted before the call started."""
+        with self._lock:
+            if self._generations.get(path) != generation:
+                return None
+        return evaluate_document(content)
+
+    def _finish(self, path: str, generation: int, future: Future) -> None:
+        """Reports a finished evaluation unless newer content superseded it."""
+        with self._lock:
+            if self._in_flight.get(path) is future:
+                del self._in_flight[path]
+            # The newer content has its own evaluation submitted
+            if future.cancelled() or self._generations.get(path) != generation:
+                return
+
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"❌ {path}: {e}", flush=True)
+            with self._lock:
+                if self._generations.get(path) == generation:
+                    self.hashes.pop(path, None)
+            return
+        if result is None:
+            return
+
+        score, _ = result
+        previous = self.scores.get(path)
+        self.scores[path] = score
+        self.on_result(path, score, previous)
+
+    def _start_observer(self):
+        """Starts a watchdog observer if watchdog is installed, else returns None."""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if not event.is_directory:
+                    watcher.handle_event(
+                        event.event_type, event.src_path, getattr(event, "dest_path", "")
+                    )
+
+        observer = Observer()
+        observer.schedule(Handler(), self.directory, recursive=True)
+        observer.start()
+        return observer
+
+    def run(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Grades every document once, then re-grades on change until stopped."""
+        stop_event = stop_event or threading.Event()
+
+        for path in self.scan():
+            self.notify(path, now=0.0)
+        self.flush()
+
+        observer = self._start_observer()
+        mode = "filesystem events" if observer else "polling"
+        print(f"👀 Watching {self.directory} for changes ({mode}). Press Ctrl+C to stop.")
+
+        interval = min(self.debounce, self.poll_interval) / 2 if observer else self.poll_interval
+        try:
+            while not stop_event.wait(interval):
+                if observer is None:
+                    for path in self.scan():
+                        self.notify(path)
+                self.flush()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,13 +1,29 @@
 """Tasks for automating autodoceval development and operation."""
 
-import sys
-from pathlib import Path
+import os
 
-from invoke import task
+from invoke import Exit, task
+
+DEFAULT_FILE = "autodoceval/examples/example_doc.md"
+
+# Session shared by every task of one invoke run, so `invoke grade improve` grades once
+_session = None
+
+
+def shared_session():
+    """Returns the session of this invoke run, creating it on first use."""
+    global _session
+    if not os.environ.get("OPENAI_API_KEY"):
+        raise Exit("❌ Error: OPENAI_API_KEY environment variable not set")
+    if _session is None:
+        from autodoceval.session import Session
+
+        _session = Session()
+    return _session
 
 
 @task
-def grade(c, file="autodoceval/examples/example_doc.md", output=None):
+def grade(c, file=DEFAULT_FILE, output=None):
     """If output is None, the results will be saved in the same directory as the input file."""
     """Grade document clarity.
 
@@ -16,17 +32,13 @@ def grade(c, file="autodoceval/examples/example_doc.md", output=None):
         file: Path to the documentation file to evaluate
         output: Optional path to save evaluation results
     """
-    from autodoceval.cli import main
+    from autodoceval.pipeline import document_pipeline
 
-    args = ["grade", file]
-    if output:
-        args.extend(["--output", output])
-
-    sys.exit(main(args))
+    document_pipeline(file, feedback_output=output, session=shared_session()).run("grade")
 
 
 @task
-def improve(c, file="autodoceval/examples/example_doc.md", feedback=None, output=None):
+def improve(c, file=DEFAULT_FILE, feedback=None, output=None):
     """If output is None, the improved document will be saved in the same directory as the input file."""
     """Generate improved documentation.
 
@@ -36,19 +48,14 @@ def improve(c, file="autodoceval/examples/example_doc.md", feedback=None, output
         feedback: Optional path to feedback file from grade command
         output: Optional path to save improved documentation
     """
-    from autodoceval.cli import main
-
-    args = ["improve", file]
-    if feedback:
-        args.extend(["--feedback", feedback])
-    if output:
-        args.extend(["--output", output])
+    from autodoceval.pipeline import document_pipeline
 
-    sys.exit(main(args))
+    pipeline = document_pipeline(file, output=output, feedback=feedback, session=shared_session())
+    pipeline.run("improve")
 
 
 @task
-def compare(c, original="autodoceval/examples/example_doc.md", improved=None):
+def compare(c, original=DEFAULT_FILE, improved=None):
     """Compare original and improved documents.
 
     Args:
@@ -56,20 +63,18 @@ def compare(c, original="autodoceval/examples/example_doc.md", improved=None):
         original: Path to the original document
         improved: Path to the improved document, defaults to original_improved.md
     """
-    from autodoceval.cli import main
-
-    if improved is None:
-        original_path = Path(original)
-        dir_name = original_path.parent
-        filename = original_path.stem
-        ext = original_path.suffix
-        improved = dir_name / f"{filename}_improved{ext}"
+    from autodoceval.file_tools import improved_output_path
+    from autodoceval.pipeline import document_pipeline
 
-    sys.exit(main(["compare", str(original), str(improved)]))
+    improved = improved or improved_output_path(original)
+    if not os.path.exists(improved):
+        raise Exit(f"❌ Error: Missing improved document: {improved}")
+    pipeline = document_pipeline(original, improved=improved, session=shared_session())
+    pipeline.run("compare")
 
 
 @task
-def auto_improve(c, file="autodoceval/examples/example_doc.md", iterations=3, target=0.7):
+def auto_improve(c, file=DEFAULT_FILE, iterations=3, target=0.7):
     """All outputs will be saved in the same directory as the input file."""
     """Run auto-improvement loop.
 
@@ -79,13 +84,11 @@ def auto_improve(c, file="autodoceval/examples/example_doc.md", iterations=3, ta
         iterations: Maximum number of improvement iterations
         target: Target clarity score (0-1)
     """
-    from autodoceval.cli import main
+    from autodoceval.auto_improve import auto_improve_document
 
-    args = ["auto-improve", file]
-    args.extend(["--iterations", str(iterations)])
-    args.extend(["--target", str(target)])
-
-    sys.exit(main(args))
+    auto_improve_document(
+        file, max_iterations=int(iterations), target_score=float(target), session=shared_session()
+    )
 
 
 @task
@@ -187,9 +190,11 @@ def publish(c, test=True):
 
 
 @task(default=True)
-def all(c, file="autodoceval/examples/example_doc.md"):
-    """Run full evaluation and improvement cycle."""
+def all(c, file=DEFAULT_FILE):
+    """Run full evaluation, improvement and comparison cycle."""
+    from autodoceval.pipeline import document_pipeline
+
     print(f"🔄 Running full cycle for {file}")
-    grade(c, file=file)
-    improve(c, file=file)
+    # Grade once, improve with that feedback, then grade only the improved version
+    document_pipeline(file, session=shared_session()).run("compare")
     print("✅ Closed loop completed: see output in improved file")
@@ -0,0 +1,309 @@
+"""Unit tests for auto_improve module."""
+
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from autodoceval.auto_improve import (
+    auto_improve_document,
+    auto_improve_documents,
+    format_results_table,
+    generate_improved_path,
+    labelled_printer,
+)
+from autodoceval.budget import CHEAP_MODEL, Budget
+from autodoceval.deadline import Deadline, DeadlineExceededError
+
+
+@pytest.fixture
+def doc_path():
+    """Create a temporary document to improve."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "doc.md")
+        with open(path, "w") as f:
+            f.write("# Doc\n\nSome unclear documentation. " * 20)
+        yield path
+
+
+class TestGenerateImprovedPath:
+    def test_generate_improved_path_replaces_iteration(self):
+        """Test that existing iteration suffixes are replaced."""
+        # Act & Assert
+        assert generate_improved_path("/docs/doc_iter1.md", 2) == "/docs/doc_iter2.md"
+
+
+class TestAutoImproveDocument:
+    @mock.patch("autodoceval.auto_improve.improve_document")
+    @mock.patch("autodoceval.auto_improve.evaluate_document")
+    def test_returns_recorded_versions(
+        self, mock_evaluate_document, mock_improve_document, doc_path
+    ):
+        """Test that versions are returned without re-grading them for the summary."""
+        # Arrange
+        mock_evaluate_document.side_effect = [(0.4, "Unclear"), (0.5, "Better"), (0.8, "Good")]
+        mock_improve_document.return_value = "Improved"
+
+        # Act
+        with mock.patch("builtins.print"):
+            versions = auto_improve_document(doc_path, max_iterations=3, target_score=0.7)
+
+        # Assert
+        assert [score for _, score in versions] == [0.4, 0.5, 0.8]
+        assert versions[2][0] == generate_improved_path(doc_path, 2)
+        assert mock_evaluate_document.call_count == 3
+
+    @mock.patch("autodoceval.auto_improve.improve_document")
+    @mock.patch("autodoceval.auto_improve.evaluate_document")
+    def test_deadline_keeps_versions_graded_so_far(
+        self, mock_evaluate_document, mock_improve_document, doc_path
+    ):
+        """Test that a deadline passing mid-iteration keeps the graded versions."""
+        # Arrange
+        deadline = Deadline()
+        mock_evaluate_document.side_effect = [(0.4, "Unclear"), (0.6, "Better")]
+        mock_improve_document.side_effect = [
+            "Improved once",
+            DeadlineExceededError("Call did not finish"),
+        ]
+
+        # Act
+        with mock.patch("builtins.print") as mock_print:
+            versions = auto_improve_document(doc_path, max_iterations=3, deadline=deadline)
+
+        # Assert
+        assert [score for _, score in versions] == [0.4, 0.6]
+        mock_print.assert_any_call(
+            f"🏆 Best version so far: {generate_improved_path(doc_path, 1)} (60.0%)"
+        )
+
+    @mock.patch("autodoceval.auto_improve.improve_document")
+    @mock.patch("autodoceval.auto_improve.evaluate_document")
+    def test_expired_deadline_stops_before_next_iteration(
+        self, mock_evaluate_document, mock_improve_document, doc_path
+    ):
+        """Test that no iteration starts once the deadline has passed."""
+        # Arrange
+        deadline = Deadline()
+        mock_evaluate_document.return_value = (0.4, "Unclear")
+        mock_improve_document.side_effect = lambda *args, **kwargs: deadline.cancel() or "Better"
+
+        # Act
+        with mock.patch("builtins.print"):
+            versions = auto_improve_document(doc_path, max_iterations=3, deadline=deadline)
+
+        # Assert
+        assert len(versions) == 2
+        mock_improve_document.assert_called_once()
+
+    @mock.patch("autodoceval.auto_improve.improve_document")
+    @mock.patch("autodoceval.auto_improve.evaluate_document")
+    def test_store_keeps_iterations_out_of_docs_tree(
+        self, mock_evaluate_document, mock_improve_document, doc_path
+    ):
+        """Test that iterations go to the object store instead of _iterN files."""
+        # Arrange
+        from autodoceval.object_store import ObjectStore
+
+        store = ObjectStore(os.path.join(os.path.dirname(doc_path), ".store"))
+        mock_evaluate_document.side_effect = [(0.4, "Unclear"), (0.5, "Better"), (0.8, "Good")]
+        mock_improve_document.side_effect = ["Improved once", "Improved twice"]
+
+        # Act
+        with mock.patch("builtins.print"):
+            versions = auto_improve_document(doc_path, max_iterations=3, store=store)
+
+        # Assert
+        assert not os.path.exists(generate_improved_path(doc_path, 1))
+        manifest = store.runs()[0]
+        assert [version["score"] for version in manifest["versions"]] == [0.4, 0.5, 0.8]
+        assert store.materialize(manifest["run"], iteration=2) == [versions[2][0]]
+        with open(versions[2][0]) as f:
+            assert f.read() == "Improved twice"
+
+    @mock.patch("autodoceval.auto_improve.improve_document")
+    @mock.patch("autodoceval.auto_improve.evaluate_document")
+    def test_budget_switches_model_then_stops(
+        self, mock_evaluate_document, mock_improve_document, doc_path
+    ):
+        """Test that a tight budget first picks the cheaper model and then stops the loop."""
+        # Arrange
+        budget = Budget(max_cost=0.12)
+        mock_evaluate_document.return_value = (0.4, "Unclear")
+
+        def improve(doc, feedback, model, budget):
+            budget.record(1_000, 1_000, model, cost=0.05)
+            return "Improved"
+
+        mock_improve_document.side_effect = improve
+
+        # Act
+        with mock.patch("builtins.print"):
+            versions = auto_improve_document(doc_path, max_iterations=5, budget=budget)
+
+        # Assert
+        models = [call.kwargs["model"] for call in mock_improve_document.call_args_list]
+        assert models[0] == "gpt-4"
+        assert CHEAP_MODEL in models
+        assert len(models) < 5
+        assert len(versions) == len(models) + 1
+
+
+class TestPipelinedAutoImprove:
+    @mock.patch("autodoceval.auto_improve.improve_document")
+    @mock.patch("autodoceval.auto_improve.evaluate_document")
+    def test_pipelined_keeps_speculation_for_similar_feedback(
+        self, mock_evaluate_document, mock_improve_document, doc_path
+    ):
+        """Test that the speculative rewrite is used as is when feedback barely changes."""
+        # Arrange
+        mock_evaluate_document.side_effect = [
+            (0.4, "The usage section lacks examples."),
+            (0.5, "The usage section lacks examples."),
+            (0.8, "Clear."),
+        ]
+        mock_improve_document.side_effect = lambda doc, feedback, **kwargs: doc + " +"
+
+        # Act
+        with mock.patch("builtins.print"):
+            versions = auto_improve_document(doc_path, max_iterations=3, pipelined=True)
+
+        # Assert
+        assert [score for _, score in versions] == [0.4, 0.5, 0.8]
+        assert mock_evaluate_document.call_count == 3
+
+    @mock.patch("autodoceval.improver.setup_client")
+    @mock.patch("autodoceval.auto_improve.evaluate_document")
+    def test_pipelined_abandons_speculation_once_target_reached(
+        self, mock_evaluate_document, mock_setup_client, doc_path
+    ):
+        """Test that a speculative rewrite still running at the target is abandoned, not used."""
+        # Arrange
+        budget = Budget()
+        third_started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def create(model, messages, **kwargs):
+            calls.append(model)
+            if len(calls) == 3:
+                third_started.set()
+                release.wait(5)
+            usage = SimpleNamespace(prompt_tokens=100, completion_tokens=50)
+            message = SimpleNamespace(content=f"Rewrite {len(calls)}")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+        def evaluate(doc, **kwargs):
+            if doc == "Rewrite 2":
+                # Grade the second iteration only once the next speculation is in flight
+                third_started.wait(5)
+                return 0.8, "Clear."
+            return (0.5 if doc == "Rewrite 1" else 0.4), "The usage section lacks examples."
+
+        mock_setup_client.return_value.chat.completions.create.side_effect = create
+        mock_evaluate_document.side_effect = evaluate
+
+        # Act
+        threads_before = set(threading.enumerate())
+        try:
+            with mock.patch("builtins.print"):
+                versions = auto_improve_document(
+                    doc_path, max_iterations=3, pipelined=True, budget=budget
+                )
+            charged_at_target = budget.calls
+        finally:
+            release.set()
+        # Let the abandoned call return: the provider bills it, so it is charged then
+        for thread in set(threading.enumerate()) - threads_before:
+            thread.join(5)
+
+        # Assert
+        assert [score for _, score in versions] == [0.4, 0.5, 0.8]
+        assert len(calls) == 3
+        assert charged_at_target == 2
+        assert budget.calls == 3
+        assert budget.tokens == 450
+
+    @mock.patch("autodoceval.auto_improve.improve_document")
+    @mock.patch("autodoceval.auto_improve.evaluate_document")
+    def test_pipelined_refines_speculation_for_new_feedback(
+        self, mock_evaluate_document, mock_improve_document, doc_path
+    ):
+        """Test that the speculative rewrite is refined when the feedback changes."""
+        # Arrange
+        mock_evaluate_document.side_effect = [
+            (0.4, "The usage section lacks examples."),
+            (0.5, "Installation steps are missing entirely."),
+            (0.8, "Clear."),
+        ]
+        mock_improve_document.side_effect = lambda doc, feedback, **kwargs: doc + " +"
+
+        # Act
+        with mock.patch("builtins.print"):
+            auto_improve_document(doc_path, max_iterations=2, pipelined=True)
+
+        # Assert
+        feedbacks = [call.args[1] for call in mock_improve_document.call_args_list]
+        assert feedbacks == [
+            "The usage section lacks examples.",
+            "The usage section lacks examples.",
+            "Installation steps are missing entirely.",
+        ]
+
+
+class TestAutoImproveDocuments:
+    def test_improves_documents_and_keeps_going_after_errors(self, doc_path):
+        """Test that every document gets a result even when one of them fails."""
+        # Arrange
+        session = mock.Mock()
+        session.grade.return_value = (0.9, "Good")
+        missing = os.path.join(os.path.dirname(doc_path), "missing.md")
+
+        # Act
+        with mock.patch("builtins.print"):
+            results = auto_improve_documents([doc_path, missing], session=session, jobs=2)
+
+        # Assert
+        assert results[doc_path] == [(doc_path, 0.9)]
+        assert isinstance(results[missing], FileNotFoundError)
+
+    def test_document_budgets_nest_in_job_budget(self, doc_path):
+        """Test that each document gets its own budget inside the job budget."""
+        # Arrange
+        job_budget = Budget(max_cost=5.0)
+
+        # Act
+        with mock.patch("autodoceval.auto_improve.auto_improve_document") as mock_auto_improve:
+            mock_auto_improve.return_value = [(doc_path, 0.9)]
+            auto_improve_documents(
+                [doc_path], session=mock.Mock(), job_budget=job_budget, max_cost=1.0
+            )
+
+        # Assert
+        budget = mock_auto_improve.call_args.kwargs["budget"]
+        assert budget.max_cost == 1.0
+        assert budget.parent is job_budget
+
+    def test_labelled_printer_prefixes_every_line(self, capsys):
+        """Test that labelled output can be told apart when interleaved."""
+        # Act
+        labelled_printer("a.md")("\nFirst\nSecond")
+
+        # Assert
+        assert capsys.readouterr().out == "\n[a.md] First\n[a.md] Second\n"
+
+    def test_format_results_table(self):
+        """Test that the consolidated table shows score changes and errors."""
+        # Act
+        table = format_results_table(
+            {"a.md": [("a.md", 0.5), ("a_iter1.md", 0.75)], "b.md": ValueError("boom")}
+        )
+
+        # Assert
+        lines = table.splitlines()
+        assert lines[0].split() == ["Document", "Original", "Final", "Change", "Iterations"]
+        assert lines[2].split() == ["a.md", "50.0%", "75.0%", "25.0%", "1"]
+        assert "error: ValueError" in lines[3]
@@ -0,0 +1,153 @@
+"""Unit tests for batch module."""
+
+import os
+import tempfile
+from unittest import mock
+
+import pytest
+
+from autodoceval.batch import collect_documents, format_shared_report, grade_documents
+from autodoceval.deadline import Deadline
+from autodoceval.history import HistoryStore
+
+
+@pytest.fixture
+def docs_dir():
+    """Create a directory with two duplicate documents and one distinct document."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        content = "# Guide\n\nRun the grade command to evaluate the clarity of a document."
+        for name, text in [
+            ("a.md", content),
+            ("b.md", content),
+            ("c.md", "# Changelog\n\nFixed a crash in the parser and bumped dependencies."),
+            ("notes.txt", "Not markdown"),
+        ]:
+            with open(os.path.join(temp_dir, name), "w") as f:
+                f.write(text)
+        yield temp_dir
+
+
+class TestCollectDocuments:
+    def test_collect_documents_expands_directories(self, docs_dir):
+        """Test that directories are expanded to their markdown files."""
+        # Act
+        result = collect_documents([docs_dir])
+
+        # Assert
+        assert [os.path.basename(path) for path in result] == ["a.md", "b.md", "c.md"]
+
+    def test_collect_documents_skips_earlier_outputs(self, docs_dir):
+        """Test that improved documents from earlier runs are not collected as inputs."""
+        # Arrange
+        for name in ("a_iter1.md", "a_improved.md", "a_improved_section2.md"):
+            with open(os.path.join(docs_dir, name), "w") as f:
+                f.write("Improved")
+        explicit = os.path.join(docs_dir, "a_iter1.md")
+
+        # Act
+        from_directory = collect_documents([docs_dir])
+        from_glob = collect_documents([os.path.join(docs_dir, "a*.md")])
+        named = collect_documents([explicit])
+
+        # Assert
+        assert [os.path.basename(path) for path in from_directory] == ["a.md", "b.md", "c.md"]
+        assert [os.path.basename(path) for path in from_glob] == ["a.md"]
+        assert named == [explicit]
+
+    def test_collect_documents_missing_path(self):
+        """Test that collect_documents raises FileNotFoundError for unmatched paths."""
+        # Act & Assert
+        with pytest.raises(FileNotFoundError):
+            collect_documents(["/path/to/nonexistent/*.md"])
+
+
+class TestGradeDocuments:
+    @mock.patch("autodoceval.batch.evaluate_document")
+    def test_grade_documents_grades_one_per_cluster(self, mock_evaluate_document, docs_dir):
+        """Test that duplicates share the representative's result."""
+        # Arrange
+        mock_evaluate_document.return_value = (0.8, "Good document")
+        paths = collect_documents([docs_dir])
+
+        # Act
+        table, clusters = grade_documents(paths)
+
+        # Assert
+        assert mock_evaluate_document.call_count == 2
+        assert list(table) == [
+            (paths[0], 0.8, "Good document"),
+            (paths[1], 0.8, "Good document"),
+            (paths[2], 0.8, "Good document"),
+        ]
+        assert clusters[paths[0]] == [paths[0], paths[1]]
+
+    @mock.patch("autodoceval.batch.evaluate_document")
+    def test_grade_documents_without_dedupe(self, mock_evaluate_document, docs_dir):
+        """Test that every document is graded when dedupe is disabled."""
+        # Arrange
+        mock_evaluate_document.return_value = (0.8, "Good document")
+        paths = collect_documents([docs_dir])
+
+        # Act
+        grade_documents(paths, dedupe=False)
+
+        # Assert
+        assert mock_evaluate_document.call_count == 3
+
+    @mock.patch("autodoceval.batch.evaluate_document")
+    def test_grade_documents_verify_splits_divergent_cluster(
+        self, mock_evaluate_document, docs_dir
+    ):
+        """Test that verify grades members individually when scores drift."""
+        # Arrange
+        mock_evaluate_document.side_effect = [(0.8, "Good"), (0.3, "Poor"), (0.5, "Fair")]
+        paths = collect_documents([docs_dir])
+
+        # Act
+        table, clusters = grade_documents(paths, verify=True)
+
+        # Assert
+        assert dict(zip(table.paths, table.scores)) == {paths[0]: 0.8, paths[1]: 0.3, paths[2]: 0.5}
+        assert all(len(members) == 1 for members in clusters.values())
+
+    @mock.patch("autodoceval.batch.evaluate_document")
+    def test_grade_documents_keeps_results_graded_before_deadline(
+        self, mock_evaluate_document, docs_dir
+    ):
+        """Test that documents not graded before the deadline are left out, not failed."""
+        # Arrange
+        deadline = Deadline()
+        mock_evaluate_document.side_effect = lambda doc: deadline.cancel() or (0.8, "Good")
+        paths = collect_documents([docs_dir])
+
+        # Act
+        table, _ = grade_documents(paths, dedupe=False, deadline=deadline)
+
+        # Assert
+        assert table.paths == [paths[0]]
+        assert mock_evaluate_document.call_count == 1
+
+    @mock.patch("autodoceval.batch.evaluate_document")
+    def test_grade_documents_records_graded_documents(self, mock_evaluate_document, docs_dir):
+        """Test that only documents actually graded get a history event."""
+        # Arrange
+        mock_evaluate_document.return_value = (0.8, "Good")
+        history = HistoryStore(":memory:")
+
+        # Act
+        grade_documents(collect_documents([docs_dir]), history=history)
+
+        # Assert
+        assert history.timeline(os.path.join(docs_dir, "a.md"))[0]["score"] == 0.8
+        assert history.timeline(os.path.join(docs_dir, "b.md")) == []
+        assert history.timeline(os.path.join(docs_dir, "c.md"))[0]["kind"] == "grade"
+
+
+class TestFormatSharedReport:
+    def test_format_shared_report_lists_members(self):
+        """Test that the report lists representatives and the documents sharing their result."""
+        # Act
+        report = format_shared_report({"a.md": ["a.md", "b.md"], "c.md": ["c.md"]})
+
+        # Assert
+        assert report == "Documents sharing results:\n- a.md\n    b.md"
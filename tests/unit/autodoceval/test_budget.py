@@ -0,0 +1,102 @@
+"""Unit tests for budget module."""
+
+from unittest import mock
+
+import pytest
+
+from autodoceval.budget import (
+    CHEAP_MODEL,
+    DEFAULT_MODEL,
+    Budget,
+    BudgetExceededError,
+    choose_model,
+    estimate_cost,
+    estimate_tokens,
+)
+
+
+class TestEstimates:
+    def test_estimate_tokens_without_tiktoken(self):
+        """Test that estimate_tokens falls back to a character heuristic."""
+        # Act
+        with mock.patch.dict("sys.modules", {"tiktoken": None}):
+            result = estimate_tokens("a" * 400)
+
+        # Assert
+        assert result == 101
+
+    def test_estimate_cost_uses_model_prices(self):
+        """Test that estimate_cost prices prompt and completion tokens separately."""
+        # Act & Assert
+        assert estimate_cost(1000, 1000, "gpt-4") == pytest.approx(0.09)
+        assert estimate_cost(1000, 1000, "unknown-model") == pytest.approx(0.09)
+
+    def test_estimate_cost_discounts_cached_prompt_tokens(self):
+        """Test that cached prompt tokens are charged at half the prompt price."""
+        # Act & Assert
+        assert estimate_cost(1000, 0, "gpt-4", cached_tokens=1000) == pytest.approx(0.015)
+        assert estimate_cost(1000, 0, "gpt-4", cached_tokens=0) == pytest.approx(0.03)
+
+
+class TestBudget:
+    def test_record_propagates_to_parent(self):
+        """Test that usage recorded on a child budget counts against its parent."""
+        # Arrange
+        job = Budget(max_tokens=10_000)
+        doc = job.child(max_tokens=1_000)
+
+        # Act
+        doc.record(300, 200, cost=0.5)
+
+        # Assert
+        assert doc.tokens == job.tokens == 500
+        assert job.cost == 0.5
+        assert job.calls == 1
+
+    def test_record_response_reads_usage(self):
+        """Test that record_response reads token counts from an OpenAI response."""
+        # Arrange
+        budget = Budget()
+        response = mock.MagicMock()
+        response.usage.prompt_tokens = 100
+        response.usage.completion_tokens = 50
+
+        # Act
+        budget.record_response(response, "gpt-4")
+
+        # Assert
+        assert budget.tokens == 150
+        assert budget.cost == pytest.approx(0.006)
+
+    def test_can_afford_checks_parent(self):
+        """Test that a child budget can't spend beyond its parent's limit."""
+        # Arrange
+        job = Budget(max_tokens=1_000)
+        job.record(900, 0, cost=0.0)
+        doc = job.child(max_tokens=5_000)
+
+        # Act & Assert
+        assert doc.can_afford(100, 0.0)
+        assert not doc.can_afford(101, 0.0)
+
+    def test_check_raises_when_exceeded(self):
+        """Test that check raises BudgetExceededError for unaffordable calls."""
+        # Arrange
+        budget = Budget(max_cost=0.01)
+
+        # Act & Assert
+        with pytest.raises(BudgetExceededError):
+            budget.check(1_000, 1_000)
+
+
+class TestChooseModel:
+    def test_choose_model_falls_back_to_cheaper_model(self):
+        """Test that a cheaper model is picked when the default doesn't fit."""
+        # Arrange
+        budget = Budget(max_cost=0.05)
+
+        # Act & Assert
+        assert choose_model(None, 1_000, 1_000) == DEFAULT_MODEL
+        assert choose_model(budget, 100, 100) == DEFAULT_MODEL
+        assert choose_model(budget, 1_000, 1_000) == CHEAP_MODEL
+        assert choose_model(Budget(max_tokens=100), 1_000, 1_000) is None
@@ -0,0 +1,107 @@
+"""Unit tests for cassette module."""
+
+import os
+from unittest import mock
+
+import pytest
+
+from autodoceval.budget import Budget
+from autodoceval.cassette import Cassette, CassetteMissError, cassette_call
+from autodoceval.evaluator import evaluate_document
+from autodoceval.improver import improve_document
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    return str(tmp_path / "run.cassette")
+
+
+def make_evaluator(score, reason):
+    evaluator = mock.Mock(score=score, reason=reason, input_tokens=100, output_tokens=10)
+    evaluator.evaluation_cost = 0.01
+    return evaluator
+
+
+class TestCassette:
+    def test_cassette_call_without_cassette_calls_through(self):
+        """Test that calls are made directly when no cassette is active."""
+        # Act & Assert
+        assert cassette_call("judge", "doc", lambda: {"score": 1.0}) == {"score": 1.0}
+
+    def test_replays_recorded_calls_in_order(self, cassette_path):
+        """Test that identical requests replay in recorded order, repeating the last."""
+        # Arrange
+        with Cassette(cassette_path, mode="record"):
+            cassette_call("judge", "doc", lambda: {"score": 0.1})
+            cassette_call("judge", "doc", lambda: {"score": 0.2})
+
+        # Act
+        with Cassette(cassette_path) as cassette:
+            results = [cassette.call("judge", "doc", mock.Mock()) for _ in range(3)]
+
+        # Assert
+        assert [result["score"] for result in results] == [0.1, 0.2, 0.2]
+
+    def test_replay_raises_on_unknown_request(self, cassette_path):
+        """Test that replaying a call that was never recorded fails loudly."""
+        # Arrange
+        with Cassette(cassette_path, mode="record"):
+            cassette_call("judge", "doc", lambda: {"score": 0.1})
+
+        # Act & Assert
+        with Cassette(cassette_path) as cassette, pytest.raises(CassetteMissError):
+            cassette.call("judge", "other doc", mock.Mock())
+
+    def test_replay_can_reproduce_latency(self, cassette_path):
+        """Test that replay sleeps for the recorded latency when asked to."""
+        # Arrange
+        with Cassette(cassette_path, mode="record") as cassette:
+            cassette_call("judge", "doc", lambda: {"score": 0.1})
+        cassette.entries[0]["latency"] = 1.5
+        cassette.save()
+
+        # Act
+        with (
+            Cassette(cassette_path, latency_scale=1.0) as replay,
+            mock.patch("time.sleep") as mock_sleep,
+        ):
+            replay.call("judge", "doc", mock.Mock())
+
+        # Assert
+        mock_sleep.assert_called_once_with(1.5)
+
+
+class TestPipelineReplay:
+    @mock.patch("autodoceval.improver.setup_client")
+    @mock.patch("autodoceval.evaluator.setup_evaluator")
+    def test_judge_and_rewrite_replay_offline(
+        self, mock_setup_evaluator, mock_setup_client, cassette_path
+    ):
+        """Test that graded and improved documents replay without an evaluator or client."""
+        # Arrange
+        mock_setup_evaluator.return_value = make_evaluator(0.6, "Fine")
+        response = mock.Mock()
+        response.choices = [mock.Mock(message=mock.Mock(content="Better doc"))]
+        response.usage = mock.Mock(prompt_tokens=50, completion_tokens=20)
+        mock_setup_client.return_value.chat.completions.create.return_value = response
+
+        with Cassette(cassette_path, mode="record"):
+            evaluate_document("Doc")
+            improve_document("Doc", "Fine")
+        mock_setup_evaluator.reset_mock()
+        mock_setup_client.reset_mock()
+        budget = Budget()
+
+        # Act
+        with Cassette(cassette_path):
+            grade = evaluate_document("Doc", budget=budget)
+            improved = improve_document("Doc", "Fine", budget=budget)
+
+        # Assert
+        assert os.path.getsize(cassette_path) > 0
+        assert grade == (0.6, "Fine")
+        assert improved == "Better doc"
+        assert budget.prompt_tokens == 150
+        assert budget.completion_tokens == 30
+        mock_setup_evaluator.assert_not_called()
+        mock_setup_client.assert_not_called()
@@ -1,6 +1,7 @@
 """Unit tests for CLI module."""
 
 import argparse
+import json
 import os
 import tempfile
 from unittest import mock
@@ -8,6 +9,7 @@ from unittest import mock
 import pytest
 
 from autodoceval.cli import main, parse_args
+from autodoceval.results import ResultTable
 
 
 class TestParseArgs:
@@ -88,7 +90,7 @@ class TestParseArgs:
         
         # Assert
         assert parsed.command == "auto-improve"
-        assert parsed.file == "file.md"
+        assert parsed.files == ["file.md"]
         assert parsed.iterations == 3  # Default value
         assert parsed.target == 0.7  # Default value
     
@@ -102,7 +104,7 @@ class TestParseArgs:
         
         # Assert
         assert parsed.command == "auto-improve"
-        assert parsed.file == "file.md"
+        assert parsed.files == ["file.md"]
         assert parsed.iterations == 5
         assert parsed.target == 0.8
 
@@ -213,8 +215,9 @@ class TestMain:
         assert mock_read_file.call_count == 2
         mock_improve_document.assert_called_once_with("Document content", "Feedback content")
     
+    @mock.patch("autodoceval.cli.collect_documents", return_value=["file.md"])
     @mock.patch("autodoceval.cli.auto_improve_document")
-    def test_main_with_auto_improve_command(self, mock_auto_improve_document):
+    def test_main_with_auto_improve_command(self, mock_auto_improve_document, mock_collect_documents):
         """Test main with the auto-improve command."""
         # Arrange
         args = ["auto-improve", "file.md"]
@@ -225,10 +228,16 @@ class TestMain:
         
         # Assert
         assert result == 0
-        mock_auto_improve_document.assert_called_once_with("file.md", max_iterations=3, target_score=0.7)
+        mock_auto_improve_document.assert_called_once_with(
+            "file.md", max_iterations=3, target_score=0.7, budget=None, compact=False, pipelined=False,
+            history=None,
+        )
     
+    @mock.patch("autodoceval.cli.collect_documents", return_value=["file.md"])
     @mock.patch("autodoceval.cli.auto_improve_document")
-    def test_main_with_auto_improve_command_and_options(self, mock_auto_improve_document):
+    def test_main_with_auto_improve_command_and_options(
+        self, mock_auto_improve_document, mock_collect_documents
+    ):
         """Test main with the auto-improve command and options."""
         # Arrange
         args = ["auto-improve", "file.md", "--iterations", "5", "--target", "0.8"]
@@ -239,7 +248,10 @@ class TestMain:
         
         # Assert
         assert result == 0
-        mock_auto_improve_document.assert_called_once_with("file.md", max_iterations=5, target_score=0.8)
+        mock_auto_improve_document.assert_called_once_with(
+            "file.md", max_iterations=5, target_score=0.8, budget=None, compact=False, pipelined=False,
+            history=None,
+        )
     
     @mock.patch("autodoceval.cli.compare_documents")
     def test_main_with_compare_command(self, mock_compare_documents):
@@ -253,7 +265,7 @@ class TestMain:
         
         # Assert
         assert result == 0
-        mock_compare_documents.assert_called_once_with("original.md", "improved.md")
+        mock_compare_documents.assert_called_once_with("original.md", "improved.md", history=None)
     
     def test_main_with_no_command(self):
         """Test main with no command."""
@@ -267,4 +279,614 @@ class TestMain:
         
         # Assert
         assert result == 1
-        mock_print.assert_called_once_with("Please specify a command. Use --help for available commands.")
\ No newline at end of file
+        mock_print.assert_called_once_with("Please specify a command. Use --help for available commands.")
+
+class TestBatchGrade:
+    def test_parse_args_with_batch_grade_command(self):
+        """Test parse_args with the batch-grade command."""
+        # Act
+        parsed = parse_args(["batch-grade", "docs", "guide.md", "--verify"])
+
+        # Assert
+        assert parsed.command == "batch-grade"
+        assert parsed.paths == ["docs", "guide.md"]
+        assert parsed.no_dedupe is False
+        assert parsed.verify is True
+
+    @mock.patch("autodoceval.cli.collect_documents")
+    @mock.patch("autodoceval.cli.grade_documents")
+    def test_main_with_batch_grade_command(self, mock_grade_documents, mock_collect_documents):
+        """Test main with the batch-grade command."""
+        # Arrange
+        mock_collect_documents.return_value = ["a.md", "b.md"]
+        mock_grade_documents.return_value = (
+            ResultTable.from_results({"a.md": (0.8, "Good"), "b.md": (0.8, "Good")}),
+            {"a.md": ["a.md", "b.md"]},
+        )
+
+        # Act
+        with (
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}),
+            mock.patch("builtins.print"),
+        ):
+            result = main(["batch-grade", "docs"])
+
+        # Assert
+        assert result == 0
+        mock_grade_documents.assert_called_once_with(
+            ["a.md", "b.md"], dedupe=True, max_distance=3, verify=False, history=None
+        )
+
+
+class TestServerDelegation:
+    def test_parse_args_with_serve_command(self):
+        """Test parse_args with the serve command."""
+        # Act
+        parsed = parse_args(["serve", "--socket", "/tmp/autodoceval.sock", "--workers", "2"])
+
+        # Assert
+        assert parsed.command == "serve"
+        assert parsed.socket == "/tmp/autodoceval.sock"
+        assert parsed.workers == 2
+
+    @mock.patch("autodoceval.cli.read_file")
+    @mock.patch("autodoceval.cli.evaluate_document")
+    def test_main_delegates_grade_to_server(self, mock_evaluate_document, mock_read_file):
+        """Test that grade is sent to the server without requiring an API key."""
+        # Arrange
+        mock_read_file.return_value = "Document content"
+
+        # Act
+        with (
+            mock.patch.dict(os.environ, {}, clear=True),
+            mock.patch(
+                "autodoceval.server.ServerClient.grade", return_value=(0.8, "Good")
+            ) as mock_grade,
+            mock.patch("builtins.print"),
+        ):
+            result = main(["--server", "unix:/tmp/autodoceval.sock", "grade", "file.md"])
+
+        # Assert
+        assert result == 0
+        mock_grade.assert_called_once_with("Document content")
+        mock_evaluate_document.assert_not_called()
+
+    @mock.patch("autodoceval.server.ServerClient.grade")
+    def test_main_with_server_requires_file_to_grade(self, mock_grade, capsys):
+        """Test that grade without a file or --git-diff is refused before reaching the server."""
+        # Act
+        result = main(["--server", "unix:/tmp/autodoceval.sock", "grade"])
+
+        # Assert
+        assert result == 1
+        assert "specify a file or --git-diff" in capsys.readouterr().out
+        mock_grade.assert_not_called()
+
+    @mock.patch("autodoceval.server.ServerClient.auto_improve")
+    def test_main_rejects_local_only_options_with_server(self, mock_auto_improve, capsys):
+        """Test that auto-improve options the daemon cannot honour are refused, not dropped."""
+        # Act
+        result = main(
+            [
+                "--server",
+                "unix:/tmp/autodoceval.sock",
+                "auto-improve",
+                "file.md",
+                "--compact",
+                "--max-tokens",
+                "1000",
+                "--shard",
+                "1/2",
+            ]
+        )
+
+        # Assert
+        assert result == 1
+        assert "--compact, --max-tokens, --shard cannot be used with --server" in (
+            capsys.readouterr().out
+        )
+        mock_auto_improve.assert_not_called()
+
+    @mock.patch("autodoceval.server.ServerClient.improve")
+    def test_main_rejects_local_only_improve_options_with_server(
+        self, mock_improve, tmp_path, capsys
+    ):
+        """Test that global and improve options the daemon cannot honour are refused."""
+        # Act
+        result = main(
+            [
+                "--server",
+                "unix:/tmp/autodoceval.sock",
+                "--history",
+                "history.db",
+                "--call-timeout",
+                "30",
+                "--record",
+                str(tmp_path / "calls.jsonl"),
+                "improve",
+                "file.md",
+                "--compact",
+            ]
+        )
+
+        # Assert
+        assert result == 1
+        assert "--history, --call-timeout, --record, --compact cannot be used with --server" in (
+            capsys.readouterr().out
+        )
+        mock_improve.assert_not_called()
+
+
+class TestBudgetOptions:
+    @mock.patch("autodoceval.cli.collect_documents", return_value=["file.md"])
+    @mock.patch("autodoceval.cli.auto_improve_document")
+    def test_main_with_auto_improve_budgets(
+        self, mock_auto_improve_document, mock_collect_documents
+    ):
+        """Test that document budgets are nested inside the job budget."""
+        # Arrange
+        args = ["auto-improve", "file.md", "--max-tokens", "1000", "--job-max-cost", "2.5"]
+
+        # Act
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            result = main(args)
+
+        # Assert
+        assert result == 0
+        budget = mock_auto_improve_document.call_args.kwargs["budget"]
+        assert budget.max_tokens == 1000
+        assert budget.parent.max_cost == 2.5
+
+    def test_main_reports_budget_too_small_for_first_grade(self, tmp_path, capsys):
+        """Test that a budget that cannot pay for the first grade fails without a traceback."""
+        # Arrange
+        doc = tmp_path / "doc.md"
+        doc.write_text("# Guide\n\nSome documentation to grade.\n")
+
+        # Act
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            result = main(["auto-improve", str(doc), "--max-tokens", "10"])
+
+        # Assert
+        assert result == 1
+        assert "💰 Budget exhausted before the original document was graded" in (
+            capsys.readouterr().out
+        )
+
+
+class TestHistoryOptions:
+    def test_parse_args_with_history_command(self):
+        """Test parsing arguments with the history command."""
+        # Act
+        parsed = parse_args(["--history", "runs.db", "history", "--top-regressed", "--limit", "5"])
+
+        # Assert
+        assert parsed.history == "runs.db"
+        assert parsed.command == "history"
+        assert parsed.top_regressed is True
+        assert parsed.limit == 5
+
+    @mock.patch("autodoceval.cli.read_file")
+    @mock.patch("autodoceval.cli.evaluate_document")
+    def test_main_records_grade_and_queries_history(
+        self, mock_evaluate_document, mock_read_file, capsys
+    ):
+        """Test that grade events are recorded and the history command needs no API key."""
+        # Arrange
+        mock_read_file.return_value = "Document content"
+        mock_evaluate_document.return_value = (0.8, "Good document")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            database = os.path.join(temp_dir, "history.db")
+
+            # Act
+            with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+                main(["--history", database, "grade", "file.md"])
+            with mock.patch.dict(os.environ, {}, clear=True):
+                result = main(["--history", database, "history", "file.md"])
+
+        # Assert
+        assert result == 0
+        last_line = capsys.readouterr().out.splitlines()[-1]
+        assert "grade" in last_line
+        assert "80.0%" in last_line
+
+    @mock.patch("autodoceval.cli.HistoryStore")
+    @mock.patch("autodoceval.cli.read_file", return_value="Document content")
+    @mock.patch("autodoceval.cli.evaluate_document", side_effect=RuntimeError("boom"))
+    def test_main_closes_history_when_command_fails(
+        self, mock_evaluate_document, mock_read_file, mock_history_store
+    ):
+        """Test that the history store is closed even when the command raises."""
+        # Act
+        with (
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}),
+            pytest.raises(RuntimeError),
+        ):
+            main(["--history", "history.db", "grade", "file.md"])
+
+        # Assert
+        mock_history_store.return_value.close.assert_called_once()
+
+
+class TestMultiDocumentAutoImprove:
+    def test_parse_args_with_many_files(self):
+        """Test that auto-improve accepts several files and a job count."""
+        # Act
+        parsed = parse_args(["auto-improve", "a.md", "docs/", "--jobs", "8"])
+
+        # Assert
+        assert parsed.files == ["a.md", "docs/"]
+        assert parsed.jobs == 8
+
+    @mock.patch("autodoceval.cli.collect_documents", return_value=["a.md", "b.md"])
+    @mock.patch("autodoceval.cli.auto_improve_documents")
+    def test_main_runs_documents_concurrently(
+        self, mock_auto_improve_documents, mock_collect_documents, capsys
+    ):
+        """Test that many documents are improved together and summarised in one table."""
+        # Arrange
+        mock_auto_improve_documents.return_value = {
+            "a.md": [("a.md", 0.5), ("a_iter1.md", 0.8)],
+            "b.md": FileNotFoundError("b.md"),
+        }
+
+        # Act
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            result = main(["auto-improve", "a.md", "b.md", "--jobs", "2", "--max-cost", "1"])
+
+        # Assert
+        assert result == 1
+        kwargs = mock_auto_improve_documents.call_args.kwargs
+        assert kwargs["jobs"] == 2
+        assert kwargs["max_cost"] == 1.0
+        output = capsys.readouterr().out
+        assert "30.0%" in output
+        assert "error: FileNotFoundError" in output
+
+
+class TestProfileOption:
+    def test_every_command_accepts_profile(self):
+        """Test that --profile is available on each subcommand."""
+        # Act
+        parsed = parse_args(["compare", "a.md", "b.md", "--profile", "trace.json", "--profile-cpu"])
+
+        # Assert
+        assert parsed.profile == "trace.json"
+        assert parsed.profile_cpu is True
+        assert parsed.profile_memory is False
+
+    @mock.patch("autodoceval.cli.read_file")
+    @mock.patch("autodoceval.cli.evaluate_document")
+    def test_main_writes_profile(self, mock_evaluate_document, mock_read_file):
+        """Test that a profiled command writes a trace with a span for the command."""
+        # Arrange
+        mock_read_file.return_value = "Document content"
+        mock_evaluate_document.return_value = (0.8, "Good document")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            trace_path = os.path.join(temp_dir, "trace.json")
+
+            # Act
+            with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+                result = main(["grade", "file.md", "--profile", trace_path])
+
+            # Assert
+            assert result == 0
+            with open(trace_path) as f:
+                names = [event["name"] for event in json.load(f)["traceEvents"]]
+            assert "grade" in names
+            assert os.path.exists(os.path.join(temp_dir, "trace.txt"))
+
+
+class TestCassetteOptions:
+    @mock.patch("autodoceval.cli.read_file")
+    @mock.patch("autodoceval.evaluator.setup_evaluator")
+    def test_main_records_then_replays_grade(self, mock_setup_evaluator, mock_read_file, capsys):
+        """Test that a recorded grade replays offline without an API key."""
+        # Arrange
+        mock_read_file.return_value = "Document content"
+        mock_setup_evaluator.return_value = mock.Mock(
+            score=0.8, reason="Good document", input_tokens=0, output_tokens=0, evaluation_cost=0
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cassette = os.path.join(temp_dir, "grade.cassette")
+            with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+                main(["--record", cassette, "grade", "file.md"])
+            mock_setup_evaluator.reset_mock()
+            capsys.readouterr()
+
+            # Act
+            with mock.patch.dict(os.environ, {}, clear=True):
+                result = main(["--replay", cassette, "grade", "file.md"])
+
+        # Assert
+        assert result == 0
+        assert "Score: 80.0%" in capsys.readouterr().out
+        mock_setup_evaluator.assert_not_called()
+
+
+class TestPrioritizeCommand:
+    def test_parse_args_with_prioritize_command(self):
+        """Test parsing arguments with the prioritize command."""
+        # Act
+        parsed = parse_args(
+            [
+                "prioritize",
+                "docs/",
+                "--traffic",
+                "views.csv",
+                "--deadline",
+                "600",
+                "--max-cost",
+                "5",
+            ]
+        )
+
+        # Assert
+        assert parsed.paths == ["docs/"]
+        assert parsed.traffic == "views.csv"
+        assert parsed.deadline == 600
+        assert parsed.max_cost == 5.0
+        assert parsed.max_attempts == 3
+
+
+class TestGitDiffOption:
+    def test_parse_args_with_git_diff(self):
+        """Test that grade accepts a commit range instead of a file."""
+        # Act
+        parsed = parse_args(["grade", "--git-diff", "main..HEAD"])
+
+        # Assert
+        assert parsed.file is None
+        assert parsed.git_diff == "main..HEAD"
+
+    def test_main_requires_file_or_git_diff(self):
+        """Test that grade without a file or range is rejected."""
+        # Act
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            result = main(["grade"])
+
+        # Assert
+        assert result == 1
+
+
+class TestStepsCommand:
+    def test_main_shows_and_discards_steps(self, capsys):
+        """Test that the steps command needs no API key and can discard steps."""
+        # Arrange
+        from autodoceval.evaluation_steps import StepsStore
+        from autodoceval.evaluator import clarity_fingerprint, use_evaluation_steps
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "steps.json")
+            StepsStore(path).save(
+                clarity_fingerprint(), ["Check headings"], "Clarity", "clarity", []
+            )
+
+            # Act
+            with mock.patch.dict(os.environ, {}, clear=True):
+                shown = main(["--steps", path, "steps"])
+                output = capsys.readouterr().out
+                discarded = main(["--steps", path, "steps", "--discard"])
+
+            # Assert
+            assert shown == discarded == 0
+            assert "1. Check headings" in output
+            assert StepsStore(path).load(clarity_fingerprint()) is None
+        use_evaluation_steps(None)
+
+
+class TestShardOption:
+    def test_parse_args_with_shard_and_merge(self):
+        """Test that batch-grade and auto-improve accept --shard and merge takes shard files."""
+        # Act
+        batch = parse_args(["batch-grade", "docs", "--shard", "2/4"])
+        auto = parse_args(["auto-improve", "docs", "--shard", "1/4", "--shard-output", "s.json"])
+        merge = parse_args(["merge", "s1.json", "s2.json", "--cache", "cache.json"])
+
+        # Assert
+        assert batch.shard == "2/4"
+        assert auto.shard_output == "s.json"
+        assert merge.shards == ["s1.json", "s2.json"]
+
+    @mock.patch("autodoceval.cli.grade_documents")
+    def test_main_grades_shards_and_merges_them(self, mock_grade_documents, capsys):
+        """Test that each shard grades its own documents and merge combines them."""
+        # Arrange
+        mock_grade_documents.side_effect = lambda paths, **kwargs: (
+            ResultTable.from_results(dict.fromkeys(paths, (0.6, "Fair"))),
+            {path: [path] for path in paths},
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for number in range(6):
+                with open(os.path.join(temp_dir, f"doc{number}.md"), "w") as f:
+                    f.write(f"# Doc {number}\n")
+            shard_files = [os.path.join(temp_dir, f"shard{i}.json") for i in (1, 2)]
+            report_path = os.path.join(temp_dir, "report.json")
+
+            # Act
+            with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+                graded = [
+                    main(["batch-grade", temp_dir, "--shard", f"{i}/2", "--shard-output", path])
+                    for i, path in zip((1, 2), shard_files)
+                ]
+            with mock.patch.dict(os.environ, {}, clear=True):
+                merged = main(["merge", *shard_files, "--output", report_path])
+            with open(report_path) as f:
+                report = json.load(f)
+
+        # Assert
+        assert graded == [0, 0] and merged == 0
+        graded_paths = [call.args[0] for call in mock_grade_documents.call_args_list]
+        assert sorted(graded_paths[0] + graded_paths[1]) == sorted(report["results"])
+        assert len(report["results"]) == 6
+        assert "Merged 2 batch-grade shard(s): 6 documents" in capsys.readouterr().out
+
+    def test_main_rejects_invalid_shard(self):
+        """Test that a shard outside 1..N is rejected."""
+        # Act
+        with (
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}),
+            mock.patch("builtins.print"),
+        ):
+            result = main(["batch-grade", "docs", "--shard", "3/2"])
+
+        # Assert
+        assert result == 1
+
+
+class TestAdaptiveOption:
+    def test_parse_args_with_adaptive(self):
+        """Test that commands running LLM calls in parallel accept --adaptive."""
+        # Act
+        auto = parse_args(["auto-improve", "a.md", "b.md", "--adaptive", "--jobs", "16"])
+        serve = parse_args(["serve", "--adaptive"])
+        prioritize = parse_args(["prioritize", "docs"])
+
+        # Assert
+        assert auto.adaptive is True and auto.jobs == 16
+        assert serve.adaptive is True
+        assert prioritize.adaptive is False
+
+
+class TestMaterializeCommand:
+    def test_main_lists_and_materializes_runs(self, capsys):
+        """Test that materialize needs no API key and writes stored iterations."""
+        # Arrange
+        from autodoceval.object_store import ObjectStore
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store_path = os.path.join(temp_dir, "store")
+            doc_path = os.path.join(temp_dir, "doc.md")
+            run = ObjectStore(store_path).start_run(doc_path)
+            run.add(0, doc_path, "Original")
+            run.add(1, os.path.join(temp_dir, "doc_iter1.md"), "Improved")
+            output_path = os.path.join(temp_dir, "best.md")
+
+            # Act
+            with mock.patch.dict(os.environ, {}, clear=True):
+                listed = main(["--store", store_path, "materialize"])
+                written = main(
+                    [
+                        "--store",
+                        store_path,
+                        "materialize",
+                        run.id,
+                        "--iteration",
+                        "1",
+                        "-o",
+                        output_path,
+                    ]
+                )
+
+            # Assert
+            assert listed == written == 0
+            assert run.id in capsys.readouterr().out
+            with open(output_path) as f:
+                assert f.read() == "Improved"
+
+
+class TestGradeDocstringsCommand:
+    @mock.patch("autodoceval.docstrings.grade_docstrings")
+    @mock.patch("autodoceval.docstrings.collect_docstrings")
+    def test_main_with_grade_docstrings_command(self, mock_collect, mock_grade):
+        """Test that grade-docstrings grades collected docstrings with the default cache."""
+        # Arrange
+        mock_collect.return_value = ([], {"bad.py": "SyntaxError: invalid syntax"})
+        mock_grade.return_value = ([], {})
+
+        # Act
+        with (
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}),
+            mock.patch("builtins.print") as mock_print,
+        ):
+            result = main(["grade-docstrings", "pkg", "--jobs", "8"])
+
+        # Assert
+        assert result == 0
+        mock_collect.assert_called_once_with(["pkg"], workers=None)
+        mock_grade.assert_called_once_with(
+            [], cache_path=os.path.join(".autodoceval", "docstring-scores.json"), jobs=8
+        )
+        mock_print.assert_any_call("⚠️ Skipped bad.py: SyntaxError: invalid syntax")
+
+
+class TestStreamCommand:
+    @mock.patch("autodoceval.streaming.corpus_pipeline")
+    def test_main_with_stream_command(self, mock_corpus_pipeline):
+        """Test that stream builds the corpus pipeline from its stage options."""
+        # Arrange
+        mock_corpus_pipeline.return_value.run.return_value = iter([])
+        mock_corpus_pipeline.return_value.stats.return_value = {}
+        mock_corpus_pipeline.return_value.errors = []
+
+        # Act
+        with (
+            mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}),
+            mock.patch("builtins.print"),
+        ):
+            result = main(["stream", "docs", "--improve", "--grade-workers", "8"])
+
+        # Assert
+        assert result == 0
+        mock_corpus_pipeline.assert_called_once_with(
+            ["docs"],
+            pattern="*.md",
+            sections=False,
+            improve=True,
+            target_score=0.7,
+            read_workers=2,
+            grade_workers=8,
+            improve_workers=2,
+            queue_size=16,
+            history=None,
+        )
+
+
+class TestDeadlineOptions:
+    def test_parse_args_with_deadlines(self):
+        """Test that auto-improve takes a job deadline, a document deadline and a call timeout."""
+        # Act
+        parsed = parse_args(
+            [
+                "--call-timeout",
+                "60",
+                "auto-improve",
+                "a.md",
+                "--deadline",
+                "600",
+                "--doc-deadline",
+                "120",
+            ]
+        )
+
+        # Assert
+        assert parsed.call_timeout == 60.0
+        assert parsed.deadline == 600.0
+        assert parsed.doc_deadline == 120.0
+
+    @mock.patch("autodoceval.cli.collect_documents", return_value=["a.md", "b.md"])
+    @mock.patch("autodoceval.cli.grade_documents")
+    def test_batch_grade_reports_documents_past_deadline(
+        self, mock_grade_documents, mock_collect_documents, capsys
+    ):
+        """Test that batch-grade keeps partial results and reports what was not graded."""
+        # Arrange
+        mock_grade_documents.return_value = (
+            ResultTable.from_results({"a.md": (0.8, "Good")}),
+            {"a.md": ["a.md"]},
+        )
+
+        # Act
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            result = main(["batch-grade", "docs", "--deadline", "30"])
+
+        # Assert
+        assert result == 0
+        assert mock_grade_documents.call_args.kwargs["deadline"].remaining() <= 30
+        output = capsys.readouterr().out
+        assert "a.md: 80.0%" in output
+        assert "b.md: ⏰ not graded before the deadline" in output
@@ -0,0 +1,120 @@
+"""Unit tests for compact module."""
+
+from autodoceval.compact import (
+    compact_feedback,
+    compact_request,
+    feedback_points,
+    is_mentioned,
+    section_title,
+    splice_sections,
+)
+
+DOC = """# Guide
+
+Intro text.
+
+## Installation
+
+Run pip install. Make sure your Python version is 3.9 or newer, create a virtual
+environment first, activate it, install the package with its development extras,
+and export your OpenAI API key so the evaluator and the improver can reach the API.
+
+## Usage
+
+Call the tool.
+"""
+
+
+class TestCompactFeedback:
+    def test_feedback_points_splits_sentences_and_bullets(self):
+        """Test that feedback is split into sentences and bullet points."""
+        # Act
+        points = feedback_points("First point. Second point!\n- Third point\n2. Fourth")
+
+        # Assert
+        assert points == ["First point.", "Second point!", "Third point", "Fourth"]
+
+    def test_compact_feedback_removes_repeated_points(self):
+        """Test that near-identical points are kept once."""
+        # Arrange
+        feedback = (
+            "The usage section lacks examples. The installation steps are clear. "
+            "Overall the usage section lacks examples."
+        )
+
+        # Act
+        result = compact_feedback(feedback)
+
+        # Assert
+        assert result == "The usage section lacks examples. The installation steps are clear."
+
+
+class TestSectionSelection:
+    def test_section_title_strips_numbering(self):
+        """Test that section titles drop heading markers and numbering."""
+        # Act & Assert
+        assert section_title("## 2. Core Components\ntext") == "Core Components"
+        assert section_title("Preamble text") == ""
+
+    def test_is_mentioned_matches_title_words(self):
+        """Test that a section is mentioned by title or by all significant title words."""
+        # Act & Assert
+        assert is_mentioned("Usage", "The usage section is vague.")
+        assert is_mentioned("Core Components", "components of the core are unclear")
+        assert not is_mentioned("Core Components", "the core idea is unclear")
+
+    def test_compact_request_sends_only_mentioned_sections(self):
+        """Test that unmentioned sections are left out of the prompt."""
+        # Act
+        request = compact_request(DOC, "The Usage section needs an example.")
+
+        # Assert
+        assert request.selected == [2]
+        assert "Call the tool." in request.doc
+        assert "Run pip install." not in request.doc
+        assert request.compact_tokens < request.full_tokens
+        assert "sections sent" in request.report()
+
+    def test_compact_request_without_section_mentions_keeps_document(self):
+        """Test that general feedback applies to the whole document."""
+        # Act
+        request = compact_request(DOC, "Be more concise.")
+
+        # Assert
+        assert request.doc == DOC
+        assert splice_sections(request, "Rewritten") == "Rewritten"
+
+
+class TestSpliceSections:
+    def test_splice_sections_restores_unchanged_sections(self):
+        """Test that rewritten sections are spliced back between the untouched ones."""
+        # Arrange
+        request = compact_request(
+            DOC + "\n## Support\n\n" + "Open an issue. " * 40, "Improve Installation and Usage."
+        )
+        rewritten = (
+            "<!-- section 1 -->\n## Installation\n\nRun `pip install autodoceval`.\n\n"
+            "<!-- section 2 -->\n## Usage\n\nRun `autodoceval grade doc.md`."
+        )
+
+        # Act
+        result = splice_sections(request, rewritten)
+
+        # Assert
+        assert result.startswith(
+            "# Guide\n\nIntro text.\n\n## Installation\n\nRun `pip install autodoceval`."
+        )
+        assert "## Usage\n\nRun `autodoceval grade doc.md`.\n## Support" in result
+
+    def test_splice_sections_keeps_sections_without_markers(self):
+        """Test that sections the model dropped keep their original text."""
+        # Arrange
+        request = compact_request(DOC, "Improve Installation and Usage.")
+        request = request._replace(selected=[1, 2])
+
+        # Act
+        result = splice_sections(request, "<!-- section 2 -->\n## Usage\n\nNew usage.\n")
+
+        # Assert
+        assert "Run pip install." in result
+        assert result.endswith("## Usage\n\nNew usage.\n")
@@ -0,0 +1,131 @@
+"""Unit tests for deadline module."""
+
+import threading
+import time
+
+import pytest
+
+from autodoceval.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    call_timeout,
+    call_with_timeout,
+    current_deadline,
+    set_call_timeout,
+)
+
+
+@pytest.fixture
+def call_timeout_of(request):
+    """Sets a process-wide call timeout for one test."""
+    set_call_timeout(request.param)
+    yield request.param
+    set_call_timeout(None)
+
+
+class TestDeadline:
+    def test_child_expires_with_its_parent(self):
+        """Test that a per-document deadline also ends when the job deadline does."""
+        # Arrange
+        job = Deadline(0.0)
+
+        # Act
+        document = job.child(60.0)
+
+        # Assert
+        assert document.expired
+        with pytest.raises(DeadlineExceededError):
+            document.check()
+
+    def test_cancel_expires_children(self):
+        """Test that cancelling a deadline expires every deadline nested in it."""
+        # Arrange
+        job = Deadline()
+        document = job.child()
+        assert document.remaining() is None
+
+        # Act
+        job.cancel()
+
+        # Assert
+        assert document.expired
+
+    def test_active_deadline_is_per_thread_context(self):
+        """Test that activating a deadline sets it only for the duration of the block."""
+        # Arrange
+        deadline = Deadline(10.0)
+
+        # Act
+        with deadline.active():
+            inside = current_deadline()
+
+        # Assert
+        assert inside is deadline
+        assert current_deadline() is None
+
+
+class TestCallTimeout:
+    @pytest.mark.parametrize("call_timeout_of", [30.0], indirect=True)
+    def test_call_timeout_is_capped_by_active_deadline(self, call_timeout_of):
+        """Test that a call gets the lesser of the call timeout and the time remaining."""
+        # Act
+        unlimited = call_timeout()
+        with Deadline(5.0).active():
+            capped = call_timeout()
+
+        # Assert
+        assert unlimited == 30.0
+        assert 0 < capped <= 5.0
+
+    def test_call_timeout_raises_once_deadline_passed(self):
+        """Test that no call starts after the active deadline."""
+        # Act / Assert
+        with Deadline(0.0).active(), pytest.raises(DeadlineExceededError):
+            call_timeout()
+
+    def test_call_with_timeout_abandons_slow_call(self):
+        """Test that a hung call is given up on once its timeout passes."""
+        # Arrange
+        start = time.monotonic()
+
+        # Act / Assert
+        with pytest.raises(DeadlineExceededError):
+            call_with_timeout(lambda: time.sleep(2), timeout=0.05)
+        assert time.monotonic() - start < 1
+
+    def test_call_with_timeout_returns_result_and_reraises_errors(self):
+        """Test that a call finishing in time behaves like a direct call."""
+        # Act / Assert
+        assert call_with_timeout(lambda: 42, timeout=5.0) == 42
+        with pytest.raises(ValueError):
+            call_with_timeout(lambda: int("x"), timeout=5.0)
+
+    def test_abandoned_call_is_handed_over_when_it_finishes(self):
+        """Test that a call given up on still reports its result, e.g. to charge its usage."""
+        # Arrange
+        release = threading.Event()
+        handed_over = threading.Event()
+        late = []
+
+        def finish(result):
+            late.append(result)
+            handed_over.set()
+
+        # Act
+        with pytest.raises(DeadlineExceededError):
+            call_with_timeout(lambda: release.wait() and 42, timeout=0.05, on_abandoned=finish)
+        release.set()
+
+        # Assert
+        assert handed_over.wait(timeout=5)
+        assert late == [42]
+
+    def test_cancelled_deadline_abandons_call_without_timeout(self):
+        """Test that cancelling the active deadline gives up on a call with no time limit."""
+        # Arrange
+        deadline = Deadline()
+        threading.Timer(0.05, deadline.cancel).start()
+
+        # Act / Assert
+        with deadline.active(), pytest.raises(DeadlineExceededError):
+            call_with_timeout(lambda: time.sleep(2), timeout=None)
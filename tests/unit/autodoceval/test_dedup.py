@@ -0,0 +1,92 @@
+"""Unit tests for dedup module."""
+
+import pytest
+
+from autodoceval.dedup import (
+    SimHashIndex,
+    cluster_documents,
+    hamming_distance,
+    shingles,
+    simhash,
+)
+
+BASE_DOC = """# Installation Guide
+
+Install the package with pip and set the OPENAI_API_KEY environment variable
+before running any command. The grade command evaluates a document for clarity,
+the improve command rewrites it based on feedback, and the compare command
+reports the difference between two versions of the same document. Use the
+auto-improve command to run the whole loop until the target score is reached.
+"""
+
+
+class TestShingles:
+    def test_shingles_builds_word_ngrams(self):
+        """Test that shingles returns lowercase word n-grams."""
+        # Act
+        result = shingles("One two Three four", size=2)
+
+        # Assert
+        assert result == {"one two", "two three", "three four"}
+
+    def test_shingles_with_short_text(self):
+        """Test that shingles returns the whole text when shorter than the shingle size."""
+        # Act & Assert
+        assert shingles("just two", size=5) == {"just two"}
+        assert shingles("", size=5) == set()
+
+
+class TestSimHash:
+    def test_simhash_is_deterministic(self):
+        """Test that simhash returns the same fingerprint for the same text."""
+        # Act & Assert
+        assert simhash(BASE_DOC) == simhash(BASE_DOC)
+
+    def test_simhash_near_duplicates_are_close(self):
+        """Test that a small edit keeps fingerprints closer than unrelated documents."""
+        # Arrange
+        edited = BASE_DOC.replace("target score", "target clarity score")
+        unrelated = "Release notes: fixed a crash in the parser and bumped dependencies."
+
+        # Act
+        near = hamming_distance(simhash(BASE_DOC), simhash(edited))
+        far = hamming_distance(simhash(BASE_DOC), simhash(unrelated))
+
+        # Assert
+        assert near < far
+
+
+class TestSimHashIndex:
+    @pytest.mark.parametrize("max_distance", [0, 3, 7])
+    def test_query_finds_fingerprints_within_distance(self, max_distance):
+        """Test that query returns fingerprints within max_distance bits."""
+        # Arrange
+        index = SimHashIndex(max_distance)
+        fingerprint = 0x0123456789ABCDEF
+        index.add("doc", fingerprint)
+        flipped = fingerprint ^ ((1 << max_distance) - 1)
+        too_far = fingerprint ^ ((1 << (max_distance + 1)) - 1)
+
+        # Act & Assert
+        assert index.query(flipped) == ["doc"]
+        assert index.query(too_far) == []
+
+
+class TestClusterDocuments:
+    def test_cluster_documents_groups_near_duplicates(self):
+        """Test that near-duplicates share a cluster with the first document as representative."""
+        # Arrange
+        docs = {
+            "v1/install.md": BASE_DOC,
+            "v2/install.md": BASE_DOC + "\n",
+            "changelog.md": "Release notes: fixed a crash in the parser and bumped dependencies.",
+        }
+
+        # Act
+        clusters = cluster_documents(docs)
+
+        # Assert
+        assert clusters == {
+            "v1/install.md": ["v1/install.md", "v2/install.md"],
+            "changelog.md": ["changelog.md"],
+        }
@@ -0,0 +1,167 @@
+"""Unit tests for docstrings module."""
+
+from unittest import mock
+
+from autodoceval.docstrings import (
+    Docstring,
+    collect_docstrings,
+    extract_docstrings,
+    format_docstring_report,
+    grade_docstrings,
+    module_name,
+)
+from autodoceval.git_diff import BlobScoreCache
+
+SOURCE = '''"""Module docs."""
+
+
+class Widget:
+    """Widget docs."""
+
+    def spin(self):
+        """Spin docs."""
+
+    def _private(self):
+        pass
+
+
+async def fetch():
+    """Fetch docs."""
+'''
+
+
+def make_package(tmp_path):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text('"""Package docs."""\n')
+    (package / "widgets.py").write_text(SOURCE)
+    return package
+
+
+class TestExtraction:
+    def test_module_name_includes_package_root(self, tmp_path):
+        """Test that modules under a package directory get dotted names."""
+        # Arrange
+        package = make_package(tmp_path)
+
+        # Act / Assert
+        assert module_name(str(package / "widgets.py")) == "pkg.widgets"
+        assert module_name(str(package / "__init__.py")) == "pkg"
+
+    def test_glob_roots_name_modules_by_package(self, tmp_path, monkeypatch):
+        """Test that symbols found through a glob are named by their package, not the glob."""
+        # Arrange
+        make_package(tmp_path)
+        (tmp_path / "pkg" / "widgets_improved.py").write_text('"""Improved widgets."""\n')
+        monkeypatch.chdir(tmp_path)
+
+        # Act
+        docstrings, _ = collect_docstrings(["**/*.py"], workers=1)
+
+        # Assert
+        modules = {d.qualname for d in docstrings if d.kind == "module"}
+        assert modules == {"pkg", "pkg.widgets", "pkg.widgets_improved"}
+        assert "pkg.widgets.Widget.spin" in {d.qualname for d in docstrings}
+
+    def test_extract_docstrings_names_nested_symbols(self, tmp_path):
+        """Test that module, class, method and async function docstrings are extracted."""
+        # Arrange
+        path = tmp_path / "widgets.py"
+        path.write_text(SOURCE)
+
+        # Act
+        docstrings = extract_docstrings(str(path), "pkg.widgets")
+
+        # Assert
+        assert [(d.qualname, d.kind, d.line) for d in docstrings] == [
+            ("pkg.widgets", "module", 1),
+            ("pkg.widgets.Widget", "class", 4),
+            ("pkg.widgets.Widget.spin", "function", 7),
+            ("pkg.widgets.fetch", "function", 14),
+        ]
+
+    def test_id_changes_with_docstring_content(self):
+        """Test that a symbol's id keeps its name and changes with its docstring."""
+        # Arrange
+        before = Docstring("pkg.f", "function", "pkg.py", 1, "Old.")
+        after = before._replace(text="New.", line=5)
+
+        # Act / Assert
+        assert before.id.startswith("pkg.f@")
+        assert before.id != after.id
+        assert before.id == before._replace(line=9).id
+
+    def test_collect_docstrings_reports_unparsable_files(self, tmp_path):
+        """Test that a syntax error skips its file without losing the others."""
+        # Arrange
+        package = make_package(tmp_path)
+        (package / "broken.py").write_text("def broken(:\n")
+
+        # Act
+        docstrings, errors = collect_docstrings([str(package)], workers=1)
+
+        # Assert
+        assert len(docstrings) == 5
+        assert list(errors) == [str(package / "broken.py")]
+
+    def test_collect_docstrings_in_process_pool(self, tmp_path):
+        """Test that parsing in a process pool gives the same docstrings."""
+        # Arrange
+        package = make_package(tmp_path)
+        for index in range(20):
+            (package / f"module_{index}.py").write_text(SOURCE)
+
+        # Act
+        pooled, _ = collect_docstrings([str(package)], workers=2)
+        serial, _ = collect_docstrings([str(package)], workers=1)
+
+        # Assert
+        assert pooled == serial
+        assert len(pooled) == 1 + 21 * 4
+
+
+class TestGradeDocstrings:
+    def test_unchanged_docstrings_are_not_graded_again(self, tmp_path):
+        """Test that a re-run grades only docstrings whose id is not cached."""
+        # Arrange
+        cache_path = str(tmp_path / "scores.json")
+        session = mock.Mock()
+        session.grade.return_value = (0.6, "Fine")
+        first = Docstring("pkg.f", "function", "pkg.py", 1, "Does f.")
+        second = Docstring("pkg.g", "function", "pkg.py", 5, "Does g.")
+        grade_docstrings([first], cache_path=cache_path, session=session)
+
+        # Act
+        grades, _ = grade_docstrings([first, second], cache_path=cache_path, session=session)
+
+        # Assert
+        assert session.grade.call_count == 2
+        assert [grade.cached for grade in grades] == [True, False]
+        assert "1 graded, 1 unchanged" in format_docstring_report(grades)
+
+    def test_failed_symbol_does_not_stop_the_run(self, tmp_path):
+        """Test that one failed judge call is reported while the other grades are kept and cached."""
+        # Arrange
+        cache_path = str(tmp_path / "scores.json")
+        session = mock.Mock()
+
+        def grade(document):
+            if "pkg.g" in document:
+                raise ValueError("Judge returned no score")
+            return 0.6, "Fine"
+
+        session.grade.side_effect = grade
+        first = Docstring("pkg.f", "function", "pkg.py", 1, "Does f.")
+        second = Docstring("pkg.g", "function", "pkg.py", 5, "Does g.")
+
+        # Act
+        with mock.patch("builtins.print"):
+            grades, failures = grade_docstrings(
+                [first, second], cache_path=cache_path, session=session
+            )
+
+        # Assert
+        assert [grade.docstring for grade in grades] == [first]
+        assert list(failures) == [second.id]
+        assert "❌ Failed" in format_docstring_report(grades, failures)
+        assert BlobScoreCache(cache_path).get(first.id) == (0.6, "Fine")
@@ -0,0 +1,103 @@
+"""Unit tests for evaluation_steps module."""
+
+import json
+from unittest import mock
+
+import pytest
+
+from autodoceval import evaluator as evaluator_module
+from autodoceval.evaluation_steps import StepsStore, metric_fingerprint
+from autodoceval.evaluator import (
+    clarity_fingerprint,
+    evaluate_document,
+    setup_evaluator,
+    use_evaluation_steps,
+)
+
+
+@pytest.fixture
+def steps_path(tmp_path):
+    path = str(tmp_path / "steps.json")
+    yield path
+    use_evaluation_steps(None)
+
+
+class TestStepsStore:
+    def test_save_and_load_round_trip(self, steps_path):
+        """Test that saved steps are loaded back for the same configuration only."""
+        # Arrange
+        store = StepsStore(steps_path)
+
+        # Act
+        revision = store.save("abc", ["Check headings"], "Clarity", "clarity", ["input"])
+
+        # Assert
+        assert revision == 1
+        assert StepsStore(steps_path).load("abc") == ["Check headings"]
+        assert StepsStore(steps_path).load("other") is None
+
+    def test_revision_increases_when_steps_change(self, steps_path):
+        """Test that replacing steps bumps the revision, even after a discard."""
+        # Arrange
+        store = StepsStore(steps_path)
+        store.save("abc", ["One"], "Clarity", "clarity", ["input"])
+
+        # Act
+        same = store.save("abc", ["One"], "Clarity", "clarity", ["input"])
+        discarded = store.discard("abc")
+        recompiled = store.save("abc", ["Two"], "Clarity", "clarity", ["input"])
+
+        # Assert
+        assert same == 1
+        assert discarded is True
+        assert recompiled == 2
+        assert StepsStore(steps_path).get("abc")["revision"] == 2
+
+    def test_rejects_unknown_format(self, steps_path):
+        """Test that files of another format version are not misread."""
+        # Arrange
+        with open(steps_path, "w") as f:
+            json.dump({"format": 99}, f)
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            StepsStore(steps_path)
+
+    def test_fingerprint_depends_on_configuration(self):
+        """Test that changing the criteria changes the fingerprint."""
+        # Act & Assert
+        assert metric_fingerprint("Clarity", "clarity", ["input"]) != metric_fingerprint(
+            "Clarity", "accuracy", ["input"]
+        )
+
+
+class TestEvaluatorReuse:
+    @mock.patch("autodoceval.evaluator.GEval")
+    def test_compiled_steps_are_saved_then_reused(self, mock_geval, steps_path):
+        """Test that steps compiled by the first grade are passed to later evaluators."""
+        # Arrange
+        use_evaluation_steps(steps_path)
+        first = mock.Mock(score=0.5, reason="Ok", evaluation_steps=["Check structure"])
+        mock_geval.return_value = first
+
+        # Act
+        with mock.patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"}):
+            evaluate_document("Doc")
+            setup_evaluator()
+
+        # Assert
+        assert mock_geval.call_args_list[0].kwargs["evaluation_steps"] is None
+        assert mock_geval.call_args_list[1].kwargs["evaluation_steps"] == ["Check structure"]
+        assert StepsStore(steps_path).get(clarity_fingerprint())["revision"] == 1
+
+    def test_steps_are_not_saved_without_a_store(self):
+        """Test that nothing is persisted unless steps reuse is enabled."""
+        # Arrange
+        use_evaluation_steps(None)
+        evaluator = mock.Mock(score=0.5, reason="Ok", evaluation_steps=["Step"])
+
+        # Act
+        evaluate_document("Doc", evaluator=evaluator)
+
+        # Assert
+        assert evaluator_module._steps_store is None
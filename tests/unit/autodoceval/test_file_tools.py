@@ -11,8 +11,10 @@ import pytest
 from autodoceval.file_tools import (
     get_derived_paths,
     get_input_path,
+    iter_sections,
     read_file,
     resolve_path,
+    split_sections,
     write_file,
 )
 
@@ -247,4 +249,103 @@ class TestReadWriteFile:
                 assert f.read() == "New content"
         finally:
             # Clean up
-            os.unlink(temp_file_path)
\ No newline at end of file
+            os.unlink(temp_file_path)
+
+
+class TestIterSections:
+    def test_iter_sections_splits_on_headings(self):
+        """Test that iter_sections yields one chunk per heading, ignoring fenced code."""
+        # Arrange
+        content = "Intro\n# One\ntext\n```\n# not a heading\n```\n## Two\nmore\n"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "doc.md")
+            with open(path, "w") as f:
+                f.write(content)
+
+            # Act
+            sections = list(iter_sections(path))
+
+        # Assert
+        assert sections == ["Intro\n", "# One\ntext\n```\n# not a heading\n```\n", "## Two\nmore\n"]
+        assert "".join(sections) == content
+
+    def test_split_sections_matches_iter_sections(self):
+        """Test that splitting text in memory gives the same sections as reading the file."""
+        # Arrange
+        content = "# Über\ntext\r\n~~~\n# code\n~~~\n  ## Two\nmore"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "doc.md")
+            write_file(path, content)
+
+            # Act
+            sections = split_sections(content)
+
+            # Assert
+            assert sections == list(iter_sections(path))
+            assert sections == ["# Über\ntext\r\n~~~\n# code\n~~~\n", "  ## Two\nmore"]
+
+    def test_iter_sections_empty_file(self):
+        """Test that iter_sections yields nothing for an empty file."""
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "empty.md")
+            open(path, "w").close()
+
+            # Act & Assert
+            assert list(iter_sections(path)) == []
+
+    def test_iter_sections_rejects_non_ascii_compatible_encoding(self):
+        """Test that iter_sections refuses encodings it cannot split as bytes."""
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "doc.md")
+            write_file(path, "# One\ntext\n# Two\n", encoding="utf-16")
+
+            # Act & Assert
+            with pytest.raises(ValueError, match="ASCII-compatible"):
+                list(iter_sections(path, encoding="utf-16"))
+
+
+class TestAtomicWrite:
+    def test_write_file_leaves_original_on_failure(self):
+        """Test that a failed write keeps the previous content and removes the temp file."""
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "doc.md")
+            write_file(path, "Original content")
+
+            # Act
+            with mock.patch("os.replace", side_effect=OSError("disk full")), pytest.raises(OSError):
+                write_file(path, "New content")
+
+            # Assert
+            assert read_file(path) == "Original content"
+            assert os.listdir(temp_dir) == ["doc.md"]
+
+    def test_write_file_with_encoding(self):
+        """Test that write_file honours the explicit encoding."""
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "doc.md")
+
+            # Act
+            write_file(path, "Ünïcödé", encoding="utf-16")
+
+            # Assert
+            assert read_file(path, encoding="utf-16") == "Ünïcödé"
+
+    def test_write_file_applies_umask_to_new_files(self):
+        """Test that a new file gets the permissions allowed by the current umask."""
+        # Arrange
+        previous = os.umask(0o027)
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                path = os.path.join(temp_dir, "doc.md")
+
+                # Act
+                write_file(path, "Content")
+
+                # Assert
+                assert os.stat(path).st_mode & 0o777 == 0o640
+        finally:
+            os.umask(previous)
@@ -0,0 +1,137 @@
+"""Unit tests for git_diff module."""
+
+import subprocess
+from unittest import mock
+
+import pytest
+
+from autodoceval.git_diff import (
+    BlobScoreCache,
+    format_changed_report,
+    grade_changed_documents,
+    parse_range,
+)
+from autodoceval.history import HistoryStore
+
+
+def run_git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Create a repository with a base and a head commit."""
+    run_git(tmp_path, "init", "-q")
+    run_git(tmp_path, "config", "user.email", "test@example.com")
+    run_git(tmp_path, "config", "user.name", "Test")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "kept.md").write_text("# Kept\n")
+    (tmp_path / "docs" / "edited.md").write_text("# Edited\n\nOld text.\n")
+    (tmp_path / "docs" / "removed.md").write_text("# Removed\n")
+    run_git(tmp_path, "add", ".")
+    run_git(tmp_path, "commit", "-q", "-m", "base")
+    run_git(tmp_path, "tag", "base")
+
+    (tmp_path / "docs" / "edited.md").write_text("# Edited\n\nNew text.\n")
+    (tmp_path / "docs" / "added.md").write_text("# Added\n")
+    (tmp_path / "docs" / "removed.md").unlink()
+    (tmp_path / "script.py").write_text("print()\n")
+    run_git(tmp_path, "add", "-A")
+    run_git(tmp_path, "commit", "-q", "-m", "head")
+    return tmp_path
+
+
+class TestParseRange:
+    def test_parse_range_defaults_head(self):
+        """Test that a range without a head compares against HEAD."""
+        # Act & Assert
+        assert parse_range("main..feature") == ("main", "feature")
+        assert parse_range("main..") == ("main", "HEAD")
+
+    def test_three_dot_range_compares_with_merge_base(self, repo):
+        """Test that base...head grades only what the head's branch changed."""
+        # Arrange
+        run_git(repo, "tag", "main-tip")
+        run_git(repo, "checkout", "-q", "-b", "feature", "base")
+        (repo / "docs" / "feature.md").write_text("# Feature\n")
+        run_git(repo, "add", ".")
+        run_git(repo, "commit", "-q", "-m", "feature")
+        grade = mock.Mock(return_value=(0.6, "Reason"))
+
+        # Act
+        results = grade_changed_documents("main-tip...feature", cwd=str(repo), grade=grade)
+
+        # Assert
+        assert parse_range("main-tip...", cwd=str(repo))[1] == "HEAD"
+        assert [(result.status, result.path) for result in results] == [
+            ("added", "docs/feature.md")
+        ]
+
+
+class TestGradeChangedDocuments:
+    def test_grades_only_changed_documents(self, repo):
+        """Test that only changed markdown files are graded, with deltas against base."""
+        # Arrange
+        scores = {"# Edited\n\nOld text.\n": 0.5, "# Edited\n\nNew text.\n": 0.75}
+        grade = mock.Mock(side_effect=lambda doc: (scores.get(doc, 0.6), "Reason"))
+
+        # Act
+        results = grade_changed_documents("base..HEAD", cwd=str(repo), grade=grade)
+
+        # Assert
+        by_path = {result.path: result for result in results}
+        assert set(by_path) == {"docs/added.md", "docs/edited.md", "docs/removed.md"}
+        assert by_path["docs/edited.md"].delta == pytest.approx(0.25)
+        assert by_path["docs/added.md"].base_score is None
+        assert by_path["docs/removed.md"].score is None
+        assert by_path["docs/removed.md"].base_score is None
+        assert grade.call_count == 3
+        assert "# Removed\n" not in [call.args[0] for call in grade.call_args_list]
+
+    def test_records_base_then_head_grades(self, repo):
+        """Test that grades are recorded under the document's path, the head grade last."""
+        # Arrange
+        scores = {"# Edited\n\nOld text.\n": 0.8, "# Edited\n\nNew text.\n": 0.5}
+        grade = mock.Mock(side_effect=lambda doc: (scores.get(doc, 0.6), "Reason"))
+        history = HistoryStore(":memory:")
+
+        # Act
+        grade_changed_documents("base..HEAD", cwd=str(repo / "docs"), grade=grade, history=history)
+
+        # Assert
+        assert len(history.timeline(str(repo / "docs" / "edited.md"))) == 2
+        [regressed] = history.top_regressed()
+        assert regressed["path"] == str(repo / "docs" / "edited.md")
+        assert regressed["last_score"] == 0.5
+
+    def test_reuses_cached_blob_scores(self, repo):
+        """Test that a second run grades nothing because every blob is cached."""
+        # Arrange
+        grade = mock.Mock(return_value=(0.6, "Reason"))
+        cache_path = str(repo / "scores.json")
+        grade_changed_documents("base..HEAD", cache_path=cache_path, cwd=str(repo), grade=grade)
+        grade.reset_mock()
+
+        # Act
+        results = grade_changed_documents(
+            "base..HEAD", cache_path=cache_path, cwd=str(repo), grade=grade
+        )
+
+        # Assert
+        grade.assert_not_called()
+        assert len(results) == 3
+        assert len(BlobScoreCache(cache_path).scores) == 3
+
+    def test_format_changed_report(self, repo):
+        """Test that the report shows deltas, new and deleted documents."""
+        # Arrange
+        grade = mock.Mock(return_value=(0.6, "Reason"))
+        results = grade_changed_documents("base..HEAD", cwd=str(repo), grade=grade)
+
+        # Act
+        report = format_changed_report(results)
+
+        # Assert
+        assert "docs/added.md: 60.0% (new)" in report
+        assert "docs/edited.md: 60.0% (+0.0% vs base)" in report
+        assert "docs/removed.md: deleted" in report
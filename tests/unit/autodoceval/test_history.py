@@ -0,0 +1,176 @@
+"""Unit tests for history module."""
+
+import threading
+from unittest import mock
+
+import pytest
+
+from autodoceval.budget import Budget
+from autodoceval.history import HistoryStore, recorded_grade, recorded_improve
+
+
+@pytest.fixture
+def store():
+    history = HistoryStore(":memory:")
+    yield history
+    history.close()
+
+
+class TestHistoryStore:
+    def test_timeline_returns_newest_first(self, store):
+        """Test that timeline lists a document's events with their scores."""
+        # Arrange
+        store.record("grade", "doc.md", "v1", {"clarity": 0.5}, latency=1.0, timestamp=1)
+        store.record("improve", "doc.md", "v1", model="gpt-4", latency=2.0, timestamp=2)
+        store.record("grade", "doc.md", "v2", {"clarity": 0.7}, latency=1.0, timestamp=3)
+        store.record("grade", "other.md", "x", {"clarity": 0.9}, timestamp=4)
+
+        # Act
+        timeline = store.timeline("doc.md")
+
+        # Assert
+        assert [event["kind"] for event in timeline] == ["grade", "improve", "grade"]
+        assert [event["score"] for event in timeline] == [0.7, None, 0.5]
+        assert timeline[1]["model"] == "gpt-4"
+
+    def test_top_regressed_ranks_score_drops(self, store):
+        """Test that top_regressed orders documents by their latest score drop."""
+        # Arrange
+        store.record("grade", "a.md", "a1", {"clarity": 0.8}, timestamp=1)
+        store.record("grade", "a.md", "a2", {"clarity": 0.7}, timestamp=2)
+        store.record("grade", "b.md", "b1", {"clarity": 0.9}, timestamp=1)
+        store.record("grade", "b.md", "b2", {"clarity": 0.5}, timestamp=2)
+        store.record("grade", "c.md", "c1", {"clarity": 0.5}, timestamp=1)
+        store.record("grade", "c.md", "c2", {"clarity": 0.6}, timestamp=2)
+
+        # Act
+        regressed = store.top_regressed()
+
+        # Assert
+        assert [row["path"].rsplit("/", 1)[-1] for row in regressed] == ["b.md", "a.md"]
+        assert regressed[0]["regression"] == pytest.approx(0.4)
+
+    def test_slowest_uses_mean_latency(self, store):
+        """Test that slowest orders documents by mean latency of scored events."""
+        # Arrange
+        store.record("grade", "fast.md", "f", {"clarity": 0.5}, latency=1.0)
+        store.record("grade", "slow.md", "s1", {"clarity": 0.5}, latency=2.0)
+        store.record("grade", "slow.md", "s2", {"clarity": 0.5}, latency=4.0)
+
+        # Act
+        slowest = store.slowest()
+
+        # Assert
+        assert slowest[0]["path"].endswith("slow.md")
+        assert slowest[0]["mean_latency"] == pytest.approx(3.0)
+        assert slowest[0]["events"] == 2
+
+    def test_store_persists_to_file(self, tmp_path):
+        """Test that events survive reopening a database file."""
+        # Arrange
+        path = str(tmp_path / "nested" / "history.db")
+        first = HistoryStore(path)
+        first.record("grade", "doc.md", "v1", {"clarity": 0.5})
+        first.close()
+
+        # Act
+        second = HistoryStore(path)
+        timeline = second.timeline("doc.md")
+        second.close()
+
+        # Assert
+        assert len(timeline) == 1
+
+
+class TestRecordedCalls:
+    def test_recorded_grade_records_tokens_from_budget(self, store):
+        """Test that recorded_grade stores the tokens the call added to the budget."""
+        # Arrange
+        budget = Budget()
+
+        def grade(doc, budget):
+            budget.record(100, 20)
+            return 0.6, "Fine"
+
+        # Act
+        result = recorded_grade(store, "grade", "doc.md", "content", grade, budget=budget)
+
+        # Assert
+        assert result == (0.6, "Fine")
+        event = store.timeline("doc.md")[0]
+        assert event["score"] == 0.6
+        assert event["prompt_tokens"] == 100
+        assert event["completion_tokens"] == 20
+
+    def test_recorded_calls_without_store(self):
+        """Test that recorded calls just call through when no store is given."""
+        # Arrange
+        grade = mock.Mock(return_value=(0.5, "Ok"))
+        improve = mock.Mock(return_value="Better")
+
+        # Act
+        grade_result = recorded_grade(None, "grade", "doc.md", "content", grade)
+        improve_result = recorded_improve(None, "doc.md", "content", "Ok", improve, "gpt-4")
+
+        # Assert
+        assert grade_result == (0.5, "Ok")
+        assert improve_result == "Better"
+        grade.assert_called_once_with("content")
+        improve.assert_called_once_with("content", "Ok", model="gpt-4")
+
+    def test_recorded_improve_records_cached_tokens(self, store):
+        """Test that recorded_improve stores the prompt tokens served from the provider cache."""
+        # Arrange
+        budget = Budget()
+
+        def improve(doc, feedback, model, budget):
+            budget.record(2000, 500, model, cached_tokens=1536)
+            return "Better"
+
+        # Act
+        recorded_improve(store, "doc.md", "content", "Ok", improve, "gpt-4", budget)
+
+        # Assert
+        assert store.timeline("doc.md")[0]["cached_tokens"] == 1536
+
+    def test_concurrent_calls_record_only_their_own_tokens(self, store):
+        """Test that calls sharing a budget do not count each other's tokens."""
+        # Arrange
+        budget = Budget()
+        both_started = threading.Barrier(2)
+
+        def grade(doc, budget):
+            budget.record(100 if doc == "first" else 300, 10)
+            both_started.wait(timeout=5)
+            return 0.5, "Ok"
+
+        # Act
+        threads = [
+            threading.Thread(
+                target=recorded_grade, args=(store, "grade", f"{doc}.md", doc, grade, budget)
+            )
+            for doc in ("first", "second")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert store.timeline("first.md")[0]["prompt_tokens"] == 100
+        assert store.timeline("second.md")[0]["prompt_tokens"] == 300
+        assert budget.prompt_tokens == 400
+
+    def test_recorded_grade_records_judge_model(self, store):
+        """Test that a grade event names the model the judge grades with."""
+        # Arrange
+        grade = mock.Mock(return_value=(0.5, "Ok"))
+
+        # Act
+        with mock.patch("autodoceval.evaluator.judge_model", return_value="gpt-4o"):
+            recorded_grade(store, "grade", "doc.md", "content", grade)
+
+        # Assert
+        event = store.timeline("doc.md")[0]
+        assert event["model"] == "gpt-4o"
+        assert event["prompt_tokens"] is None
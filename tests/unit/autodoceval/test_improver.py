@@ -37,7 +37,14 @@ with mock.patch.dict('sys.modules', {
             self.model = model
             self.object = object
 
-from autodoceval.improver import create_improvement_prompt, improve_document, setup_client
+from autodoceval.budget import Budget
+from autodoceval.improver import (
+    IMPROVEMENT_INSTRUCTIONS,
+    create_improvement_messages,
+    create_improvement_prompt,
+    improve_document,
+    setup_client,
+)
 
 
 class TestSetupClient:
@@ -83,6 +90,24 @@ class TestCreateImprovementPrompt:
         assert "### Revised Documentation:" in prompt
 
 
+class TestCreateImprovementMessages:
+    def test_stable_system_prefix_then_document_then_feedback(self):
+        """Test that only the end of the prompt varies with the feedback."""
+        # Arrange
+        doc = "# Sample Document\n\nThis is a sample document."
+
+        # Act
+        first = create_improvement_messages("Add examples.", doc)
+        second = create_improvement_messages("Be more concise.", doc)
+
+        # Assert
+        assert first[0] == {"role": "system", "content": IMPROVEMENT_INSTRUCTIONS}
+        assert first[0] == second[0]
+        content = first[1]["content"]
+        assert content.index(doc) < content.index("Add examples.")
+        assert content.split("### Feedback:")[0] == second[1]["content"].split("### Feedback:")[0]
+
+
 class TestImproveDocument:
     @mock.patch("autodoceval.improver.setup_client")
     def test_improve_document_calls_setup_client(self, mock_setup_client):
@@ -106,11 +131,11 @@ class TestImproveDocument:
         mock_setup_client.assert_called_once()
     
     @mock.patch("autodoceval.improver.setup_client")
-    @mock.patch("autodoceval.improver.create_improvement_prompt")
-    def test_improve_document_calls_create_improvement_prompt(
-        self, mock_create_improvement_prompt, mock_setup_client
+    @mock.patch("autodoceval.improver.create_improvement_messages")
+    def test_improve_document_calls_create_improvement_messages(
+        self, mock_create_improvement_messages, mock_setup_client
     ):
-        """Test that improve_document calls create_improvement_prompt with correct arguments."""
+        """Test that improve_document calls create_improvement_messages with correct arguments."""
         # Arrange
         mock_client = mock.MagicMock()
         mock_response = mock.MagicMock()
@@ -125,13 +150,13 @@ class TestImproveDocument:
         
         doc_content = "Original document"
         feedback = "Feedback"
-        mock_create_improvement_prompt.return_value = "Test prompt"
+        mock_create_improvement_messages.return_value = [{"role": "user", "content": "Test prompt"}]
         
         # Act
         improve_document(doc_content, feedback)
         
         # Assert
-        mock_create_improvement_prompt.assert_called_once_with(feedback, doc_content)
+        mock_create_improvement_messages.assert_called_once_with(feedback, doc_content)
     
     @mock.patch("autodoceval.improver.setup_client")
     def test_improve_document_calls_chat_completions_create(self, mock_setup_client):
@@ -149,12 +174,11 @@ class TestImproveDocument:
         mock_setup_client.return_value = mock_client
         
         # Act
-        with mock.patch("autodoceval.improver.create_improvement_prompt", return_value="Test prompt"):
-            improve_document("Original document", "Feedback")
+        improve_document("Original document", "Feedback")
         
         # Assert
         mock_client.chat.completions.create.assert_called_once_with(
-            model="gpt-4", messages=[{"role": "user", "content": "Test prompt"}]
+            model="gpt-4", messages=create_improvement_messages("Feedback", "Original document")
         )
     
     @mock.patch("autodoceval.improver.setup_client")
@@ -182,4 +206,26 @@ class TestImproveDocument:
             result = improve_document("Original document", "Feedback")
         
         # Assert
-        assert result == "Improved document content"
\ No newline at end of file
+        assert result == "Improved document content"
+
+    @mock.patch("autodoceval.improver.setup_client")
+    def test_improve_document_records_cached_tokens(self, mock_setup_client):
+        """Test that prompt tokens served from the provider cache are recorded on the budget."""
+        # Arrange
+        response = mock.Mock()
+        response.choices = [mock.Mock(message=mock.Mock(content="Improved"))]
+        response.usage = mock.Mock(
+            prompt_tokens=2000,
+            completion_tokens=500,
+            prompt_tokens_details=mock.Mock(cached_tokens=1536),
+        )
+        mock_setup_client.return_value.chat.completions.create.return_value = response
+        budget = Budget()
+
+        # Act
+        improve_document("Original document", "Feedback", budget=budget)
+
+        # Assert
+        assert budget.prompt_tokens == 2000
+        assert budget.cached_tokens == 1536
+        assert "1536 prompt tokens cached (77%)" in budget.summary()
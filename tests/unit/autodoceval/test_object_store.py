@@ -0,0 +1,108 @@
+"""Unit tests for object_store module."""
+
+import os
+
+import pytest
+
+from autodoceval.object_store import (
+    MAX_DELTA_CHAIN,
+    ObjectStore,
+    apply_delta,
+    encode_delta,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ObjectStore(str(tmp_path / "store"))
+
+
+def make_doc(edit: str = "") -> str:
+    sections = [f"## Section {i}\n\nSome text about topic {i}.\n\n" for i in range(200)]
+    return "# Guide\n\n" + edit + "".join(sections)
+
+
+class TestDelta:
+    def test_delta_round_trips(self):
+        """Test that applying a delta to its base rebuilds the content exactly."""
+        # Arrange
+        base = "a\nb\nc\nd"
+        content = "a\nB\nc\nd\ne\n"
+
+        # Act
+        ops = encode_delta(base, content)
+
+        # Assert
+        assert apply_delta(base, ops) == content
+        assert ops[0] == [0, 1]
+
+
+class TestObjectStore:
+    def test_objects_are_content_addressed(self, store):
+        """Test that identical content is stored once under the same id."""
+        # Act
+        first = store.put("# Doc\n")
+        second = store.put("# Doc\n")
+
+        # Assert
+        assert first == second
+        assert store.get(first) == "# Doc\n"
+
+    def test_small_edits_are_stored_as_deltas(self, store):
+        """Test that a rewrite costs far less than a full copy when it changes little."""
+        # Arrange
+        base = store.put(make_doc())
+        full_size = os.path.getsize(store._object_path(base))
+
+        # Act
+        edited = store.put(make_doc("A new introduction.\n\n"), base=base)
+
+        # Assert
+        assert store.get(edited) == make_doc("A new introduction.\n\n")
+        assert os.path.getsize(store._object_path(edited)) < full_size / 4
+
+    def test_delta_chains_are_capped(self, store):
+        """Test that a full copy is stored once the delta chain gets too long."""
+        # Arrange
+        object_id = store.put(make_doc())
+
+        # Act
+        for number in range(MAX_DELTA_CHAIN + 1):
+            object_id = store.put(make_doc(f"Edit {number}.\n\n"), base=object_id)
+
+        # Assert
+        assert store._read(object_id)[1] == 0
+        assert store.get(object_id) == make_doc(f"Edit {MAX_DELTA_CHAIN}.\n\n")
+
+
+class TestStoredRun:
+    def test_materialize_iterations(self, store, tmp_path):
+        """Test that iterations of a run can be written out on demand."""
+        # Arrange
+        doc_path = str(tmp_path / "doc.md")
+        run = store.start_run(doc_path)
+        run.add(0, doc_path, "v0\n")
+        run.add(1, str(tmp_path / "doc_iter1.md"), "v1\n")
+        run.set_score(1, 0.8)
+        run.add(2, str(tmp_path / "doc_iter2.md"), "v2\n")
+
+        # Act
+        single = store.materialize(run.id, iteration=1, output=str(tmp_path / "out.md"))
+        exported = store.materialize(run.id)
+
+        # Assert
+        assert single == [str(tmp_path / "out.md")]
+        assert (tmp_path / "out.md").read_text() == "v1\n"
+        assert exported == [str(tmp_path / "doc_iter1.md"), str(tmp_path / "doc_iter2.md")]
+        assert (tmp_path / "doc_iter2.md").read_text() == "v2\n"
+        assert store.runs()[0]["versions"][1]["score"] == 0.8
+
+    def test_materialize_unknown_iteration(self, store, tmp_path):
+        """Test that asking for an iteration the run doesn't have fails clearly."""
+        # Arrange
+        run = store.start_run(str(tmp_path / "doc.md"))
+        run.add(0, str(tmp_path / "doc.md"), "v0\n")
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="no iteration 3"):
+            store.materialize(run.id, iteration=3)
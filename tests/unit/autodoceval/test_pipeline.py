@@ -0,0 +1,109 @@
+"""Unit tests for pipeline module."""
+
+from unittest import mock
+
+import pytest
+
+from autodoceval.pipeline import Pipeline, document_pipeline
+
+
+@pytest.fixture
+def session():
+    """Session double grading by content and rewriting to a fixed document."""
+    session = mock.Mock()
+    session.grade.side_effect = lambda content: (
+        (0.9, "Clear") if content == "Improved" else (0.5, "Vague")
+    )
+    session.improve.return_value = "Improved"
+    return session
+
+
+class TestPipeline:
+    def test_stages_run_once_in_dependency_order(self):
+        """Test that required stages run first and their results are reused."""
+        # Arrange
+        calls = []
+        pipeline = Pipeline(session=mock.Mock())
+        pipeline.add("a", lambda session: calls.append("a") or 1)
+        pipeline.add("b", lambda session, a: calls.append("b") or a + 1, requires=("a",))
+        pipeline.add("c", lambda session, a, b: a + b, requires=("a", "b"))
+
+        # Act
+        first = pipeline.run("b")
+        second = pipeline.run("c")
+
+        # Assert
+        assert first == {"b": 2}
+        assert second == {"c": 3}
+        assert calls == ["a", "b"]
+
+    def test_add_rejects_unknown_requirement(self):
+        """Test that a stage cannot require one that was not added before it."""
+        # Arrange
+        pipeline = Pipeline(session=mock.Mock())
+
+        # Act / Assert
+        with pytest.raises(ValueError, match="unknown stage"):
+            pipeline.add("improve", lambda session, grade: None, requires=("grade",))
+
+    def test_run_rejects_unknown_target(self):
+        """Test that running a stage that does not exist raises ValueError."""
+        # Act / Assert
+        with pytest.raises(ValueError, match="Unknown pipeline stage"):
+            Pipeline(session=mock.Mock()).run("publish")
+
+
+class TestDocumentPipeline:
+    def test_full_cycle_makes_minimum_llm_calls(self, tmp_path, session):
+        """Test that grade -> improve -> compare grades each version once and rewrites once."""
+        # Arrange
+        doc = tmp_path / "doc.md"
+        doc.write_text("Original")
+
+        # Act
+        results = document_pipeline(str(doc), session=session, log=lambda _: None).run("compare")
+
+        # Assert
+        comparison = results["compare"]
+        assert comparison.original.score == 0.5
+        assert comparison.improved.score == 0.9
+        assert comparison.difference == pytest.approx(0.4)
+        assert session.grade.call_count == 2
+        session.improve.assert_called_once_with("Original", "Vague")
+        assert (tmp_path / "doc_improved.md").read_text() == "Improved"
+
+    def test_feedback_file_skips_grading(self, tmp_path, session):
+        """Test that improving from a feedback file makes no grading call."""
+        # Arrange
+        doc = tmp_path / "doc.md"
+        doc.write_text("Original")
+        feedback = tmp_path / "feedback.txt"
+        feedback.write_text("Add examples")
+        output = tmp_path / "out.md"
+
+        # Act
+        document_pipeline(
+            str(doc), output=str(output), feedback=str(feedback), session=session, log=print
+        ).run("improve")
+
+        # Assert
+        session.grade.assert_not_called()
+        session.improve.assert_called_once_with("Original", "Add examples")
+        assert output.read_text() == "Improved"
+
+    def test_compare_existing_improved_document(self, tmp_path, session):
+        """Test that comparing with an existing improved document does not rewrite."""
+        # Arrange
+        doc = tmp_path / "doc.md"
+        doc.write_text("Original")
+        improved = tmp_path / "better.md"
+        improved.write_text("Improved")
+
+        # Act
+        results = document_pipeline(
+            str(doc), improved=str(improved), session=session, log=lambda _: None
+        ).run("compare")
+
+        # Assert
+        session.improve.assert_not_called()
+        assert results["compare"].improved.path == str(improved)
@@ -0,0 +1,76 @@
+"""Unit tests for profiling module."""
+
+import json
+import os
+import tempfile
+
+from autodoceval import profiling
+from autodoceval.profiling import Profiler, span
+
+
+class TestSpan:
+    def test_span_is_a_no_op_without_profiler(self):
+        """Test that spans do nothing when no profiler is active."""
+        # Act
+        with span("idle"):
+            pass
+
+        # Assert
+        assert profiling._active is None
+
+    def test_spans_are_recorded_as_trace_events(self):
+        """Test that nested spans become complete events in a Chrome trace."""
+        # Arrange
+        profiler = Profiler()
+
+        # Act
+        with profiler, span("outer", "pipeline", path="doc.md"), span("inner", "io"):
+            pass
+        with span("after"):
+            pass
+        trace = profiler.trace()
+
+        # Assert
+        events = {event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"}
+        assert set(events) == {"inner", "outer"}
+        assert events["outer"]["args"] == {"path": "doc.md"}
+        assert events["outer"]["ts"] <= events["inner"]["ts"]
+        assert events["outer"]["dur"] >= events["inner"]["dur"]
+        assert any(event["ph"] == "M" for event in trace["traceEvents"])
+
+
+class TestProfiler:
+    def test_summary_includes_cpu_and_memory_sections(self):
+        """Test that the summary reports spans, CPU hotspots and allocations."""
+        # Arrange
+        profiler = Profiler(cpu=True, memory=True)
+
+        # Act
+        with profiler, span("work", "cpu"):
+            data = [str(i) * 10 for i in range(10_000)]
+        summary = profiler.summary()
+
+        # Assert
+        assert data
+        assert "cpu/work" in summary
+        assert "CPU hotspots" in summary
+        assert "Allocation sites" in summary
+        assert any(event["ph"] == "C" for event in profiler.trace()["traceEvents"])
+
+    def test_write_creates_trace_and_summary(self):
+        """Test that write saves the JSON trace and a text summary next to it."""
+        # Arrange
+        profiler = Profiler()
+        with profiler, span("step"):
+            pass
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Act
+            trace_path, summary_path = profiler.write(os.path.join(temp_dir, "run.json"))
+
+            # Assert
+            assert summary_path == os.path.join(temp_dir, "run.txt")
+            with open(trace_path) as f:
+                assert json.load(f)["traceEvents"]
+            with open(summary_path) as f:
+                assert "pipeline/step" in f.read()
@@ -0,0 +1,112 @@
+"""Unit tests for pytest_plugin module."""
+
+import subprocess
+import sys
+from unittest import mock
+
+import pytest
+
+pytest_plugins = ["pytester"]
+
+DOCUMENT = "# Install\n\nRun pip install.\n\n# Usage\n\nRun the command.\n"
+
+
+@pytest.fixture
+def mock_grading():
+    """Patches the judge so grading returns a fixed score per content."""
+    with (
+        mock.patch("autodoceval.evaluator.setup_evaluator"),
+        mock.patch(
+            "autodoceval.evaluator.evaluate_document", return_value=(0.8, "Clear enough")
+        ) as mock_evaluate,
+    ):
+        yield mock_evaluate
+
+
+def run(pytester, *args):
+    return pytester.runpytest_inprocess("-p", "autodoceval.pytest_plugin", *args)
+
+
+class TestPytestPlugin:
+    def test_loading_plugin_does_not_import_judge(self):
+        """Test that the plugin, loaded into every pytest session, doesn't import deepeval."""
+        # Arrange
+        code = (
+            "import sys, autodoceval.pytest_plugin; "
+            "print(sorted({'deepeval', 'openai'} & {m.split('.')[0] for m in sys.modules}))"
+        )
+
+        # Act
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        # Assert
+        assert result.stdout.strip() == "[]"
+
+    def test_plugin_is_inert_unless_enabled(self, pytester, mock_grading):
+        """Test that markdown files are not collected without --doc-quality."""
+        # Arrange
+        pytester.makefile(".md", guide=DOCUMENT)
+
+        # Act
+        result = run(pytester)
+
+        # Assert
+        result.assert_outcomes()
+        mock_grading.assert_not_called()
+
+    def test_documents_pass_and_fail_against_threshold(self, pytester, mock_grading):
+        """Test that each markdown file is one test judged against the threshold."""
+        # Arrange
+        pytester.makefile(".md", guide=DOCUMENT)
+
+        # Act
+        passed = run(pytester, "--doc-quality", "--doc-threshold", "0.7")
+        failed = run(pytester, "--doc-quality", "--doc-threshold", "0.9")
+
+        # Assert
+        passed.assert_outcomes(passed=1)
+        failed.assert_outcomes(failed=1)
+        failed.stdout.fnmatch_lines(["*clarity 80.0% is below the threshold of 90.0%*"])
+
+    def test_sections_are_separate_items(self, pytester, mock_grading):
+        """Test that --doc-sections yields one test per markdown section."""
+        # Arrange
+        pytester.makefile(".md", guide=DOCUMENT)
+
+        # Act
+        result = run(pytester, "--doc-quality", "--doc-sections", "--collect-only", "-q")
+
+        # Assert
+        result.stdout.fnmatch_lines(["guide.md::install", "guide.md::usage"])
+
+    def test_scores_are_cached_by_content(self, pytester, mock_grading):
+        """Test that a second run reuses cached scores instead of grading again."""
+        # Arrange
+        pytester.makefile(".md", guide=DOCUMENT)
+        run(pytester, "--doc-quality")
+
+        # Act
+        result = run(pytester, "--doc-quality")
+
+        # Assert
+        result.assert_outcomes(passed=1)
+        mock_grading.assert_called_once()
+
+    def test_ini_options_enable_plugin(self, pytester, mock_grading):
+        """Test that the plugin can be configured from the ini file."""
+        # Arrange
+        pytester.makefile(".md", guide=DOCUMENT)
+        pytester.makefile(".txt", notes="Plain text.")
+        pytester.makeini(
+            "[pytest]\ndoc_quality = true\ndoc_quality_threshold = 0.85\n"
+            "doc_quality_pattern = *.txt\n"
+        )
+
+        # Act
+        result = run(pytester)
+
+        # Assert
+        result.assert_outcomes(failed=1)
+        mock_grading.assert_called_once_with("Plain text.", mock.ANY)
@@ -0,0 +1,139 @@
+"""Unit tests for results module."""
+
+import csv
+
+import pytest
+
+from autodoceval.results import ResultTable, StringArena, format_table_summary
+
+
+@pytest.fixture
+def table():
+    table = ResultTable.from_results(
+        {
+            "docs/a.md": (0.2, "Poor"),
+            "docs/b.md": (0.6, 'Fair, with "quotes"'),
+            "guides/c.md": (0.9, "Excellent ✓"),
+        }
+    )
+    yield table
+    table.close()
+
+
+@pytest.fixture(params=["numpy", "python"])
+def aggregation(request, monkeypatch):
+    """Runs a test with numpy aggregations and again with the pure-Python fallback."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr("autodoceval.results._numpy", lambda: None)
+    return request.param
+
+
+class TestStringArena:
+    def test_strings_round_trip(self):
+        """Test that strings are returned exactly as stored."""
+        # Arrange
+        arena = StringArena()
+
+        # Act
+        indexes = [arena.append(text) for text in ("one", "", "drei ✓")]
+
+        # Assert
+        assert indexes == [0, 1, 2]
+        assert [arena[i] for i in indexes] == ["one", "", "drei ✓"]
+
+    def test_spills_to_disk_past_threshold(self):
+        """Test that the arena moves to a temporary file once it grows past the threshold."""
+        # Arrange
+        arena = StringArena(spill_threshold=10)
+
+        # Act
+        arena.append("short")
+        arena.append("long enough to spill")
+        arena.append("after")
+
+        # Assert
+        assert arena.spilled
+        assert [arena[i] for i in range(3)] == ["short", "long enough to spill", "after"]
+        assert bytes(arena.buffer()) == b"shortlong enough to spillafter"
+        arena.close()
+
+
+class TestResultTable:
+    def test_rows_and_interned_directories(self, table):
+        """Test that rows are reconstructed and directories are shared."""
+        # Act & Assert
+        assert len(table) == 3
+        assert table.row(1) == ("docs/b.md", 0.6, 'Fair, with "quotes"')
+        assert table.directories == ["docs", "guides"]
+        assert list(table.directory_ids) == [0, 0, 1]
+
+    def test_summary_percentiles(self, table, aggregation):
+        """Test that percentiles interpolate between scores."""
+        # Act
+        stats = table.summary()
+
+        # Assert
+        assert stats["count"] == 3
+        assert stats["mean"] == pytest.approx(17 / 30)
+        assert stats["p50"] == pytest.approx(0.6)
+        assert stats["p90"] == pytest.approx(0.84)
+
+    def test_histogram_and_directory_rollups(self, table, aggregation):
+        """Test that scores are bucketed and rolled up per directory."""
+        # Act
+        counts, edges = table.histogram(bins=5)
+        rollups = table.by_directory()
+
+        # Assert
+        # 0.6 lands in the 0.6-0.8 bin on both paths
+        assert counts == [0, 1, 0, 1, 1]
+        assert edges[0] == 0.0 and edges[-1] == pytest.approx(1.0)
+        assert rollups["docs"]["count"] == 2
+        assert rollups["docs"]["mean"] == pytest.approx(0.4)
+        assert rollups["guides"]["min"] == 0.9
+
+    def test_write_csv(self, table, tmp_path):
+        """Test that CSV export keeps reasons with quotes and non-ASCII text."""
+        # Arrange
+        path = str(tmp_path / "results.csv")
+
+        # Act
+        table.write(path)
+
+        # Assert
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == ["path", "score", "reason"]
+        assert rows[2] == ["docs/b.md", "0.6", 'Fair, with "quotes"']
+        assert rows[3][2] == "Excellent ✓"
+
+    def test_write_rejects_unknown_format(self, table, tmp_path):
+        """Test that unknown extensions are rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            table.write(str(tmp_path / "results.xlsx"))
+
+    def test_to_arrow_uses_column_buffers(self, table):
+        """Test that Arrow export reproduces every column."""
+        # Arrange
+        pa = pytest.importorskip("pyarrow")
+
+        # Act
+        arrow_table = table.to_arrow()
+
+        # Assert
+        assert isinstance(arrow_table, pa.Table)
+        assert arrow_table.column("score").to_pylist() == [0.2, 0.6, 0.9]
+        assert arrow_table.column("reason").to_pylist()[2] == "Excellent ✓"
+
+    def test_format_table_summary(self, table):
+        """Test that the summary names percentiles and directories."""
+        # Act
+        summary = format_table_summary(table)
+
+        # Assert
+        assert "3 documents" in summary
+        assert "p90 84.0%" in summary
+        assert "guides: 1 documents" in summary
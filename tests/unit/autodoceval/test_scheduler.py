@@ -0,0 +1,225 @@
+"""Unit tests for scheduler module."""
+
+import os
+from unittest import mock
+
+import pytest
+
+from autodoceval.budget import Budget
+from autodoceval.deadline import Deadline, DeadlineExceededError, current_deadline
+from autodoceval.history import HistoryStore
+from autodoceval.scheduler import (
+    DocumentState,
+    PriorityScheduler,
+    format_schedule_report,
+    load_traffic,
+    priority,
+)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """Create a few documents to improve."""
+    paths = []
+    for name in ("popular", "obscure"):
+        path = tmp_path / f"{name}.md"
+        path.write_text(f"# {name}\n\nSome unclear documentation.\n")
+        paths.append(str(path))
+    return paths
+
+
+def make_state(score=0.4, weight=1.0, attempts=0, doc="# Doc\n\nText.\n"):
+    return DocumentState("doc.md", weight, score, score, "doc.md", doc, "Unclear", attempts)
+
+
+class TestPriority:
+    def test_priority_prefers_low_scores_high_traffic_and_few_attempts(self):
+        """Test that expected gain grows with traffic and distance to target, and decays with attempts."""
+        # Arrange
+        base = priority(make_state(), 0.8)
+
+        # Act & Assert
+        assert priority(make_state(score=0.2), 0.8) > base
+        assert priority(make_state(weight=10.0), 0.8) > base
+        assert priority(make_state(attempts=2), 0.8) < base
+        assert priority(make_state(score=0.9), 0.8) == 0
+
+    def test_load_traffic_reads_weights(self, tmp_path):
+        """Test that traffic weights are keyed by absolute path."""
+        # Arrange
+        csv_path = tmp_path / "traffic.csv"
+        csv_path.write_text("Path,Views\ndocs/a.md,120\ndocs/b.md,\n")
+
+        # Act
+        weights = load_traffic(str(csv_path))
+
+        # Assert
+        assert weights == {os.path.abspath("docs/a.md"): 120.0, os.path.abspath("docs/b.md"): 0.0}
+
+    def test_load_traffic_requires_columns(self, tmp_path):
+        """Test that a CSV without a weight column is rejected."""
+        # Arrange
+        csv_path = tmp_path / "traffic.csv"
+        csv_path.write_text("path,owner\ndocs/a.md,me\n")
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            load_traffic(str(csv_path))
+
+
+class TestPriorityScheduler:
+    def test_improves_high_traffic_document_first(self, corpus):
+        """Test that the first step goes to the heaviest document and stops at the target."""
+        # Arrange
+        popular, obscure = corpus
+        session = mock.Mock()
+        session.grade.side_effect = lambda doc, budget=None: (
+            (0.9, "Clear") if doc.startswith("Improved") else (0.4, "Unclear")
+        )
+        session.improve.side_effect = lambda doc, feedback, model, budget=None: f"Improved {doc}"
+        scheduler = PriorityScheduler(target_score=0.7, workers=1, session=session)
+
+        # Act
+        with mock.patch("builtins.print"):
+            states = scheduler.run(corpus, {os.path.abspath(popular): 100.0})
+
+        # Assert
+        assert session.improve.call_args_list[0].args[0] == states[popular].doc[len("Improved ") :]
+        assert states[popular].score == 0.9
+        assert states[obscure].attempts == 1
+        assert states[popular].best_path.endswith("popular_iter1.md")
+        assert scheduler.stop_reason == "all documents done"
+
+    def test_records_grade_and_improve_events(self, corpus):
+        """Test that every grade and rewrite of a scheduled run is recorded."""
+        # Arrange
+        session = mock.Mock()
+        session.grade.side_effect = lambda doc, budget=None: (
+            (0.9, "Clear") if doc.startswith("Improved") else (0.4, "Unclear")
+        )
+        session.improve.side_effect = lambda doc, feedback, model, budget=None: f"Improved {doc}"
+        history = HistoryStore(":memory:")
+        scheduler = PriorityScheduler(target_score=0.7, workers=1, session=session, history=history)
+
+        # Act
+        with mock.patch("builtins.print"):
+            states = scheduler.run(corpus[:1])
+
+        # Assert
+        assert [event["kind"] for event in history.timeline(corpus[0])] == ["improve", "grade"]
+        assert history.timeline(states[corpus[0]].best_path)[0]["score"] == 0.9
+
+    def test_stops_at_max_attempts_and_keeps_best_version(self, corpus):
+        """Test that documents that stop improving keep their best version."""
+        # Arrange
+        session = mock.Mock()
+        session.grade.return_value = (0.3, "Still unclear")
+        session.improve.return_value = "Worse"
+        scheduler = PriorityScheduler(target_score=0.7, max_attempts=2, workers=2, session=session)
+
+        # Act
+        with mock.patch("builtins.print"):
+            states = scheduler.run(corpus[:1])
+
+        # Assert
+        state = states[corpus[0]]
+        assert state.attempts == 2
+        assert state.best_path == corpus[0]
+        assert session.improve.call_count == 2
+
+    def test_stops_when_budget_is_exhausted(self, corpus):
+        """Test that no new steps start once the budget can't pay for them."""
+        # Arrange
+        session = mock.Mock()
+        session.grade.return_value = (0.3, "Unclear")
+        scheduler = PriorityScheduler(budget=Budget(max_tokens=850), session=session)
+
+        # Act
+        states = scheduler.run(corpus)
+
+        # Assert
+        session.improve.assert_not_called()
+        assert scheduler.stop_reason == "budget exhausted"
+        assert set(states) == set(corpus)
+
+    def test_deadline_stops_new_work(self, corpus):
+        """Test that an expired deadline prevents new steps from starting."""
+        # Arrange
+        session = mock.Mock()
+        session.grade.return_value = (0.3, "Unclear")
+        scheduler = PriorityScheduler(deadline=Deadline(0), session=session)
+
+        # Act
+        scheduler.run(corpus)
+
+        # Assert
+        session.improve.assert_not_called()
+        assert scheduler.stop_reason == "deadline reached"
+
+    def test_calls_run_under_the_deadline(self, corpus):
+        """Test that grades and steps run with the deadline active, so calls are cut off."""
+        # Arrange
+        deadline = Deadline(60)
+        seen = []
+
+        def grade(doc, budget=None):
+            seen.append(current_deadline())
+            return (0.3, "Unclear")
+
+        def improve(doc, feedback, model, budget=None):
+            seen.append(current_deadline())
+            raise DeadlineExceededError("Deadline reached during the call")
+
+        session = mock.Mock()
+        session.grade.side_effect = grade
+        session.improve.side_effect = improve
+        scheduler = PriorityScheduler(workers=1, deadline=deadline, session=session)
+
+        # Act
+        with mock.patch("builtins.print"):
+            states = scheduler.run(corpus[:1])
+
+        # Assert
+        assert seen == [deadline, deadline]
+        assert scheduler.stop_reason == "deadline reached"
+        assert scheduler.failures == {}
+        assert states[corpus[0]].attempts == 0
+
+    def test_failed_document_does_not_stop_the_run(self, corpus):
+        """Test that a document whose grade or step fails is recorded and the rest carry on."""
+        # Arrange
+        popular, obscure = corpus
+
+        def grade(doc, budget=None):
+            if "obscure" in doc:
+                raise ValueError("Judge returned no score")
+            return (0.9, "Clear") if doc.startswith("Improved") else (0.4, "Unclear")
+
+        session = mock.Mock()
+        session.grade.side_effect = grade
+        session.improve.side_effect = RuntimeError("Rewrite failed")
+        scheduler = PriorityScheduler(target_score=0.7, workers=1, session=session)
+
+        # Act
+        with mock.patch("builtins.print"):
+            states = scheduler.run(corpus)
+
+        # Assert
+        assert list(states) == [popular]
+        assert states[popular].attempts == 0
+        assert set(scheduler.failures) == {popular, obscure}
+        assert "❌ Failed" in format_schedule_report(states, scheduler.failures)
+
+    def test_format_schedule_report_orders_by_weighted_gain(self):
+        """Test that the report lists the largest weighted gain first."""
+        # Arrange
+        small = make_state()._replace(path="a.md", score=0.5)
+        large = make_state(weight=5.0)._replace(path="b.md", score=0.6)
+
+        # Act
+        report = format_schedule_report({"a.md": small, "b.md": large})
+
+        # Assert
+        lines = report.splitlines()
+        assert lines[2].startswith("b.md")
+        assert "Weighted quality gained: 1.100" in report
@@ -0,0 +1,148 @@
+"""Unit tests for server module."""
+
+import os
+import tempfile
+import threading
+from unittest import mock
+
+import pytest
+
+from autodoceval.server import GradingService, ServerBusyError, ServerClient, create_server
+from autodoceval.session import Session
+
+
+@pytest.fixture
+def session():
+    """Mock session returning fixed results."""
+    session = mock.MagicMock()
+    session.grade.return_value = (0.8, "Good document")
+    session.improve.return_value = "Improved document"
+    session.stats.return_value = {"cache_size": 0}
+    return session
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def client(request, session):
+    """Run a server in a background thread and yield a client connected to it."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        service = GradingService(session, workers=1, max_queue=0)
+        if request.param == "unix":
+            socket_path = os.path.join(temp_dir, "autodoceval.sock")
+            server = create_server(service, socket_path=socket_path)
+            address = f"unix:{socket_path}"
+        else:
+            server = create_server(service, port=0)
+            address = f"http://127.0.0.1:{server.server_address[1]}"
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield ServerClient(address, timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestServerClient:
+    def test_grade(self, client, session):
+        """Test that grade is served from the shared session."""
+        # Act
+        result = client.grade("Document")
+
+        # Assert
+        assert result == (0.8, "Good document")
+        session.grade.assert_called_once_with("Document")
+
+    def test_improve_without_feedback_grades_first(self, client, session):
+        """Test that improve grades the document when no feedback is given."""
+        # Act
+        result = client.improve("Document")
+
+        # Assert
+        assert result == "Improved document"
+        session.improve.assert_called_once_with("Document", "Good document")
+
+    def test_compare(self, client):
+        """Test that compare returns both scores and their difference."""
+        # Act
+        result = client.compare("Original", "Improved")
+
+        # Assert
+        assert result["difference"] == 0.0
+
+    def test_health(self, client):
+        """Test that health reports queue and cache statistics."""
+        # Act
+        result = client.health()
+
+        # Assert
+        assert result["workers"] == 1
+        assert result["cache_size"] == 0
+
+    def test_unknown_endpoint(self, client):
+        """Test that unknown endpoints are reported as errors."""
+        # Act & Assert
+        with pytest.raises(RuntimeError, match="404"):
+            client.request("delete", {})
+
+
+class TestGradingService:
+    def test_handle_rejects_when_queue_full(self, session):
+        """Test that requests beyond workers plus queue are rejected."""
+        # Arrange
+        release = threading.Event()
+        started = threading.Event()
+
+        def slow_grade(content):
+            started.set()
+            release.wait(5)
+            return 0.8, "Good"
+
+        session.grade.side_effect = slow_grade
+        service = GradingService(session, workers=1, max_queue=0)
+        worker = threading.Thread(target=service.handle, args=("grade", {"content": "Doc"}))
+        worker.start()
+        started.wait(5)
+
+        # Act & Assert
+        with pytest.raises(ServerBusyError):
+            service.handle("grade", {"content": "Doc"})
+        release.set()
+        worker.join()
+        assert service.stats()["rejected"] == 1
+        assert service.stats()["completed"] == 1
+
+    @mock.patch("autodoceval.session.evaluate_document", return_value=(0.8, "Good"))
+    @mock.patch("autodoceval.session.setup_evaluator")
+    def test_requests_reuse_pooled_evaluators(self, mock_setup_evaluator, mock_evaluate_document):
+        """Test that requests on separate threads share warm evaluators."""
+        # Arrange
+        service = GradingService(Session(), workers=2, max_queue=8)
+        server = create_server(service, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        client = ServerClient(f"http://127.0.0.1:{server.server_address[1]}", timeout=5)
+
+        # Act
+        try:
+            for index in range(5):
+                client.grade(f"Document {index}")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        # Assert
+        assert mock_evaluate_document.call_count == 5
+        mock_setup_evaluator.assert_called_once()
+
+
+class TestCreateServer:
+    def test_does_not_remove_regular_file_at_socket_path(self, tmp_path):
+        """Test that only a stale socket, not any file, is replaced by the daemon."""
+        # Arrange
+        path = tmp_path / "notes.md"
+        path.write_text("Keep me")
+
+        # Act & Assert
+        with pytest.raises(OSError):
+            create_server(GradingService(mock.MagicMock()), socket_path=str(path))
+        assert path.read_text() == "Keep me"
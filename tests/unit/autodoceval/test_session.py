@@ -0,0 +1,457 @@
+"""Unit tests for session module."""
+
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from autodoceval.deadline import Deadline, DeadlineExceededError
+from autodoceval.session import (
+    AdaptiveLimiter,
+    RateLimiter,
+    ResultCache,
+    Session,
+    SharedRateLimiter,
+    SingleFlight,
+    is_rate_limited,
+)
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class TestResultCache:
+    def test_cache_evicts_least_recently_used(self):
+        """Test that the cache evicts the least recently used entry when full."""
+        # Arrange
+        cache = ResultCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+
+        # Act
+        cache.put("c", 3)
+
+        # Assert
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert cache.hits == 3
+        assert cache.misses == 1
+
+
+class TestRateLimiter:
+    def test_acquire_without_limit_does_not_block(self):
+        """Test that an unlimited rate limiter never sleeps."""
+        # Act
+        with mock.patch("time.sleep") as mock_sleep:
+            for _ in range(100):
+                RateLimiter().acquire()
+
+        # Assert
+        mock_sleep.assert_not_called()
+
+    def test_acquire_sleeps_when_bucket_is_empty(self):
+        """Test that acquire waits once the burst allowance is spent."""
+        # Arrange
+        limiter = RateLimiter(calls_per_minute=60)
+        limiter._tokens = 0
+
+        # Act
+        with mock.patch(
+            "time.sleep", side_effect=lambda s: setattr(limiter, "_tokens", 1)
+        ) as mock_sleep:
+            limiter.acquire()
+
+        # Assert
+        mock_sleep.assert_called_once()
+
+
+class TestSharedRateLimiter:
+    def test_limiters_on_one_file_share_the_bucket(self, tmp_path):
+        """Test that separate limiters over the same state file draw from one bucket."""
+        # Arrange
+        path = str(tmp_path / "rate-limit.json")
+        first = SharedRateLimiter(path, calls_per_minute=2)
+        second = SharedRateLimiter(path, calls_per_minute=2)
+        first.acquire()
+        second.acquire()
+
+        # Act / Assert
+        with (
+            mock.patch("time.sleep", side_effect=InterruptedError) as mock_sleep,
+            pytest.raises(InterruptedError),
+        ):
+            first.acquire()
+        assert mock_sleep.call_args[0][0] > 0
+
+    def test_acquire_without_limit_does_not_touch_the_file(self, tmp_path):
+        """Test that an unlimited shared limiter neither blocks nor writes state."""
+        # Arrange
+        path = tmp_path / "rate-limit.json"
+
+        # Act
+        SharedRateLimiter(str(path)).acquire()
+
+        # Assert
+        assert not path.exists()
+
+
+class TestAdaptiveLimiter:
+    def fill(self, limiter):
+        """Start as many calls as the limit allows."""
+        for _ in range(limiter.current):
+            limiter.acquire()
+
+    def test_limit_grows_while_latency_is_stable(self):
+        """Test additive increase: roughly one slot per round of saturated calls."""
+        # Arrange
+        limiter = AdaptiveLimiter(initial=2, max_limit=8)
+
+        # Act
+        for _ in range(6):
+            self.fill(limiter)
+            for _ in range(limiter.current):
+                limiter.release(1.0)
+
+        # Assert
+        assert limiter.current == 6
+        assert [entry["limit"] for entry in limiter.history] == [3, 4, 5, 6]
+
+    def test_limit_does_not_grow_when_not_saturated(self):
+        """Test that calls well below the limit give no reason to raise it."""
+        # Arrange
+        limiter = AdaptiveLimiter(initial=4)
+
+        # Act
+        for _ in range(20):
+            limiter.acquire()
+            limiter.release(1.0)
+
+        # Assert
+        assert limiter.current == 4
+
+    def test_rate_limit_halves_once_per_burst(self):
+        """Test multiplicative decrease on 429s, counted once per baseline latency."""
+        # Arrange
+        limiter = AdaptiveLimiter(initial=8)
+        self.fill(limiter)
+        limiter.release(10.0)
+
+        # Act
+        for _ in range(5):
+            limiter.release(0.1, throttled=True)
+
+        # Assert
+        assert limiter.current == 4
+        assert limiter.throttled == 5
+        assert limiter.history[-1]["reason"] == "rate limited"
+
+    def test_latency_spike_cuts_limit(self):
+        """Test that a call much slower than the baseline backs off."""
+        # Arrange
+        limiter = AdaptiveLimiter(initial=8, max_limit=8)
+        self.fill(limiter)
+        limiter.release(1.0)
+
+        # Act
+        limiter.release(5.0)
+
+        # Assert
+        assert limiter.current == 4
+        assert limiter.metrics()["latency_spikes"] == 1
+
+    def test_limit_never_drops_below_minimum(self):
+        """Test that repeated throttling stops at min_limit."""
+        # Arrange
+        limiter = AdaptiveLimiter(initial=2, min_limit=1)
+
+        # Act
+        for _ in range(5):
+            limiter.acquire()
+            limiter.release(0.0, throttled=True)
+
+        # Assert
+        assert limiter.current == 1
+
+    @pytest.mark.parametrize(
+        ("error", "expected"),
+        [(RateLimitError(), True), (ValueError(), False)],
+    )
+    def test_is_rate_limited(self, error, expected):
+        """Test that 429 errors are recognised, also when wrapped."""
+        # Arrange
+        wrapped = RuntimeError("retries exhausted")
+        wrapped.__cause__ = error
+
+        # Act & Assert
+        assert is_rate_limited(error) is expected
+        assert is_rate_limited(wrapped) is expected
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one_result(self):
+        """Test that callers arriving while a call is in flight wait for it instead."""
+        # Arrange
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def call():
+            calls.append(1)
+            started.set()
+            release.wait()
+            return "result"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flights.do("key", call)))
+        leader.start()
+        started.wait()
+        followers = [
+            threading.Thread(target=lambda: results.append(flights.do("key", call)))
+            for _ in range(3)
+        ]
+
+        # Act
+        for thread in followers:
+            thread.start()
+        while flights.coalesced < 3:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join()
+
+        # Assert
+        assert results == ["result"] * 4
+        assert len(calls) == 1
+
+    def test_errors_are_shared_and_not_remembered(self):
+        """Test that a failed call raises for its waiters and the next call runs again."""
+        # Arrange
+        flights = SingleFlight()
+
+        # Act
+        with pytest.raises(ValueError):
+            flights.do("key", mock.Mock(side_effect=ValueError))
+        result = flights.do("key", lambda: "retried")
+
+        # Assert
+        assert result == "retried"
+
+    def test_waiter_gives_up_at_its_own_deadline(self):
+        """Test that a waiting caller stops waiting when its own deadline passes."""
+        # Arrange
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def call():
+            started.set()
+            release.wait()
+            return "result"
+
+        leader = threading.Thread(target=lambda: flights.do("key", call))
+        leader.start()
+        started.wait()
+
+        # Act
+        try:
+            with Deadline(0.05).active(), pytest.raises(DeadlineExceededError):
+                flights.do("key", call)
+        finally:
+            release.set()
+            leader.join()
+
+        # Assert
+        assert flights.coalesced == 1
+
+    def test_waiter_runs_the_call_when_the_leader_runs_out_of_time(self):
+        """Test that a leader's deadline error is not inherited by the callers waiting on it."""
+        # Arrange
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def expiring_call():
+            started.set()
+            release.wait()
+            raise DeadlineExceededError("Deadline reached during the call")
+
+        def leader():
+            try:
+                flights.do("key", expiring_call)
+            except DeadlineExceededError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        started.wait()
+        results = []
+        follower = threading.Thread(
+            target=lambda: results.append(flights.do("key", lambda: "retried"))
+        )
+
+        # Act
+        follower.start()
+        while flights.coalesced < 1:
+            time.sleep(0.001)
+        release.set()
+        for t in (thread, follower):
+            t.join()
+
+        # Assert
+        assert len(errors) == 1
+        assert results == ["retried"]
+
+
+class TestSession:
+    @mock.patch("autodoceval.session.evaluate_document")
+    @mock.patch("autodoceval.session.setup_evaluator")
+    def test_grade_caches_by_content(self, mock_setup_evaluator, mock_evaluate_document):
+        """Test that grading identical content twice evaluates it once."""
+        # Arrange
+        mock_evaluate_document.return_value = (0.8, "Good")
+        session = Session()
+
+        # Act
+        first = session.grade("Document")
+        second = session.grade("Document")
+
+        # Assert
+        assert first == second == (0.8, "Good")
+        mock_evaluate_document.assert_called_once_with(
+            "Document", evaluator=mock_setup_evaluator.return_value, budget=None
+        )
+
+    @mock.patch("autodoceval.session.improve_document")
+    @mock.patch("autodoceval.session.setup_client")
+    def test_improve_reuses_client(self, mock_setup_client, mock_improve_document):
+        """Test that the OpenAI client is created once and shared between calls."""
+        # Arrange
+        mock_improve_document.return_value = "Improved"
+        session = Session()
+
+        # Act
+        session.improve("Doc one", "Feedback")
+        session.improve("Doc two", "Feedback")
+
+        # Assert
+        mock_setup_client.assert_called_once()
+        assert mock_improve_document.call_count == 2
+
+    @mock.patch("autodoceval.session.evaluate_document")
+    @mock.patch("autodoceval.session.setup_evaluator")
+    def test_evaluators_are_pooled_across_threads(
+        self, mock_setup_evaluator, mock_evaluate_document
+    ):
+        """Test that threads reuse idle evaluators and only concurrent calls get new ones."""
+        # Arrange
+        mock_setup_evaluator.side_effect = lambda: object()
+        mock_evaluate_document.return_value = (0.8, "Good")
+        session = Session()
+
+        # Act
+        for index in range(3):
+            thread = threading.Thread(target=session.grade, args=(f"Document {index}",))
+            thread.start()
+            thread.join()
+        with session.evaluators.checkout() as first, session.evaluators.checkout() as second:
+            pass
+
+        # Assert
+        assert first is not second
+        assert mock_setup_evaluator.call_count == 2
+        assert session.stats()["evaluators"] == 2
+
+    @mock.patch("autodoceval.session.evaluate_document")
+    @mock.patch("autodoceval.session.setup_evaluator")
+    def test_max_concurrency_caps_calls_in_flight(
+        self, mock_setup_evaluator, mock_evaluate_document
+    ):
+        """Test that no more than max_concurrency LLM calls run at once."""
+        # Arrange
+        session = Session(max_concurrency=2)
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+
+        def evaluate(doc, evaluator, budget):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return 0.5, doc
+
+        mock_evaluate_document.side_effect = evaluate
+
+        # Act
+        threads = [threading.Thread(target=session.grade, args=(f"Doc {i}",)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert mock_evaluate_document.call_count == 6
+        assert peak[0] == 2
+
+    @mock.patch("autodoceval.session.improve_document")
+    @mock.patch("autodoceval.session.evaluate_document")
+    @mock.patch("autodoceval.session.setup_evaluator")
+    @mock.patch("autodoceval.session.setup_client")
+    def test_adaptive_limiter_is_shared_by_judge_and_rewriter(
+        self, mock_setup_client, mock_setup_evaluator, mock_evaluate_document, mock_improve_document
+    ):
+        """Test that rate limits on rewrites also cut the limit judge calls use."""
+        # Arrange
+        session = Session(max_concurrency=4, adaptive_concurrency=True)
+        mock_evaluate_document.return_value = (0.5, "Reason")
+        mock_improve_document.side_effect = RateLimitError()
+
+        # Act
+        with pytest.raises(RateLimitError):
+            session.improve("Doc", "Feedback")
+        session.grade("Doc")
+        stats = session.stats()
+
+        # Assert
+        assert stats["concurrency_limit"] == 2
+        assert stats["rate_limited"] == 1
+        assert stats["in_flight"] == 0
+
+    @mock.patch("autodoceval.session.evaluate_document")
+    @mock.patch("autodoceval.session.setup_evaluator")
+    def test_concurrent_identical_grades_make_one_call(
+        self, mock_setup_evaluator, mock_evaluate_document
+    ):
+        """Test that identical documents graded at the same moment share one LLM call."""
+        # Arrange
+        session = Session()
+
+        def evaluate(doc, evaluator, budget):
+            time.sleep(0.05)
+            return 0.5, doc
+
+        mock_evaluate_document.side_effect = evaluate
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(session.grade("Same doc")))
+            for _ in range(5)
+        ]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        assert mock_evaluate_document.call_count == 1
+        assert results == [(0.5, "Same doc")] * 5
+        assert session.stats()["coalesced"] == 4
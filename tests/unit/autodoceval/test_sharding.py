@@ -0,0 +1,148 @@
+"""Unit tests for sharding module."""
+
+import pytest
+
+from autodoceval.git_diff import BlobScoreCache, blob_hash
+from autodoceval.results import ResultTable
+from autodoceval.sharding import (
+    ShardError,
+    improve_results,
+    merge_shards,
+    parse_shard,
+    select_shard,
+    shard_of,
+    update_score_cache,
+    write_grade_shard,
+    write_improve_shard,
+)
+
+
+@pytest.fixture
+def docs(tmp_path):
+    """Create twenty small documents, including two identical ones."""
+    paths = []
+    for number in range(20):
+        path = tmp_path / f"doc{number}.md"
+        path.write_text(f"# Document {number}\n")
+        paths.append(str(path))
+    (tmp_path / "copy.md").write_text("# Document 3\n")
+    paths.append(str(tmp_path / "copy.md"))
+    return paths
+
+
+class TestParseShard:
+    def test_parse_shard(self):
+        """Test that shards are parsed as 1-based i/N."""
+        # Act & Assert
+        assert parse_shard("1/4") == (1, 4)
+        assert parse_shard("4/4") == (4, 4)
+
+    @pytest.mark.parametrize("spec", ["0/4", "5/4", "1/0", "1", "a/b"])
+    def test_parse_shard_rejects_invalid(self, spec):
+        """Test that out-of-range and malformed shards are rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+class TestSelectShard:
+    def test_shards_partition_documents(self, docs):
+        """Test that the shards together cover every document exactly once."""
+        # Act
+        shards = [select_shard(docs, index, 3) for index in (1, 2, 3)]
+
+        # Assert
+        assert sorted(path for shard in shards for path in shard) == sorted(docs)
+        assert all(shards)
+
+    def test_partition_ignores_order_and_keeps_duplicates_together(self, docs):
+        """Test that a document's shard depends only on its content."""
+        # Act
+        forward = select_shard(docs, 2, 3)
+        backward = select_shard(list(reversed(docs)), 2, 3)
+
+        # Assert
+        assert sorted(forward) == sorted(backward)
+        assert shard_of("# Document 3\n", 3) == shard_of("# Document 3\n", 3)
+        assert (docs[3] in forward) == (docs[-1] in forward)
+
+
+class TestMergeShards:
+    def test_merges_grade_shards_and_seeds_cache(self, docs, tmp_path):
+        """Test that grade shards merge into one report whose scores fill the blob cache."""
+        # Arrange
+        shard_paths = []
+        for index in (1, 2):
+            paths = select_shard(docs, index, 2)
+            path = str(tmp_path / f"shard{index}.json")
+            write_grade_shard(
+                path,
+                (index, 2),
+                ResultTable.from_results(dict.fromkeys(paths, (0.5, "Fair"))),
+                {p: [p] for p in paths},
+            )
+            shard_paths.append(path)
+        cache_path = str(tmp_path / "cache.json")
+
+        # Act
+        merged = merge_shards(shard_paths)
+        added = update_score_cache(merged, cache_path)
+
+        # Assert
+        assert merged["command"] == "batch-grade"
+        assert sorted(merged["results"]) == sorted(docs)
+        assert added == 20  # the copy shares its blob with doc3
+        assert BlobScoreCache(cache_path).get(blob_hash(b"# Document 3\n")) == (0.5, "Fair")
+
+    def test_cache_gets_only_graded_content_by_raw_bytes(self, tmp_path):
+        """Test that shared near-duplicate results stay out of the cache and CRLF files match git."""
+        # Arrange
+        graded, shared = tmp_path / "graded.md", tmp_path / "shared.md"
+        graded.write_bytes(b"# Guide\r\n\r\nRun it.\r\n")
+        shared.write_bytes(b"# Guide\n\nRun it now.\n")
+        shard_path, cache_path = str(tmp_path / "shard.json"), str(tmp_path / "cache.json")
+        write_grade_shard(
+            shard_path,
+            (1, 1),
+            ResultTable.from_results(dict.fromkeys([str(graded), str(shared)], (0.7, "Clear"))),
+            {str(graded): [str(graded), str(shared)]},
+        )
+
+        # Act
+        added = update_score_cache(merge_shards([shard_path]), cache_path)
+
+        # Assert
+        assert added == 1
+        cache = BlobScoreCache(cache_path)
+        assert cache.get(blob_hash(graded.read_bytes())) == (0.7, "Clear")
+        assert cache.get(blob_hash(shared.read_bytes())) is None
+
+    def test_merges_improve_shards_with_errors(self, tmp_path):
+        """Test that auto-improve shards keep versions and restore errors."""
+        # Arrange
+        first, second = str(tmp_path / "1.json"), str(tmp_path / "2.json")
+        write_improve_shard(first, (1, 2), {"a.md": [("a.md", 0.4), ("a_v1.md", 0.8)]})
+        write_improve_shard(second, (2, 2), {"b.md": RuntimeError("boom")})
+
+        # Act
+        results = improve_results(merge_shards([second, first]))
+
+        # Assert
+        assert results["a.md"] == [("a.md", 0.4), ("a_v1.md", 0.8)]
+        assert isinstance(results["b.md"], ShardError)
+        assert "RuntimeError: boom" in str(results["b.md"])
+
+    def test_rejects_missing_and_mismatched_shards(self, tmp_path):
+        """Test that a merge needs every shard of the same run exactly once."""
+        # Arrange
+        first, other = str(tmp_path / "1.json"), str(tmp_path / "other.json")
+        write_improve_shard(first, (1, 2), {})
+        write_improve_shard(other, (2, 3), {})
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="Missing shard"):
+            merge_shards([first])
+        with pytest.raises(ValueError, match="twice"):
+            merge_shards([first, first])
+        with pytest.raises(ValueError, match="same auto-improve run"):
+            merge_shards([first, other])
@@ -0,0 +1,154 @@
+"""Unit tests for streaming module."""
+
+import time
+from unittest import mock
+
+from autodoceval.history import HistoryStore
+from autodoceval.streaming import StreamPipeline, corpus_pipeline, discover_documents
+
+
+class TestStreamPipeline:
+    def test_stages_transform_items_and_count_throughput(self):
+        """Test that map and flat_map stages chain and record per-stage counters."""
+        # Arrange
+        pipeline = StreamPipeline(range(5), queue_size=2)
+        pipeline.map("double", lambda x: x * 2, workers=3)
+        pipeline.flat_map("repeat", lambda x: [x, x])
+
+        # Act
+        results = sorted(pipeline.run())
+
+        # Assert
+        assert results == sorted([0, 0, 2, 2, 4, 4, 6, 6, 8, 8])
+        stats = pipeline.stats()
+        assert list(stats) == ["double", "repeat"]
+        assert stats["double"]["items_in"] == 5
+        assert stats["repeat"]["items_out"] == 10
+
+    def test_slow_consumer_throttles_source(self):
+        """Test that bounded queues stop the source from running ahead of the consumer."""
+        # Arrange
+        produced = []
+
+        def source():
+            for index in range(1000):
+                produced.append(index)
+                yield index
+
+        pipeline = StreamPipeline(source(), queue_size=2)
+        pipeline.map("identity", lambda x: x)
+        stream = pipeline.run()
+
+        # Act
+        next(stream)
+        time.sleep(0.3)
+        stream.close()
+
+        # Assert
+        assert len(produced) < 10
+
+    def test_failed_items_are_dropped_and_recorded(self):
+        """Test that an exception drops its item without stopping the stream."""
+
+        # Arrange
+        def check(x):
+            if x == 2:
+                raise ValueError("bad item")
+            return x
+
+        pipeline = StreamPipeline(range(4))
+        pipeline.map("check", check)
+
+        # Act
+        results = list(pipeline.run())
+
+        # Assert
+        assert results == [0, 1, 3]
+        assert [(stage, item) for stage, item, _ in pipeline.errors] == [("check", 2)]
+        assert pipeline.stats()["check"]["errors"] == 1
+
+
+class TestCorpusPipeline:
+    def test_discover_documents_walks_directories_lazily(self, tmp_path):
+        """Test that discovery yields matching documents in path order."""
+        # Arrange
+        (tmp_path / "b").mkdir()
+        (tmp_path / "b" / "two.md").write_text("Two")
+        (tmp_path / "one.md").write_text("One")
+        (tmp_path / "notes.txt").write_text("Notes")
+
+        # Act
+        found = discover_documents([str(tmp_path)])
+
+        # Assert
+        assert next(found) == str(tmp_path / "one.md")
+        assert list(found) == [str(tmp_path / "b" / "two.md")]
+
+    def test_second_run_skips_improved_outputs(self, tmp_path):
+        """Test that a re-run over a directory does not grade or rewrite earlier outputs."""
+        # Arrange
+        (tmp_path / "guide.md").write_text("# Guide\n\nVague.\n")
+        session = mock.Mock()
+        session.grade.return_value = (0.3, "Unclear")
+        session.improve.return_value = "# Guide\n\nClear.\n"
+
+        def run():
+            pipeline = corpus_pipeline([str(tmp_path)], session=session, improve=True)
+            return sorted(item.path for item in pipeline.run())
+
+        # Act
+        first = run()
+        second = run()
+
+        # Assert
+        assert first == second == [str(tmp_path / "guide.md")]
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["guide.md", "guide_improved.md"]
+
+    def test_sections_are_graded_and_low_scores_improved(self, tmp_path):
+        """Test that chunked sections stream through grade and improve stages."""
+        # Arrange
+        doc = tmp_path / "guide.md"
+        doc.write_text("# Good\n\nClear.\n# Bad\n\nVague.\n")
+        session = mock.Mock()
+        session.grade.side_effect = lambda content: (
+            (0.9, "Fine") if "Clear" in content else (0.3, "Unclear")
+        )
+        session.improve.return_value = "# Bad\n\nNow clear.\n"
+
+        # Act
+        pipeline = corpus_pipeline(
+            [str(doc)], session=session, sections=True, improve=True, target_score=0.7
+        )
+        items = sorted(pipeline.run(), key=lambda item: item.section)
+
+        # Assert
+        assert [(item.label, item.score) for item in items] == [
+            (f"{doc}#0", 0.9),
+            (f"{doc}#1", 0.3),
+        ]
+        assert items[0].improved_path is None
+        assert items[1].improved_path == str(tmp_path / "guide_improved_section1.md")
+        assert (tmp_path / "guide_improved_section1.md").read_text() == "# Bad\n\nNow clear.\n"
+        assert list(pipeline.stats()) == ["read", "chunk", "grade", "improve"]
+
+    def test_sections_are_recorded_under_their_labels(self, tmp_path):
+        """Test that streamed grades and rewrites are recorded per document section."""
+        # Arrange
+        doc = tmp_path / "guide.md"
+        doc.write_text("# Good\n\nClear.\n# Bad\n\nVague.\n")
+        session = mock.Mock()
+        session.grade.side_effect = lambda content: (
+            (0.9, "Fine") if "Clear" in content else (0.3, "Unclear")
+        )
+        session.improve.return_value = "# Bad\n\nNow clear.\n"
+        history = HistoryStore(":memory:")
+
+        # Act
+        pipeline = corpus_pipeline(
+            [str(doc)], session=session, sections=True, improve=True, history=history
+        )
+        list(pipeline.run())
+
+        # Assert
+        assert [event["kind"] for event in history.timeline(f"{doc}#0")] == ["grade"]
+        assert {event["kind"] for event in history.timeline(f"{doc}#1")} == {"grade", "improve"}
@@ -0,0 +1,166 @@
+"""Unit tests for watch module."""
+
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from autodoceval.watch import DocumentWatcher
+
+
+@pytest.fixture
+def docs_dir():
+    """Create a directory with one markdown document."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with open(os.path.join(temp_dir, "guide.md"), "w") as f:
+            f.write("# Guide")
+        yield temp_dir
+
+
+def write(path, content):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+class TestDocumentWatcher:
+    def test_init_with_missing_directory(self):
+        """Test that DocumentWatcher raises FileNotFoundError for a missing directory."""
+        # Act & Assert
+        with pytest.raises(FileNotFoundError):
+            DocumentWatcher("/path/to/nonexistent")
+
+    def test_scan_reports_new_and_modified_documents(self, docs_dir):
+        """Test that scan returns only markdown files that changed since the last scan."""
+        # Arrange
+        watcher = DocumentWatcher(docs_dir)
+        guide = os.path.join(docs_dir, "guide.md")
+        write(os.path.join(docs_dir, "notes.txt"), "ignored")
+
+        # Act & Assert
+        assert watcher.scan() == [guide]
+        assert watcher.scan() == []
+        write(guide, "# Guide, now longer")
+        assert watcher.scan() == [guide]
+
+    @mock.patch("autodoceval.watch.evaluate_document")
+    def test_flush_debounces_changes(self, mock_evaluate_document, docs_dir):
+        """Test that a change is graded only after the debounce window."""
+        # Arrange
+        mock_evaluate_document.return_value = (0.8, "Good")
+        on_result = mock.MagicMock()
+        watcher = DocumentWatcher(docs_dir, debounce=1.0, on_result=on_result)
+        guide = os.path.join(docs_dir, "guide.md")
+
+        # Act
+        watcher.notify(guide, now=10.0)
+        early = watcher.flush(now=10.5)
+        late = watcher.flush(now=11.0)
+        watcher._executor.shutdown(wait=True)
+
+        # Assert
+        assert early == []
+        assert late == [guide]
+        on_result.assert_called_once_with(guide, 0.8, None)
+
+    @mock.patch("autodoceval.watch.evaluate_document")
+    def test_flush_skips_unchanged_content(self, mock_evaluate_document, docs_dir):
+        """Test that saving identical content does not trigger another evaluation."""
+        # Arrange
+        mock_evaluate_document.return_value = (0.8, "Good")
+        watcher = DocumentWatcher(docs_dir, debounce=0.0, on_result=mock.MagicMock())
+        guide = os.path.join(docs_dir, "guide.md")
+
+        # Act
+        watcher.notify(guide)
+        watcher.flush()
+        watcher._executor.shutdown(wait=True)
+        watcher.notify(guide)
+        second = watcher.flush()
+
+        # Assert
+        assert second == []
+        mock_evaluate_document.assert_called_once_with("# Guide")
+
+    def test_newer_edit_discards_in_flight_result(self, docs_dir):
+        """Test that an evaluation superseded by newer content is not reported."""
+        # Arrange
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_evaluate(content):
+            started.set()
+            release.wait(5)
+            return (0.5, "Stale") if content == "# Guide" else (0.9, "Fresh")
+
+        on_result = mock.MagicMock()
+        watcher = DocumentWatcher(docs_dir, debounce=0.0, on_result=on_result)
+        guide = os.path.join(docs_dir, "guide.md")
+
+        # Act
+        with mock.patch("autodoceval.watch.evaluate_document", side_effect=slow_evaluate):
+            watcher.notify(guide)
+            watcher.flush()
+            started.wait(5)
+            write(guide, "# Guide v2")
+            watcher.notify(guide)
+            watcher.flush()
+            release.set()
+            watcher._executor.shutdown(wait=True)
+
+        # Assert
+        on_result.assert_called_once_with(guide, 0.9, None)
+
+    @mock.patch("autodoceval.watch.evaluate_document")
+    def test_read_events_do_not_trigger_grading(self, mock_evaluate_document, docs_dir):
+        """Test that the open and close events fired by reading a file are ignored."""
+        # Arrange
+        mock_evaluate_document.return_value = (0.8, "Good")
+        watcher = DocumentWatcher(docs_dir, debounce=0.0, on_result=mock.MagicMock())
+        guide = os.path.join(docs_dir, "guide.md")
+        watcher.handle_event("modified", guide)
+        watcher.flush()
+        watcher._executor.shutdown(wait=True)
+
+        # Act
+        watcher.handle_event("opened", guide)
+        watcher.handle_event("closed_no_write", guide)
+        ignored = dict(watcher._pending)
+        watcher.handle_event("modified", guide)
+        resubmitted = watcher.flush()
+
+        # Assert
+        assert ignored == {}
+        assert resubmitted == []
+        mock_evaluate_document.assert_called_once_with("# Guide")
+
+    def test_edit_is_graded_once_with_real_observer(self, docs_dir):
+        """Test that one edit under a running observer leads to exactly one re-grade."""
+        # Arrange
+        pytest.importorskip("watchdog")
+        guide = os.path.join(docs_dir, "guide.md")
+        on_result = mock.MagicMock()
+        watcher = DocumentWatcher(docs_dir, debounce=0.1, on_result=on_result)
+        stop = threading.Event()
+
+        def slow_evaluate(content):
+            time.sleep(0.3)
+            return 0.8, "Good"
+
+        # Act
+        with mock.patch(
+            "autodoceval.watch.evaluate_document", side_effect=slow_evaluate
+        ) as mock_evaluate_document:
+            thread = threading.Thread(target=watcher.run, args=(stop,))
+            thread.start()
+            time.sleep(0.5)
+            write(guide, "# Guide v2")
+            time.sleep(2)
+            stop.set()
+            thread.join(5)
+
+        # Assert
+        assert mock_evaluate_document.call_count == 2
+        assert on_result.call_count == 2